@@ -1,11 +1,14 @@
 from fastapi import Depends, HTTPException, Security, status 
 from fastapi.security.api_key import APIKeyHeader
 from app.core.config import settings
+from app.core.metrics import stage_timer
 
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 async def get_api_key(api_key_header: str = Security(api_key_header)):
-    if api_key_header == settings.API_KEY:
+    with stage_timer("auth"):
+        valid = api_key_header == settings.API_KEY
+    if valid:
         return api_key_header
     else:
         raise HTTPException(
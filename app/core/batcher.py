@@ -0,0 +1,177 @@
+# app/core/batcher.py
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Tuple
+
+from app.core.executor import InferenceQueueFull
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds for the batch-size / queue-depth histograms (last bucket is +Inf)
+HISTOGRAM_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+class Histogram:
+    """Minimal bucketed histogram (non-cumulative counts per upper bound)."""
+
+    def __init__(self, buckets: List[int] = HISTOGRAM_BUCKETS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0
+        self.sum = 0
+
+    def observe(self, value: int):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += 1
+        self.sum += value
+
+    def snapshot(self) -> Dict:
+        labels = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.total,
+            "mean": round(self.sum / self.total, 3) if self.total else 0.0
+        }
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-ticket requests into padded batches.
+
+    Callers submit (subject, description) and get a Future back. A worker thread
+    waits up to max_wait_ms for up to max_batch_size items, runs them through
+    classifier.classify_batch in one go and resolves each caller's future.
+    """
+
+    def __init__(self, classifier, max_batch_size: int = 16, max_wait_ms: float = 5.0, max_queue: int = 0):
+        self.classifier = classifier
+        self.max_batch_size = max_batch_size
+        self.max_queue = max_queue
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Tuple[Tuple[str, str], Future]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self.batch_sizes = Histogram()
+        self.queue_depths = Histogram()
+        self.batches_run = 0
+
+    def start(self):
+        self._thread.start()
+        logger.info(
+            f"Micro-batcher started (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:.1f})"
+        )
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the worker and fail every ticket still waiting for a batch.
+
+        A batch already handed to the classifier still resolves when it finishes;
+        tickets left in the queue get InferenceQueueFull so callers retry instead
+        of waiting on a future nobody will resolve.
+        """
+        with self._submit_lock:
+            self._stop.set()
+        self._thread.join(timeout=timeout)
+
+        failed = 0
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if future.set_running_or_notify_cancel():
+                future.set_exception(InferenceQueueFull("micro-batcher stopped before the ticket was batched"))
+                failed += 1
+        if failed:
+            logger.warning(f"Micro-batcher stopped with {failed} queued tickets; failed them for retry")
+
+    def submit(self, subject: str, description: str) -> Future:
+        if self.max_queue and self._queue.qsize() >= self.max_queue:
+            raise InferenceQueueFull(f"{self._queue.qsize()} tickets already waiting for a batch")
+        future: Future = Future()
+        # The lock orders submit against stop(): nothing is queued after the final drain
+        with self._submit_lock:
+            if self._stop.is_set():
+                raise InferenceQueueFull("micro-batcher is stopped")
+            self._queue.put(((subject, description), future))
+        return future
+
+    def classify(self, subject: str, description: str, timeout: float = None) -> dict:
+        """Blocking helper: submit one ticket and wait for its batched result."""
+        result = self.submit(subject, description).result(timeout=timeout)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result
+
+    async def classify_async(self, subject: str, description: str) -> dict:
+        """Awaitable variant of classify for async handlers."""
+        result = await asyncio.wrap_future(self.submit(subject, description))
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_queue": self.max_queue,
+            "queue_depth": self.queue_depth,
+            "batches_run": self.batches_run,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_depth_at_dispatch": self.queue_depths.snapshot()
+        }
+
+    def _collect(self) -> List[Tuple[Tuple[str, str], Future]]:
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+
+            self.queue_depths.observe(self._queue.qsize())
+            self.batch_sizes.observe(len(batch))
+            self.batches_run += 1
+
+            items = [item for item, _ in batch]
+            try:
+                results = self.classifier.classify_batch(items, batch_size=len(items))
+            except Exception as e:
+                logger.error(f"Micro-batch of {len(items)} failed: {str(e)}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,209 @@
+# app/core/cache.py
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_ticket_text(subject: str, description: str) -> str:
+    """Case- and whitespace-insensitive form of a ticket, used for cache keys."""
+    return _WHITESPACE.sub(" ", f"{subject} {description}").strip().lower()
+
+
+def prediction_key(subject: str, description: str, model_version: str) -> str:
+    text = normalize_ticket_text(subject, description)
+    return hashlib.sha256(f"{model_version}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """
+    Content-addressed cache of classification results.
+
+    Tier 1 is an in-process LRU bounded by max_entries with a per-entry TTL.
+    Tier 2 (optional) is a MongoDB collection (async driver) with a TTL index, shared
+    by all workers.
+    Keys combine the normalized ticket text with the model artifact version, so a
+    model rollout never serves stale predictions.
+    """
+
+    def __init__(
+        self,
+        model_version: str,
+        max_entries: int = 10000,
+        ttl_seconds: float = 3600,
+        collection=None
+    ):
+        self.model_version = model_version
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.collection = collection
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {
+            "memory_hits": 0,
+            "mongo_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+
+    def key(self, subject: str, description: str) -> str:
+        return prediction_key(subject, description, self.model_version)
+
+    def _get_local(self, key: str, now: float) -> Optional[dict]:
+        """Tier-1 lookup; the caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at > now:
+            self._entries.move_to_end(key)
+            self.counters["memory_hits"] += 1
+            return dict(result)
+        del self._entries[key]
+        self.counters["expirations"] += 1
+        return None
+
+    async def get(self, subject: str, description: str) -> Optional[dict]:
+        key = self.key(subject, description)
+        with self._lock:
+            cached = self._get_local(key, time.monotonic())
+        if cached is not None:
+            return cached
+
+        if self.collection is not None:
+            try:
+                doc = await self.collection.find_one({"_id": key}, {"result": 1})
+            except Exception as e:
+                logger.warning(f"Prediction cache Mongo lookup failed: {e}")
+                doc = None
+            if doc is not None:
+                self._store_local(key, doc["result"])
+                with self._lock:
+                    self.counters["mongo_hits"] += 1
+                return dict(doc["result"])
+
+        with self._lock:
+            self.counters["misses"] += 1
+        return None
+
+    async def get_many(self, items: List[Tuple[str, str]]) -> List[Optional[dict]]:
+        """get() for many tickets, in input order, with one Mongo round trip for all tier-1 misses."""
+        keys = [self.key(subject, description) for subject, description in items]
+        now = time.monotonic()
+        with self._lock:
+            results = [self._get_local(key, now) for key in keys]
+        missing = {key for key, result in zip(keys, results) if result is None}
+
+        found = {}
+        if missing and self.collection is not None:
+            try:
+                docs = await self.collection.find(
+                    {"_id": {"$in": list(missing)}}, {"result": 1}
+                ).to_list(length=len(missing))
+                found = {doc["_id"]: doc["result"] for doc in docs}
+            except Exception as e:
+                logger.warning(f"Prediction cache Mongo lookup failed: {e}")
+            for key, result in found.items():
+                self._store_local(key, result)
+
+        mongo_hits = misses = 0
+        for idx, key in enumerate(keys):
+            if results[idx] is not None:
+                continue
+            if key in found:
+                results[idx] = dict(found[key])
+                mongo_hits += 1
+            else:
+                misses += 1
+        with self._lock:
+            self.counters["mongo_hits"] += mongo_hits
+            self.counters["misses"] += misses
+        return results
+
+    async def set(self, subject: str, description: str, result: dict):
+        if "error" in result:
+            return
+        key = self.key(subject, description)
+        self._store_local(key, result)
+
+        if self.collection is not None:
+            try:
+                await self.collection.update_one(
+                    {"_id": key},
+                    {"$set": {
+                        "result": result,
+                        "model_version": self.model_version,
+                        "created_at": datetime.utcnow()
+                    }},
+                    upsert=True
+                )
+            except Exception as e:
+                logger.warning(f"Prediction cache Mongo write failed: {e}")
+
+    async def set_many(self, items: List[Tuple[str, str]], results: List[dict]):
+        """set() for many tickets, written to Mongo in one unordered bulk upsert."""
+        entries = {
+            self.key(subject, description): result
+            for (subject, description), result in zip(items, results)
+            if "error" not in result
+        }
+        for key, result in entries.items():
+            self._store_local(key, result)
+
+        if self.collection is not None and entries:
+            created_at = datetime.utcnow()
+            try:
+                await self.collection.bulk_write([
+                    UpdateOne(
+                        {"_id": key},
+                        {"$set": {"result": result, "model_version": self.model_version, "created_at": created_at}},
+                        upsert=True
+                    )
+                    for key, result in entries.items()
+                ], ordered=False)
+            except Exception as e:
+                logger.warning(f"Prediction cache Mongo write failed: {e}")
+
+    def _store_local(self, key: str, result: dict):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self.counters)
+            size = len(self._entries)
+        lookups = counters["memory_hits"] + counters["mongo_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["mongo_hits"]
+        return {
+            "model_version": self.model_version,
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "mongo_tier": self.collection is not None,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            **counters
+        }
+
+
+async def ensure_cache_indexes(collection, ttl_seconds: float):
+    """Let Mongo expire second-tier entries on its own."""
+    await collection.create_index("created_at", expireAfterSeconds=int(ttl_seconds))
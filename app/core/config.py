@@ -7,6 +7,17 @@ load_dotenv()
 class Settings:
     # MongoDB with fallback
     MONGO_URI: str = os.getenv("MONGO_URI", "mongodb://localhost:27017/client_success_db")
+
+    # MongoDB connection pool (0 disables the idle/socket/wait-queue timeouts)
+    MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+    MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+    MONGO_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    MONGO_CONNECT_TIMEOUT_MS: int = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+    MONGO_SOCKET_TIMEOUT_MS: int = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000"))
+    # Wire compression, e.g. "zstd,snappy,zlib" (zstd/snappy need their Python packages)
+    MONGO_COMPRESSORS: str = os.getenv("MONGO_COMPRESSORS", "")
     
     # Allow app to start without MongoDB
     REQUIRE_MONGODB: bool = os.getenv("REQUIRE_MONGODB", "false").lower() == "true"
@@ -17,4 +28,121 @@ class Settings:
     API_KEY: str = os.getenv("API_KEY", "dev-key-change-in-production")
     RATE_LIMIT: str = os.getenv("RATE_LIMIT", "10/minute")
 
+    # Batch classification
+    MAX_BATCH_SIZE: int = int(os.getenv("MAX_BATCH_SIZE", "64"))
+    INFERENCE_BATCH_SIZE: int = int(os.getenv("INFERENCE_BATCH_SIZE", "16"))
+    BATCH_RATE_LIMIT: str = os.getenv("BATCH_RATE_LIMIT", "20/minute")
+
+    # Streaming upload classification (/classify/stream)
+    STREAM_RATE_LIMIT: str = os.getenv("STREAM_RATE_LIMIT", "5/minute")
+    STREAM_BATCH_SIZE: int = int(os.getenv("STREAM_BATCH_SIZE", "64"))
+    MAX_STREAM_ROWS: int = int(os.getenv("MAX_STREAM_ROWS", "1000000"))
+    # The upload is spooled to a temp file (TMPDIR) before results are sent; larger bodies get 413
+    MAX_STREAM_UPLOAD_BYTES: int = int(os.getenv("MAX_STREAM_UPLOAD_BYTES", str(1024 ** 3)))
+
+    # Load models in the background after the server starts (see /ready); false blocks startup
+    BACKGROUND_MODEL_LOAD: bool = os.getenv("BACKGROUND_MODEL_LOAD", "true").lower() == "true"
+
+    # Dynamic micro-batching for /classify
+    MICROBATCH_ENABLED: bool = os.getenv("MICROBATCH_ENABLED", "true").lower() == "true"
+    MICROBATCH_MAX_SIZE: int = int(os.getenv("MICROBATCH_MAX_SIZE", "16"))
+    MICROBATCH_MAX_WAIT_MS: float = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "5"))
+
+    # Shared-encoder inference (empty path -> two-pipeline fallback)
+    MULTIHEAD_MODEL_PATH: str = os.getenv("MULTIHEAD_MODEL_PATH", "")
+    SINGLE_PASS_INFERENCE: bool = os.getenv("SINGLE_PASS_INFERENCE", "true").lower() == "true"
+
+    # Inference backend: "pytorch" or "onnx"
+    INFERENCE_BACKEND: str = os.getenv("INFERENCE_BACKEND", "pytorch").lower()
+    ONNX_MODEL_DIR: str = os.getenv("ONNX_MODEL_DIR", "models/artifacts/onnx")
+    ONNX_QUANTIZED: bool = os.getenv("ONNX_QUANTIZED", "false").lower() == "true"
+    ONNX_NUM_THREADS: int = int(os.getenv("ONNX_NUM_THREADS", "0"))
+
+    # Versioned model registry. Without a manifest the models/artifacts paths above are used;
+    # with one, its active version (or MODEL_VERSION, if pinned) supplies all model paths
+    MODEL_REGISTRY_DIR: str = os.getenv("MODEL_REGISTRY_DIR", "models/registry")
+    MODEL_VERSION: str = os.getenv("MODEL_VERSION", "")
+    # How often workers check the manifest for a new active version (0 = never)
+    MODEL_REGISTRY_POLL_SECONDS: float = float(os.getenv("MODEL_REGISTRY_POLL_SECONDS", "30"))
+    # Upper bound on waiting for in-flight requests on the old model after a swap
+    MODEL_DRAIN_TIMEOUT_SECONDS: float = float(os.getenv("MODEL_DRAIN_TIMEOUT_SECONDS", "30"))
+    ADMIN_RATE_LIMIT: str = os.getenv("ADMIN_RATE_LIMIT", "10/minute")
+
+    # TF-IDF first stage ahead of BERT (empty path disables; a registry version's cascade/ wins).
+    # Tickets whose priority and category confidences both reach the threshold skip BERT
+    CASCADE_MODEL_PATH: str = os.getenv("CASCADE_MODEL_PATH", "")
+    CASCADE_THRESHOLD: float = float(os.getenv("CASCADE_THRESHOLD", "0.9"))
+
+    # Near-duplicate detection for classify-and-store (MinHash/LSH over clean_text shingles).
+    # A ticket at least DEDUP_THRESHOLD similar to one seen within DEDUP_WINDOW_SECONDS joins
+    # its cluster and reuses its classification when the model version matches
+    DEDUP_ENABLED: bool = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+    DEDUP_THRESHOLD: float = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+    DEDUP_NUM_PERM: int = int(os.getenv("DEDUP_NUM_PERM", "128"))
+    DEDUP_SHINGLE_SIZE: int = int(os.getenv("DEDUP_SHINGLE_SIZE", "5"))
+    DEDUP_WINDOW_SECONDS: float = float(os.getenv("DEDUP_WINDOW_SECONDS", "86400"))
+    DEDUP_MAX_ENTRIES: int = int(os.getenv("DEDUP_MAX_ENTRIES", "100000"))
+    # Recent classified_tickets indexed at startup (0 = start empty)
+    DEDUP_SEED_LIMIT: int = int(os.getenv("DEDUP_SEED_LIMIT", "10000"))
+
+    # Tokenization: "head", "head_tail" or "subject_weighted" truncation to MAX_SEQ_LENGTH tokens
+    # (capped at the model's limit). The default matches untruncated inference for every ticket
+    # the model can take; e.g. head_tail at 256 trades some accuracy on long tickets for latency
+    TRUNCATION_STRATEGY: str = os.getenv("TRUNCATION_STRATEGY", "head").lower()
+    MAX_SEQ_LENGTH: int = int(os.getenv("MAX_SEQ_LENGTH", "512"))
+    TRUNCATION_HEAD_FRACTION: float = float(os.getenv("TRUNCATION_HEAD_FRACTION", "0.25"))
+    SUBJECT_MAX_TOKENS: int = int(os.getenv("SUBJECT_MAX_TOKENS", "64"))
+
+    # Dedicated inference executor ("thread" or "process") with bounded queue
+    INFERENCE_EXECUTOR: str = os.getenv("INFERENCE_EXECUTOR", "thread").lower()
+    INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", "2"))
+    INFERENCE_MAX_QUEUE: int = int(os.getenv("INFERENCE_MAX_QUEUE", "64"))
+    INFERENCE_RETRY_AFTER_SECONDS: int = int(os.getenv("INFERENCE_RETRY_AFTER_SECONDS", "1"))
+
+    # Bulk ticket ingestion and write-behind buffering of single saves
+    BULK_RATE_LIMIT: str = os.getenv("BULK_RATE_LIMIT", "10/minute")
+    BULK_INSERT_CHUNK_SIZE: int = int(os.getenv("BULK_INSERT_CHUNK_SIZE", "500"))
+    MAX_BULK_TICKETS: int = int(os.getenv("MAX_BULK_TICKETS", "10000"))
+    WRITE_BEHIND_ENABLED: bool = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true"
+    WRITE_BEHIND_MAX_SIZE: int = int(os.getenv("WRITE_BEHIND_MAX_SIZE", "100"))
+    WRITE_BEHIND_FLUSH_SECONDS: float = float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", "1.0"))
+
+    # Classify-and-store: local spool for tickets that could not be written while Mongo is down
+    CLASSIFY_STORE_RATE_LIMIT: str = os.getenv("CLASSIFY_STORE_RATE_LIMIT", "100/minute")
+    TICKET_SPOOL_PATH: str = os.getenv("TICKET_SPOOL_PATH", "data/spool/classified_tickets.ndjson")
+    MONGO_RECONNECT_SECONDS: float = float(os.getenv("MONGO_RECONNECT_SECONDS", "5"))
+
+    # Ticket query API
+    TICKETS_READ_RATE_LIMIT: str = os.getenv("TICKETS_READ_RATE_LIMIT", "120/minute")
+    TICKETS_PAGE_SIZE: int = int(os.getenv("TICKETS_PAGE_SIZE", "50"))
+    TICKETS_MAX_PAGE_SIZE: int = int(os.getenv("TICKETS_MAX_PAGE_SIZE", "500"))
+    STATS_DEFAULT_WINDOW_HOURS: int = int(os.getenv("STATS_DEFAULT_WINDOW_HOURS", "24"))
+
+    # Incremental rollups (ticket_rollups); minute buckets expire, hour buckets are kept
+    ROLLUP_MINUTE_RETENTION_HOURS: int = int(os.getenv("ROLLUP_MINUTE_RETENTION_HOURS", "48"))
+
+    # Background classification jobs (state in SQLite, files under JOBS_DIR)
+    JOBS_ENABLED: bool = os.getenv("JOBS_ENABLED", "true").lower() == "true"
+    JOBS_DIR: str = os.getenv("JOBS_DIR", "data/jobs")
+    JOBS_DB_PATH: str = os.getenv("JOBS_DB_PATH", "data/jobs/jobs.db")
+    JOBS_INPUT_DIR: str = os.getenv("JOBS_INPUT_DIR", "data")
+    JOBS_WORKERS: int = int(os.getenv("JOBS_WORKERS", "1"))
+    JOBS_BATCH_SIZE: int = int(os.getenv("JOBS_BATCH_SIZE", "64"))
+    JOBS_INFERENCE_THREADS: int = int(os.getenv("JOBS_INFERENCE_THREADS", "1"))
+    JOBS_LEASE_SECONDS: float = float(os.getenv("JOBS_LEASE_SECONDS", "60"))
+    JOBS_POLL_SECONDS: float = float(os.getenv("JOBS_POLL_SECONDS", "1.0"))
+    JOBS_RATE_LIMIT: str = os.getenv("JOBS_RATE_LIMIT", "10/minute")
+    JOBS_READ_RATE_LIMIT: str = os.getenv("JOBS_READ_RATE_LIMIT", "300/minute")
+
+    # Pre-fork serving (python -m app.serve)
+    SERVE_HOST: str = os.getenv("SERVE_HOST", "0.0.0.0")
+    SERVE_PORT: int = int(os.getenv("SERVE_PORT", "8000"))
+    SERVE_WORKERS: int = int(os.getenv("SERVE_WORKERS", "2"))
+
+    # Prediction cache
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "3600"))
+    CACHE_MONGO_ENABLED: bool = os.getenv("CACHE_MONGO_ENABLED", "false").lower() == "true"
+
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,256 @@
+# app/core/dedup.py
+import asyncio
+import heapq
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from nlp_pipeline.preprocessing.cleaner import clean_text
+
+# Universal hashing (a * h + b) mod p over 32-bit shingle hashes; p is the first prime
+# above 2**32 and a, b < 2**31 keep a * h + b inside uint64
+_PRIME = np.uint64(4294967311)
+_SEED = 1
+
+# Only the first MAX_SHINGLE_CHARS of the cleaned ticket text are shingled, and shingle
+# hashes are permuted HASH_CHUNK at a time, so a huge description costs bounded CPU and
+# at most HASH_CHUNK x num_perm uint64s of scratch memory
+MAX_SHINGLE_CHARS = 20000
+HASH_CHUNK = 2048
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    (bands, rows) for the LSH table. Two tickets share a bucket with probability
+    1 - (1 - s**rows)**bands at Jaccard similarity s; the curve's midpoint (1/bands)**(1/rows)
+    is put as close as possible below the threshold, so near-duplicates are rarely missed
+    and the extra candidates are dropped by the signature check.
+    """
+    best = (num_perm, 1)
+    best_midpoint = 0.0
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        midpoint = (1 / bands) ** (1 / rows)
+        if best_midpoint < midpoint <= threshold:
+            best, best_midpoint = (bands, rows), midpoint
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index of recent tickets for near-duplicate lookups.
+
+    Tickets are normalized with clean_text and split into character shingles; the
+    MinHash signature estimates the Jaccard similarity of two shingle sets. Signatures
+    are cut into bands and each band is hashed into a bucket, so a lookup only compares
+    against tickets that share a bucket - constant time in the size of the index.
+    Entries expire after ttl_seconds and the ones closest to expiry are evicted beyond
+    max_entries; a heap keyed on expiry keeps both right when seeding adds back-dated
+    entries after live ones.
+    The index is per process; workers each see the tickets they classified (plus what
+    was seeded from MongoDB at startup).
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        max_entries: int = 100000,
+        ttl_seconds: float = 86400
+    ):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+
+        rng = np.random.default_rng(_SEED)
+        self._a = rng.integers(1, 2 ** 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 31, size=num_perm, dtype=np.uint64)
+
+        # key -> (expires_at, signature, payload)
+        self._entries: Dict[str, tuple] = {}
+        # (expires_at, key), soonest first; removed or re-added keys leave stale items behind
+        self._expiry: List[Tuple[float, str]] = []
+        self._buckets: List[Dict[bytes, set]] = [{} for _ in range(self.bands)]
+        self._lock = threading.Lock()
+        self.counters = {
+            "lookups": 0,
+            "duplicates": 0,
+            "candidates": 0,
+            "evictions": 0,
+            "expirations": 0
+        }
+
+    def shingles(self, subject: str, description: str) -> set:
+        text = clean_text(f"{subject} {description}")[:MAX_SHINGLE_CHARS]
+        if len(text) <= self.shingle_size:
+            return {text}
+        return {text[i:i + self.shingle_size] for i in range(len(text) - self.shingle_size + 1)}
+
+    def signature(self, subject: str, description: str) -> np.ndarray:
+        """MinHash signature; CPU-bound, so async callers run it in a thread."""
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in self.shingles(subject, description)),
+            dtype=np.uint64
+        )
+        signature = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        for start in range(0, len(hashes), HASH_CHUNK):
+            permuted = (np.outer(hashes[start:start + HASH_CHUNK], self._a) + self._b) % _PRIME
+            np.minimum(signature, permuted.min(axis=0), out=signature)
+        return signature
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def query(self, signature: np.ndarray) -> Optional[Tuple[str, float, dict]]:
+        """(key, estimated similarity, payload) of the most similar live entry at or above the threshold."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self.counters["lookups"] += 1
+            candidates = set()
+            for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+                candidates.update(buckets.get(band_key, ()))
+            self.counters["candidates"] += len(candidates)
+
+            best = None
+            for key in candidates:
+                similarity = float(np.mean(self._entries[key][1] == signature))
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (key, similarity, self._entries[key][2])
+            if best is not None:
+                self.counters["duplicates"] += 1
+            return best
+
+    def add(self, key: str, signature: np.ndarray, payload: dict, age_seconds: float = 0.0):
+        """Index a ticket; age_seconds back-dates entries seeded from stored tickets."""
+        expires_at = time.monotonic() + self.ttl_seconds - age_seconds
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, signature, payload)
+            heapq.heappush(self._expiry, (expires_at, key))
+            for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+                buckets.setdefault(band_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(self._pop_soonest())
+                self.counters["evictions"] += 1
+            if len(self._expiry) > 2 * len(self._entries) + 1024:
+                self._expiry = [(entry[0], key) for key, entry in self._entries.items()]
+                heapq.heapify(self._expiry)
+
+    def update(self, key: str, **fields):
+        """Merge fields into an entry's payload, e.g. its classification once it is known."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2].update(fields)
+
+    def remove(self, key: str):
+        """Drop an entry, e.g. one indexed for a ticket that ended up not being stored."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def _remove(self, key: str):
+        _, signature, _ = self._entries.pop(key)
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket = buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[band_key]
+
+    def _pop_soonest(self) -> Optional[str]:
+        """Pop the live entry that expires first off the heap, skipping stale items."""
+        while self._expiry:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == expires_at:
+                return key
+        return None
+
+    def _expire(self, now: float):
+        while self._expiry and self._expiry[0][0] <= now:
+            key = self._pop_soonest()
+            if key is None:
+                break
+            entry = self._entries[key]
+            if entry[0] > now:
+                # Stale items were skipped past a live entry that is not due yet
+                heapq.heappush(self._expiry, (entry[0], key))
+                break
+            self._remove(key)
+            self.counters["expirations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._expiry.clear()
+            for buckets in self._buckets:
+                buckets.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = dict(self.counters)
+            size = len(self._entries)
+        return {
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "threshold": self.threshold,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "rows": self.rows,
+            "duplicate_rate": round(counters["duplicates"] / counters["lookups"], 4) if counters["lookups"] else 0.0,
+            **counters
+        }
+
+
+def stored_result(doc: dict) -> Optional[dict]:
+    """The classification of a stored ticket, in the classifier's result format."""
+    if doc.get("predicted_priority") is None or doc.get("predicted_category") is None:
+        return None
+    return {
+        "priority": doc["predicted_priority"],
+        "priority_confidence": doc.get("priority_confidence"),
+        "category": doc["predicted_category"],
+        "category_confidence": doc.get("category_confidence"),
+        "model_version": doc.get("model_version")
+    }
+
+
+async def seed_index(index: NearDuplicateIndex, collection, limit: int) -> int:
+    """
+    Index the most recent classified tickets within the index's window, so a restart
+    does not forget the clusters still receiving tickets. Returns the number indexed.
+    """
+    now = datetime.utcnow()
+    cursor = collection.find(
+        {"classification_timestamp": {"$gte": now - timedelta(seconds=index.ttl_seconds)}},
+        {"subject": 1, "description": 1, "classification_timestamp": 1, "cluster_id": 1,
+         "predicted_priority": 1, "predicted_category": 1, "priority_confidence": 1,
+         "category_confidence": 1, "model_version": 1}
+    ).sort([("classification_timestamp", -1), ("_id", -1)]).limit(limit)
+    docs = await cursor.to_list(length=limit)
+
+    def build():
+        for doc in reversed(docs):
+            ticket_id = str(doc["_id"])
+            index.add(
+                ticket_id,
+                index.signature(doc.get("subject", ""), doc.get("description", "")),
+                {"ticket_id": ticket_id, "cluster_id": doc.get("cluster_id") or ticket_id,
+                 "result": stored_result(doc)},
+                age_seconds=(now - doc["classification_timestamp"]).total_seconds()
+            )
+
+    await asyncio.to_thread(build)
+    return len(docs)
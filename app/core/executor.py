@@ -0,0 +1,101 @@
+# app/core/executor.py
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Set before the process pool forks so workers inherit the loaded model copy-on-write
+_worker_classifier = None
+
+
+class InferenceQueueFull(Exception):
+    """Raised when too many inference calls are already pending; mapped to 503 + Retry-After."""
+
+
+def _worker_classify(subject: str, description: str) -> dict:
+    return _worker_classifier.classify(subject, description)
+
+
+def _worker_classify_batch(items: List[Tuple[str, str]], batch_size: int) -> List[dict]:
+    return _worker_classifier.classify_batch(items, batch_size=batch_size)
+
+
+class InferenceExecutor:
+    """
+    Dedicated, bounded pool for CPU-bound model inference.
+
+    Keeps inference off Starlette's default threadpool and the event loop. At most
+    max_queue calls may be pending (running or waiting); beyond that submit raises
+    InferenceQueueFull instead of queuing without bound.
+    """
+
+    def __init__(self, classifier, kind: str = "thread", max_workers: int = 2, max_queue: int = 64):
+        global _worker_classifier
+
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.classifier = classifier
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+        if kind == "process":
+            _worker_classifier = classifier
+            self._pool: Executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("fork")
+            )
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self.rejected += 1
+                raise InferenceQueueFull(f"{self._pending} inference calls already pending")
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    async def _run(self, fn, *args):
+        self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, fn, *args)
+        finally:
+            self._release()
+
+    async def classify(self, subject: str, description: str) -> dict:
+        if self.kind == "process":
+            return await self._run(_worker_classify, subject, description)
+        return await self._run(self.classifier.classify, subject, description)
+
+    async def classify_batch(self, items: List[Tuple[str, str]], batch_size: int) -> List[dict]:
+        if self.kind == "process":
+            return await self._run(_worker_classify_batch, items, batch_size)
+        return await self._run(self.classifier.classify_batch, items, batch_size)
+
+    def stats(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "rejected": self.rejected
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
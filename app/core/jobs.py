@@ -0,0 +1,404 @@
+# app/core/jobs.py
+"""
+Background classification jobs.
+
+A job is an uploaded (or referenced) CSV/NDJSON file classified by a local worker
+pool. State lives in SQLite so it survives restarts and is shared by all pre-fork
+workers: a worker claims a job by taking a lease and renews it after every batch;
+a job whose lease expired (its worker died) is claimed again and resumes after the
+last checkpoint (rows done + results file size), like scripts/batch_classify.py.
+
+Jobs run their batches on a dedicated inference lane (JOBS_INFERENCE_THREADS
+threads) and back off while interactive requests are waiting, so bulk work never
+starves /classify.
+"""
+import asyncio
+import base64
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from app.core.streaming import iter_csv_records, iter_ndjson_records
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+FORMATS = ("csv", "ndjson")
+ACTIVE = ("queued", "running")
+READ_CHUNK_BYTES = 64 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    format TEXT NOT NULL,
+    input_path TEXT NOT NULL,
+    results_path TEXT NOT NULL,
+    rows_total INTEGER,
+    rows_done INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    results_bytes INTEGER NOT NULL DEFAULT 0,
+    run_seconds REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority, created_at);
+"""
+
+
+class InvalidResultsCursor(ValueError):
+    pass
+
+
+def encode_results_cursor(job_id: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{job_id}|{offset}".encode("utf-8")).decode("ascii")
+
+
+def decode_results_cursor(job_id: str, cursor: str) -> int:
+    try:
+        cursor_job, offset = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        offset = int(offset)
+    except ValueError as e:
+        raise InvalidResultsCursor(f"Invalid cursor: {cursor}") from e
+    if cursor_job != job_id or offset < 0:
+        raise InvalidResultsCursor(f"Invalid cursor: {cursor}")
+    return offset
+
+
+class JobStore:
+    """
+    SQLite-backed job table; every method is a short transaction.
+    Calls block (up to the 30s busy timeout while another worker holds the lock), so
+    async code runs them with asyncio.to_thread.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def create(self, job_id: str, fmt: str, priority: int, input_path: str, results_path: str,
+               rows_total: Optional[int]):
+        self._execute(
+            "INSERT INTO jobs (id, status, priority, format, input_path, results_path, rows_total, created_at) "
+            "VALUES (?, 'queued', ?, ?, ?, ?, ?, ?)",
+            (job_id, priority, fmt, input_path, results_path, rows_total, time.time())
+        )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        row = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list(self, limit: int = 50) -> List[dict]:
+        rows = self._execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def claim(self, lease_seconds: float) -> Optional[dict]:
+        """Take the most urgent queued job, or a running one whose worker stopped renewing its lease."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                    "ORDER BY priority, created_at LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', started_at = COALESCE(started_at, ?), "
+                        "lease_until = ? WHERE id = ?",
+                        (now, now + lease_seconds, row["id"])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return dict(row) if row else None
+
+    def checkpoint(self, job_id: str, rows_done: int, errors: int, results_bytes: int,
+                   run_seconds: float, lease_seconds: float) -> bool:
+        """Record progress and renew the lease; False once the job was cancelled."""
+        cursor = self._execute(
+            "UPDATE jobs SET rows_done = ?, errors = ?, results_bytes = ?, run_seconds = ?, lease_until = ? "
+            "WHERE id = ? AND status = 'running'",
+            (rows_done, errors, results_bytes, run_seconds, time.time() + lease_seconds, job_id)
+        )
+        return cursor.rowcount == 1
+
+    def finish(self, job_id: str, status: str, error: Optional[str] = None):
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_until = NULL "
+            "WHERE id = ? AND status = 'running'",
+            (status, error, time.time(), job_id)
+        )
+
+    def cancel(self, job_id: str) -> bool:
+        cursor = self._execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ?, lease_until = NULL "
+            "WHERE id = ? AND status IN ('queued', 'running')",
+            (time.time(), job_id)
+        )
+        return cursor.rowcount == 1
+
+    def close(self):
+        self._conn.close()
+
+
+def job_progress(job: dict) -> dict:
+    """Public view of a job row with throughput and ETA."""
+    rows_done, rows_total = job["rows_done"], job["rows_total"]
+    throughput = rows_done / job["run_seconds"] if job["run_seconds"] > 0 else None
+    eta = None
+    if throughput and rows_total is not None and job["status"] in ACTIVE:
+        eta = round((rows_total - rows_done) / throughput, 1)
+    priority = next(name for name, value in PRIORITIES.items() if value == job["priority"])
+    return {
+        "id": job["id"],
+        "status": job["status"],
+        "priority": priority,
+        "format": job["format"],
+        "rows_total": rows_total,
+        "rows_done": rows_done,
+        "errors": job["errors"],
+        "progress": round(rows_done / rows_total, 4) if rows_total else None,
+        "rows_per_second": round(throughput, 1) if throughput else None,
+        "eta_seconds": eta,
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"]
+    }
+
+
+async def read_file_chunks(path: str, offset: int = 0) -> AsyncIterator[bytes]:
+    """Read a file in chunks off the event loop."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            chunk = await asyncio.to_thread(f.read, READ_CHUNK_BYTES)
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_records(path: str, fmt: str):
+    chunks = read_file_chunks(path)
+    return iter_csv_records(chunks) if fmt == "csv" else iter_ndjson_records(chunks)
+
+
+async def count_records(path: str, fmt: str) -> int:
+    count = 0
+    async for _ in iter_records(path, fmt):
+        count += 1
+    return count
+
+
+def _ticket(record) -> Tuple[Optional[Tuple[str, str]], Optional[str]]:
+    if isinstance(record, ValueError):
+        return None, str(record)
+    subject = str(record.get("subject") or "").strip()
+    description = str(record.get("description") or "").strip()
+    if not subject and not description:
+        return None, "Missing subject and description"
+    return (subject, description), None
+
+
+class JobManager:
+    """Runs queued jobs with a small pool of asyncio workers."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        get_classifier: Callable[[], object],
+        jobs_dir: str,
+        workers: int = 1,
+        batch_size: int = 64,
+        inference_batch_size: int = 16,
+        inference_threads: int = 1,
+        lease_seconds: float = 60,
+        poll_seconds: float = 1.0,
+        interactive_busy: Optional[Callable[[], bool]] = None
+    ):
+        self.store = store
+        self.get_classifier = get_classifier
+        self.jobs_dir = jobs_dir
+        self.workers = workers
+        self.batch_size = batch_size
+        self.inference_batch_size = inference_batch_size
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.interactive_busy = interactive_busy
+        # Separate lane: job batches never occupy the interactive inference executor
+        self._lane = ThreadPoolExecutor(max_workers=inference_threads, thread_name_prefix="job-inference")
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {"jobs_completed": 0, "jobs_failed": 0, "jobs_cancelled": 0, "yields": 0}
+
+    def job_paths(self, job_id: str, fmt: str) -> Tuple[str, str]:
+        job_dir = os.path.join(self.jobs_dir, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        return os.path.join(job_dir, f"input.{fmt}"), os.path.join(job_dir, "results.ndjson")
+
+    async def submit(self, chunks: AsyncIterator[bytes], fmt: str, priority: str = "normal") -> dict:
+        """Spool an upload to disk and queue it."""
+        job_id = uuid.uuid4().hex
+        input_path, results_path = self.job_paths(job_id, fmt)
+        with open(input_path, "wb") as f:
+            async for chunk in chunks:
+                await asyncio.to_thread(f.write, chunk)
+        return await self.submit_file(input_path, fmt, priority, job_id=job_id)
+
+    async def submit_file(self, input_path: str, fmt: str, priority: str = "normal",
+                          job_id: Optional[str] = None) -> dict:
+        """Queue a file that is already on local disk."""
+        job_id = job_id or uuid.uuid4().hex
+        _, results_path = self.job_paths(job_id, fmt)
+        rows_total = await count_records(input_path, fmt)
+        await asyncio.to_thread(
+            self.store.create, job_id, fmt, PRIORITIES[priority], input_path, results_path, rows_total
+        )
+        logger.info(f"Job {job_id} queued ({rows_total} rows, priority {priority})")
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._lane.shutdown(wait=False, cancel_futures=True)
+
+    async def _worker(self, number: int):
+        while True:
+            try:
+                job = await asyncio.to_thread(self.store.claim, self.lease_seconds)
+            except Exception as e:
+                logger.error(f"Job worker {number} could not claim a job: {e}")
+                job = None
+            if job is None:
+                await asyncio.sleep(self.poll_seconds)
+                continue
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                # Shutdown: leave the job running; its lease expires and it resumes later
+                raise
+            except Exception as e:
+                logger.error(f"Job {job['id']} failed: {e}")
+                await asyncio.to_thread(self.store.finish, job["id"], "failed", str(e))
+                self.stats["jobs_failed"] += 1
+
+    async def _yield_to_interactive(self):
+        while self.interactive_busy is not None and self.interactive_busy():
+            self.stats["yields"] += 1
+            await asyncio.sleep(0.01)
+
+    async def _classify(self, pairs: List[Tuple[str, str]]) -> List[dict]:
+        await self._yield_to_interactive()
+        loop = asyncio.get_running_loop()
+        classifier = self.get_classifier()
+        return await loop.run_in_executor(self._lane, classifier.classify_batch, pairs, self.inference_batch_size)
+
+    async def _run(self, job: dict):
+        job_id = job["id"]
+        rows_done, errors = job["rows_done"], job["errors"]
+        run_seconds = job["run_seconds"]
+        resume_from = rows_done
+        if resume_from:
+            logger.info(f"Resuming job {job_id} after {resume_from} rows")
+
+        with open(job["results_path"], "ab") as out:
+            # Drop results written after the last checkpoint
+            out.truncate(job["results_bytes"])
+            out.seek(job["results_bytes"])
+
+            batch: List[Tuple[int, Optional[Tuple[str, str]], Optional[str]]] = []
+
+            async def flush() -> bool:
+                nonlocal rows_done, errors, run_seconds
+                started = time.perf_counter()
+                pairs = [pair for _, pair, _ in batch if pair is not None]
+                classified = iter(await self._classify(pairs) if pairs else [])
+                lines = []
+                for index, pair, error in batch:
+                    result = next(classified) if pair is not None else {"error": error}
+                    errors += "error" in result
+                    lines.append(json.dumps({"index": index, **result}))
+                await asyncio.to_thread(out.write, ("\n".join(lines) + "\n").encode("utf-8"))
+                await asyncio.to_thread(out.flush)
+                rows_done += len(batch)
+                run_seconds += time.perf_counter() - started
+                batch.clear()
+                return await asyncio.to_thread(
+                    self.store.checkpoint, job_id, rows_done, errors, out.tell(), run_seconds, self.lease_seconds
+                )
+
+            index = -1
+            async for record in iter_records(job["input_path"], job["format"]):
+                index += 1
+                if index < resume_from:
+                    continue
+                pair, error = _ticket(record)
+                batch.append((index, pair, error))
+                if len(batch) >= self.batch_size and not await flush():
+                    logger.info(f"Job {job_id} cancelled after {rows_done} rows")
+                    self.stats["jobs_cancelled"] += 1
+                    return
+            if batch and not await flush():
+                self.stats["jobs_cancelled"] += 1
+                return
+
+        await asyncio.to_thread(self.store.finish, job_id, "completed")
+        self.stats["jobs_completed"] += 1
+        logger.info(f"Job {job_id} completed: {rows_done} rows, {errors} errors")
+
+    def read_results(self, job: dict, cursor: Optional[str] = None,
+                     limit: int = 100) -> Tuple[List[dict], Optional[str]]:
+        """
+        A page of results and the cursor of the next page (None at the end of the
+        checkpointed results). Cursors are opaque: they encode the job id and the byte
+        offset of a line start, and anything else raises InvalidResultsCursor.
+        """
+        offset = decode_results_cursor(job["id"], cursor) if cursor is not None else 0
+        # Only checkpointed results are complete
+        end = job["results_bytes"]
+        if offset > end:
+            raise InvalidResultsCursor(f"Invalid cursor: {cursor}")
+        if not os.path.exists(job["results_path"]):
+            return [], None
+        results = []
+        with open(job["results_path"], "rb") as f:
+            if offset > 0:
+                f.seek(offset - 1)
+                if f.read(1) != b"\n":
+                    raise InvalidResultsCursor(f"Invalid cursor: {cursor}")
+            while len(results) < limit and f.tell() < end:
+                results.append(json.loads(f.readline()))
+            next_cursor = encode_results_cursor(job["id"], f.tell()) if f.tell() < end else None
+        return results, next_cursor
+
+    def snapshot(self) -> Dict:
+        return {"workers": self.workers, "running": len(self._tasks), **self.stats}
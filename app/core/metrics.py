@@ -0,0 +1,258 @@
+# app/core/metrics.py
+"""
+In-process latency histograms and counters, rendered in the Prometheus text format.
+
+Stage latencies are kept twice: as cumulative buckets (scraped as a Prometheus
+histogram, aggregatable across workers) and as a sliding window of the most recent
+samples, from which exact p50/p95/p99 are reported. Stages are auth, rate_limit,
+tokenization, priority_forward/category_forward (multihead_forward for the shared
+encoder), post_processing and mongo_insert. Each worker process keeps its
+own registry, so a scrape sees the worker that served it; with the process
+inference executor, the classifier stages run in pool processes and are not
+recorded here.
+"""
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterable, List, Tuple
+
+# Upper bounds in seconds (last bucket is +Inf)
+LATENCY_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+QUANTILES = (0.5, 0.95, 0.99)
+WINDOW_SIZE = 2048
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def quantile(samples: List[float], q: float) -> float:
+    """Nearest-rank quantile of already sorted samples."""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))]
+
+
+class _Series:
+    """Bucket counts, sum and a window of recent samples for one label set."""
+
+    def __init__(self, buckets: List[float], window: int):
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+
+class LatencyHistogram:
+    """Thread-safe latency histogram with one series per stage label."""
+
+    def __init__(self, name: str, help: str, label: str = "stage",
+                 buckets: List[float] = LATENCY_BUCKETS, window: int = WINDOW_SIZE):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = list(buckets)
+        self.window = window
+        self._series: Dict[str, _Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, seconds: float):
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(self.buckets, self.window)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series.counts[i] += 1
+                    break
+            else:
+                series.counts[-1] += 1
+            series.sum += seconds
+            series.count += 1
+            series.recent.append(seconds)
+
+    @contextmanager
+    def time(self, key: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(key, time.perf_counter() - started)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Count, mean and p50/p95/p99 (milliseconds, over the recent window) per key."""
+        with self._lock:
+            items = [(key, s.count, s.sum, sorted(s.recent)) for key, s in self._series.items()]
+        return {
+            key: {
+                "count": count,
+                "mean_ms": round(total / count * 1000, 3) if count else 0.0,
+                **{f"p{int(q * 100)}_ms": round(quantile(recent, q) * 1000, 3) for q in QUANTILES}
+            }
+            for key, count, total, recent in sorted(items)
+        }
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(s.counts), s.sum, s.count, sorted(s.recent))
+                     for key, s in sorted(self._series.items())]
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, counts, total, count, _ in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + [math.inf], counts):
+                cumulative += bucket_count
+                labels = _format_labels({self.label: key, "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels({self.label: key})
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+
+        window_name = f"{self.name}_window"
+        lines += [
+            f"# HELP {window_name} {self.help} (quantiles over the last {self.window} samples)",
+            f"# TYPE {window_name} summary",
+        ]
+        for key, _, total, count, recent in items:
+            for q in QUANTILES:
+                labels = _format_labels({self.label: key, "quantile": str(q)})
+                lines.append(f"{window_name}{labels} {_format_value(quantile(recent, q))}")
+            labels = _format_labels({self.label: key})
+            lines.append(f"{window_name}_sum{labels} {_format_value(sum(recent))}")
+            lines.append(f"{window_name}_count{labels} {len(recent)}")
+        return lines
+
+
+class Counter:
+    """Thread-safe monotonic counter with a single label."""
+
+    def __init__(self, name: str, help: str, label: str):
+        self.name = name
+        self.help = help
+        self.label = label
+        self._values: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, key: str, amount: float = 1):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.snapshot().items()):
+            lines.append(f"{self.name}{_format_labels({self.label: key})} {_format_value(value)}")
+        return lines
+
+
+Sample = Tuple[Dict[str, str], float]
+
+
+def render_samples(name: str, kind: str, help: str, samples: Iterable[Sample]) -> List[str]:
+    """One metric family from (labels, value) pairs collected at scrape time."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples]
+    return lines
+
+
+def render_bucket_histogram(name: str, help: str, histogram) -> List[str]:
+    """Render a batcher.Histogram (non-cumulative counts) as a Prometheus histogram."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} histogram"]
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + [math.inf], histogram.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_format_labels({'le': _format_value(bound)})} {cumulative}")
+    lines.append(f"{name}_sum {_format_value(histogram.sum)}")
+    lines.append(f"{name}_count {histogram.total}")
+    return lines
+
+
+class Registry:
+    """Static metrics plus callbacks that render gauges from live objects at scrape time."""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[str]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for collector in self._collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_LATENCY = REGISTRY.register(LatencyHistogram(
+    "triage_stage_latency_seconds", "Latency of each hot-path stage in seconds"
+))
+REQUEST_LATENCY = REGISTRY.register(LatencyHistogram(
+    "triage_request_latency_seconds", "End-to-end HTTP request latency in seconds", label="route"
+))
+ERRORS = REGISTRY.register(Counter(
+    "triage_errors_total", "Errors by stage", label="stage"
+))
+REQUESTS = REGISTRY.register(Counter(
+    "triage_http_requests_total", "HTTP responses by status code", label="status"
+))
+
+
+def stage_timer(stage: str):
+    """Context manager recording the block's duration under the given stage."""
+    return STAGE_LATENCY.time(stage)
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware timing each request (until its response completes) per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.observe(
+                f"{scope['method']} {getattr(route, 'path', 'unmatched')}",
+                time.perf_counter() - started
+            )
+            REQUESTS.inc(str(status["code"]))
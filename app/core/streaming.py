@@ -0,0 +1,154 @@
+# app/core/streaming.py
+"""
+Incremental parsing of streamed request bodies.
+
+Only the current (partial) line or CSV record is held in memory, so uploads of
+any size are processed with bounded memory. spool_upload keeps a whole body on
+disk for handlers that must finish reading it before they respond.
+"""
+import asyncio
+import csv
+import json
+import tempfile
+from typing import IO, AsyncIterator, Dict, List, Optional, Union
+
+# Upper bound on one CSV record; a stray quote would otherwise join every later line into it
+MAX_RECORD_CHARS = 1_000_000
+# Upper bound on one physical line; a body without newlines would otherwise be buffered whole
+MAX_LINE_BYTES = 1_000_000
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """The request body is over the configured size limit."""
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes],
+    max_line_bytes: Optional[int] = None
+) -> AsyncIterator[Union[bytes, ValueError]]:
+    """
+    Split a byte stream into lines (without the trailing newline). A line longer than
+    max_line_bytes (default MAX_LINE_BYTES) yields a ValueError in its place and is
+    skipped up to the next newline.
+    """
+    max_line_bytes = max_line_bytes or MAX_LINE_BYTES
+    parts: List[bytes] = []
+    size = 0
+    skipping = False
+    too_long = f"Line over {max_line_bytes} bytes"
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            piece = chunk[start:] if end < 0 else chunk[start:end]
+            if not skipping:
+                size += len(piece)
+                if size > max_line_bytes:
+                    parts, size, skipping = [], 0, True
+                    yield ValueError(too_long)
+                else:
+                    parts.append(piece)
+            if end < 0:
+                break
+            if not skipping:
+                yield b"".join(parts)
+            parts, size, skipping = [], 0, False
+            start = end + 1
+    if parts:
+        yield b"".join(parts)
+
+
+async def spool_upload(chunks: AsyncIterator[bytes], max_bytes: int) -> IO[bytes]:
+    """
+    Write a whole request body to an anonymous temporary file, off the event loop, and
+    return it rewound. Raises UploadTooLarge past max_bytes.
+    """
+    spool = tempfile.TemporaryFile()
+    try:
+        size = 0
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(f"Upload over {max_bytes} bytes")
+            await asyncio.to_thread(spool.write, chunk)
+        await asyncio.to_thread(spool.seek, 0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+
+async def iter_file_chunks(f: IO[bytes]) -> AsyncIterator[bytes]:
+    """Read an open binary file in chunks off the event loop."""
+    while True:
+        chunk = await asyncio.to_thread(f.read, READ_CHUNK_BYTES)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Union[dict, ValueError]]:
+    """One JSON object per non-empty line; malformed or oversized lines yield a ValueError instead."""
+    async for line in iter_lines(chunks):
+        if isinstance(line, ValueError):
+            yield ValueError(f"Invalid JSON: {line}")
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"Invalid JSON: {e}")
+            continue
+        yield record if isinstance(record, dict) else ValueError("Invalid JSON: expected a JSON object")
+
+
+async def iter_csv_records(
+    chunks: AsyncIterator[bytes],
+    encoding: str = "utf-8-sig",
+    max_record_chars: int = MAX_RECORD_CHARS
+) -> AsyncIterator[Union[Dict[str, str], ValueError]]:
+    """
+    Rows of a CSV stream as dicts keyed by its header row.
+
+    Quoted fields may span lines: physical lines are joined until the record holds an
+    even number of quote characters (escaped quotes are doubled, so this stays exact).
+    A record that grows past max_record_chars (e.g. an unbalanced quote), or holds a
+    line over MAX_LINE_BYTES, yields a ValueError in its place and parsing resumes at
+    the next line.
+    """
+    header = None
+    parts: List[str] = []
+    size = quotes = 0
+    first = True
+    async for raw in iter_lines(chunks):
+        if isinstance(raw, ValueError):
+            parts, size, quotes = [], 0, 0
+            if header is not None:
+                yield ValueError(f"Invalid CSV record: {raw}")
+            continue
+        line = raw.decode(encoding if first else "utf-8")
+        first = False
+        parts.append(line)
+        size += len(line) + 1
+        quotes += line.count('"')
+        if quotes % 2:
+            if size > max_record_chars:
+                parts, size, quotes = [], 0, 0
+                if header is not None:
+                    yield ValueError(f"Invalid CSV record: unbalanced quote, over {max_record_chars} characters")
+            continue
+        text = "\n".join(parts).rstrip("\r")
+        parts, size, quotes = [], 0, 0
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        yield dict(zip(header, values))
+    if parts and header is not None:
+        text = "\n".join(parts)
+        if text.strip():
+            yield dict(zip(header, next(csv.reader([text]))))
@@ -0,0 +1,280 @@
+# app/db/bulk.py
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from bson import json_util
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from app.core.metrics import ERRORS, stage_timer
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+
+def _duplicate_id(error: dict) -> bool:
+    return error.get("code") == DUPLICATE_KEY and (
+        list(error.get("keyPattern") or {}) == ["_id"] or "_id_" in error.get("errmsg", "")
+    )
+
+
+async def insert_documents(collection, docs: List[dict], chunk_size: int = 500) -> Tuple[int, List[Dict]]:
+    """
+    Insert docs with unordered insert_many calls of at most chunk_size documents.
+    Returns (inserted count, per-document failures as {"index", "error", "retryable", "duplicate_id"}
+    relative to docs). Write errors (e.g. duplicate keys) are final; connection-level errors are
+    retryable. duplicate_id marks documents whose _id is already stored.
+    """
+    inserted = 0
+    failures: List[Dict] = []
+    for offset in range(0, len(docs), chunk_size):
+        chunk = docs[offset:offset + chunk_size]
+        try:
+            with stage_timer("mongo_insert"):
+                result = await collection.insert_many(chunk, ordered=False)
+            inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            ERRORS.inc("mongo_insert")
+            # Unordered: everything except the reported documents was written
+            write_errors = e.details.get("writeErrors", [])
+            inserted += e.details.get("nInserted", len(chunk) - len(write_errors))
+            for error in write_errors:
+                failures.append({
+                    "index": offset + error["index"],
+                    "error": error.get("errmsg", "write error"),
+                    "retryable": False,
+                    "duplicate_id": _duplicate_id(error)
+                })
+        except PyMongoError as e:
+            ERRORS.inc("mongo_insert")
+            failures.extend(
+                {"index": offset + i, "error": str(e), "retryable": True, "duplicate_id": False}
+                for i in range(len(chunk))
+            )
+    return inserted, failures
+
+
+class TicketSpool:
+    """
+    Append-only NDJSON file holding documents that could not be written to Mongo yet.
+    For a replay the file is moved aside to <path>.replay and removed once replayed; a
+    replay file left behind by a crash is picked up again before the spool itself.
+    Only this process writes them, so the document counts are read once and then kept in memory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.replay_path = f"{path}.replay"
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._count = self._count_lines(path)
+        self._replay_count = self._count_lines(self.replay_path)
+
+    @staticmethod
+    def _count_lines(path: str) -> int:
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return 0
+        with open(path, "rb") as f:
+            return sum(1 for line in f if line.strip())
+
+    def append(self, docs: List[dict]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for doc in docs:
+                f.write(json_util.dumps(doc) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._count += len(docs)
+
+    def __len__(self) -> int:
+        """Documents waiting in the spool and in an unfinished replay file."""
+        return self._count + self._replay_count
+
+    def take(self) -> Optional[str]:
+        """
+        The file to replay, if any: an unfinished replay file first, otherwise the spool,
+        atomically moved aside. Call done() once it has been read in full.
+        """
+        if os.path.exists(self.replay_path):
+            return self.replay_path
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return None
+        os.replace(self.path, self.replay_path)
+        self._replay_count, self._count = self._count, 0
+        return self.replay_path
+
+    def done(self):
+        """Remove the replay file after every document in it was written or re-spooled."""
+        os.remove(self.replay_path)
+        self._replay_count = 0
+
+    @staticmethod
+    def read(path: str, chunk_size: int):
+        batch = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    batch.append(json_util.loads(line))
+                if len(batch) >= chunk_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+
+class WriteBehindBuffer:
+    """
+    Groups single-document saves into insert_many calls.
+
+    Documents are buffered in memory and flushed when max_size is reached or
+    every flush_interval seconds, whichever comes first. With a spool_path,
+    documents that cannot be written because Mongo is unreachable are appended
+    to a durable local spool instead of being dropped; while Mongo is down the
+    buffer pings it every reconnect_interval seconds and replays the spool once
+    it is back (documents carry their _id, so replays are idempotent).
+    """
+
+    def __init__(
+        self,
+        collection,
+        max_size: int = 100,
+        flush_interval: float = 1.0,
+        chunk_size: int = 500,
+        spool_path: Optional[str] = None,
+        available: bool = True,
+        reconnect_interval: float = 5.0,
+        on_reconnect: Optional[Callable[[], None]] = None,
+        on_unavailable: Optional[Callable[[], None]] = None,
+        on_inserted: Optional[Callable[[List[dict]], Awaitable[None]]] = None
+    ):
+        self.collection = collection
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.chunk_size = chunk_size
+        self.spool = TicketSpool(spool_path) if spool_path else None
+        self.available = available
+        self.reconnect_interval = reconnect_interval
+        self.on_reconnect = on_reconnect
+        self.on_unavailable = on_unavailable
+        self.on_inserted = on_inserted
+        self._buffer: List[dict] = []
+        self._lock = asyncio.Lock()
+        self._task = None
+        self._last_ping = 0.0
+        self.stats = {"buffered": 0, "flushes": 0, "inserted": 0, "failed": 0, "spooled": 0, "replayed": 0}
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def add(self, doc: dict):
+        self._buffer.append(doc)
+        self.stats["buffered"] += 1
+        if len(self._buffer) >= self.max_size:
+            await self.flush()
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def _spool(self, docs: List[dict]):
+        if self.spool is None:
+            for doc in docs:
+                logger.error(f"Dropping ticket {doc.get('_id')}: database unavailable and no spool configured")
+            self.stats["failed"] += len(docs)
+            return
+        self.spool.append(docs)
+        self.stats["spooled"] += len(docs)
+
+    async def _write(self, docs: List[dict]) -> List[dict]:
+        """Insert docs; returns those that should be retried later."""
+        inserted, failures = await insert_documents(self.collection, docs, self.chunk_size)
+        retry = []
+        failed = set()
+        for failure in failures:
+            doc = docs[failure["index"]]
+            if failure["duplicate_id"]:
+                # Written by an earlier attempt that was cut off before it was acknowledged
+                inserted += 1
+            elif failure["retryable"]:
+                retry.append(doc)
+                failed.add(failure["index"])
+            else:
+                self.stats["failed"] += 1
+                failed.add(failure["index"])
+                logger.error(f"Write-behind insert failed for {doc.get('_id')}: {failure['error']}")
+        self.stats["inserted"] += inserted
+        if retry:
+            logger.warning(f"Mongo unavailable, spooling {len(retry)} tickets")
+            if self.available:
+                self.available = False
+                if self.on_unavailable is not None:
+                    self.on_unavailable()
+        if self.on_inserted is not None and inserted:
+            await self.on_inserted([doc for i, doc in enumerate(docs) if i not in failed])
+        return retry
+
+    async def flush(self):
+        async with self._lock:
+            if not self._buffer:
+                return
+            docs, self._buffer = self._buffer, []
+            self.stats["flushes"] += 1
+            if not self.available:
+                self._spool(docs)
+                return
+            retry = await self._write(docs)
+            if retry:
+                self._spool(retry)
+
+    async def replay_spool(self):
+        """Re-insert spooled documents; whatever still fails goes back into the spool."""
+        if self.spool is None:
+            return
+        async with self._lock:
+            replay_path = self.spool.take()
+            if replay_path is None:
+                return
+            logger.info(f"Replaying spooled tickets from {replay_path}")
+            for batch in TicketSpool.read(replay_path, self.chunk_size):
+                retry = await self._write(batch) if self.available else batch
+                if retry:
+                    self._spool(retry)
+                self.stats["replayed"] += len(batch) - len(retry)
+            self.spool.done()
+
+    async def _check_connection(self) -> bool:
+        loop = asyncio.get_running_loop()
+        if loop.time() - self._last_ping < self.reconnect_interval:
+            return False
+        self._last_ping = loop.time()
+        try:
+            await self.collection.database.client.admin.command("ping")
+        except Exception:
+            return False
+        logger.info("Mongo reachable again")
+        self.available = True
+        if self.on_reconnect is not None:
+            self.on_reconnect()
+        return True
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                if not self.available:
+                    await self._check_connection()
+                if self.available and self.spool is not None and len(self.spool):
+                    await self.replay_spool()
+            except Exception as e:
+                logger.error(f"Write-behind flush failed: {e}")
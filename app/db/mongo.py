@@ -1,24 +1,116 @@
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient, ASCENDING, DESCENDING, IndexModel
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
 from pymongo.database import Database
 from app.core.config import settings
-from typing import Optional 
+from typing import Dict, Optional
+from urllib.parse import urlparse
 
 _client: Optional[MongoClient] = None  # Fixed: Optional and MongoClient spelling
-_db: Optional[Database] = None 
+_db: Optional[Database] = None
+_async_client: Optional[AsyncMongoClient] = None
+_async_db: Optional[AsyncDatabase] = None
+_async_collections: Dict[str, AsyncCollection] = {}
+
+# Database name comes from the URI path, parsed once
+DB_NAME = urlparse(settings.MONGO_URI).path.strip("/") or "client_success_db"
+
+# Indexes on classified_tickets backing the ticket queries and dashboard filters.
+# Filtered lookups sort by classification_timestamp, so it is the trailing key of each
+# compound index. Names are fixed so docker/mongo-init/init.js creates identical indexes.
+CLASSIFIED_TICKET_INDEXES = [
+    IndexModel([("classification_timestamp", DESCENDING), ("_id", DESCENDING)], name="ts_desc"),
+    IndexModel(
+        [("client_id", ASCENDING), ("classification_timestamp", DESCENDING), ("_id", DESCENDING)],
+        name="client_ts"
+    ),
+    IndexModel(
+        [("predicted_priority", ASCENDING), ("classification_timestamp", DESCENDING), ("_id", DESCENDING)],
+        name="priority_ts"
+    ),
+    IndexModel(
+        [("predicted_category", ASCENDING), ("classification_timestamp", DESCENDING), ("_id", DESCENDING)],
+        name="category_ts"
+    ),
+    IndexModel(
+        [("status", ASCENDING), ("classification_timestamp", DESCENDING), ("_id", DESCENDING)],
+        name="status_ts"
+    ),
+    IndexModel(
+        [("cluster_id", ASCENDING), ("classification_timestamp", DESCENDING), ("_id", DESCENDING)],
+        name="cluster_ts"
+    ),
+    # Near-duplicates only (see app.db.tickets.duplicate_clusters)
+    IndexModel(
+        [("classification_timestamp", DESCENDING)],
+        name="duplicates_ts",
+        partialFilterExpression={"duplicate_of": {"$type": "string"}}
+    ),
+]
+
+
+def client_options() -> dict:
+    """Connection pool, timeout and compression options from Settings."""
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS or None,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS or None,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS or None,
+    }
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    return options
 
 def get_client() -> MongoClient:  # Fixed: MongoClient spelling
     """Get MongoDB client instance (singleton pattern)."""
     global _client
     if _client is None:
-        _client = MongoClient(settings.MONGO_URI)  # Fixed: settings spelling
+        _client = MongoClient(settings.MONGO_URI, **client_options())  # Fixed: settings spelling
     return _client
 
-def get_db():
-    # Extract database name from URI or use a default
-    from urllib.parse import urlparse
-    parsed = urlparse(settings.MONGO_URI)
-    db_name = parsed.path.strip("/") or "client_success_db"
-    return _client[db_name]  # ← This is the fix
+def get_db() -> Database:
+    """Get the (cached) application database."""
+    global _db
+    if _db is None:
+        _db = get_client()[DB_NAME]
+    return _db
+
+def get_async_client() -> AsyncMongoClient:
+    """Get the asyncio MongoDB client used by request handlers (singleton pattern)."""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncMongoClient(settings.MONGO_URI, **client_options())
+    return _async_client
+
+def get_async_db() -> AsyncDatabase:
+    """Get the (cached) application database on the asyncio client."""
+    global _async_db
+    if _async_db is None:
+        _async_db = get_async_client()[DB_NAME]
+    return _async_db
+
+def get_async_collection(name: str) -> AsyncCollection:
+    """Get a cached collection handle on the asyncio client."""
+    collection = _async_collections.get(name)
+    if collection is None:
+        collection = _async_collections[name] = get_async_db()[name]
+    return collection
+
+async def ensure_indexes():
+    """Create the classified_tickets indexes; a no-op when they already exist."""
+    await get_async_collection("classified_tickets").create_indexes(CLASSIFIED_TICKET_INDEXES)
+
+async def close_async_db():
+    """Close the asyncio MongoDB connection."""
+    global _async_client, _async_db
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+        _async_db = None
+        _async_collections.clear()
 
 def close_db():
     """Close MongoDB connection."""
@@ -26,4 +118,4 @@ def close_db():
     if _client is not None:
         _client.close()
         _client = None
-        _db = None
\ No newline at end of file
+        _db = None
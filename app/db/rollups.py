@@ -0,0 +1,106 @@
+# app/db/rollups.py
+"""
+Incremental per-minute/per-hour ticket counts.
+
+Every stored ticket increments one counter per granularity in the ticket_rollups
+collection, keyed by (granularity, bucket, client_id, priority, category). A
+question like "Critical Technical tickets in the last hour per client" then reads
+at most 60 minute buckets per client instead of scanning classified_tickets.
+Minute rollups expire after ROLLUP_MINUTE_RETENTION_HOURS via a TTL index; hour
+rollups are kept. scripts/rebuild_rollups.py recomputes everything from scratch.
+"""
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ASCENDING, IndexModel, UpdateOne
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("minute", "hour")
+KEY_FIELDS = ("granularity", "bucket", "client_id", "priority", "category")
+GROUP_FIELDS = ("client_id", "priority", "category")
+UNKNOWN = "unknown"
+
+ROLLUP_INDEXES = [
+    IndexModel([(field, ASCENDING) for field in KEY_FIELDS], name="rollup_key", unique=True),
+    # Documents without expires_at (hour rollups) never expire
+    IndexModel([("expires_at", ASCENDING)], name="rollup_ttl", expireAfterSeconds=0),
+]
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    if granularity == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup granularity: {granularity}")
+
+
+def rollup_increments(docs: Iterable[dict]) -> Counter:
+    """Count classified ticket documents per rollup key."""
+    counts: Counter = Counter()
+    for doc in docs:
+        timestamp = doc.get("classification_timestamp") or datetime.utcnow()
+        labels = (
+            doc.get("client_id") or UNKNOWN,
+            doc.get("predicted_priority") or UNKNOWN,
+            doc.get("predicted_category") or UNKNOWN
+        )
+        for granularity in GRANULARITIES:
+            counts[(granularity, bucket_start(timestamp, granularity)) + labels] += 1
+    return counts
+
+
+async def ensure_rollup_indexes(collection):
+    await collection.create_indexes(ROLLUP_INDEXES)
+
+
+async def record_tickets(collection, docs: List[dict], minute_retention_hours: int = 48):
+    """Add stored tickets to the rollups; errors are logged, never raised to the caller."""
+    if not docs:
+        return
+    operations = []
+    for key, count in rollup_increments(docs).items():
+        update = {"$inc": {"count": count}}
+        if key[0] == "minute":
+            update["$setOnInsert"] = {"expires_at": key[1] + timedelta(hours=minute_retention_hours)}
+        operations.append(UpdateOne(dict(zip(KEY_FIELDS, key)), update, upsert=True))
+    try:
+        await collection.bulk_write(operations, ordered=False)
+    except Exception as e:
+        logger.warning(f"Rollup update failed for {len(docs)} tickets: {e}")
+
+
+async def query_rollups(
+    collection,
+    granularity: str,
+    since: datetime,
+    until: Optional[datetime] = None,
+    filters: Optional[Dict[str, str]] = None,
+    group_by: Tuple[str, ...] = ()
+) -> List[dict]:
+    """
+    Sum rollup counts over [since, until), grouped by any of client_id/priority/category
+    (and "bucket" for a time series). Reads only the rollup documents in range.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown rollup granularity: {granularity}")
+    unknown = set(group_by) - set(GROUP_FIELDS) - {"bucket"}
+    if unknown:
+        raise ValueError(f"Cannot group rollups by: {', '.join(sorted(unknown))}")
+
+    time_range = {"$gte": bucket_start(since, granularity)}
+    if until is not None:
+        time_range["$lt"] = until
+    match = {"granularity": granularity, "bucket": time_range}
+    match.update({field: value for field, value in (filters or {}).items() if value is not None})
+
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": {field: f"${field}" for field in group_by}, "count": {"$sum": "$count"}}},
+        {"$sort": {"count": -1}}
+    ]
+    rows = await (await collection.aggregate(pipeline)).to_list(length=None)
+    return [{**(row["_id"] or {}), "count": row["count"]} for row in rows]
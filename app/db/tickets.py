@@ -0,0 +1,197 @@
+# app/db/tickets.py
+import base64
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+# Query parameters -> classified_tickets fields
+FILTER_FIELDS = {
+    "client_id": "client_id",
+    "priority": "predicted_priority",
+    "category": "predicted_category",
+    "status": "status",
+    "cluster_id": "cluster_id"
+}
+
+BUCKET_UNITS = ("minute", "hour", "day", "week", "month")
+
+# Newest first; _id breaks timestamp ties so the order is total
+SORT = [("classification_timestamp", -1), ("_id", -1)]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(doc: dict) -> str:
+    raw = f"{doc['classification_timestamp'].isoformat()}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        timestamp, object_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(timestamp), ObjectId(object_id)
+    except (ValueError, InvalidId) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def build_filter(
+    filters: Dict[str, Optional[str]],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> dict:
+    """Equality filters plus a half-open [since, until) range on classification_timestamp."""
+    query = {FILTER_FIELDS[name]: value for name, value in filters.items() if value is not None}
+    time_range = {}
+    if since is not None:
+        time_range["$gte"] = since
+    if until is not None:
+        time_range["$lt"] = until
+    if time_range:
+        query["classification_timestamp"] = time_range
+    return query
+
+
+def _counts(rows: List[dict]) -> Dict[str, int]:
+    return {row["_id"] if row["_id"] is not None else "unknown": row["count"] for row in rows}
+
+
+def _serialize(doc: dict) -> dict:
+    doc["id"] = str(doc.pop("_id"))
+    return doc
+
+
+async def find_tickets(
+    collection,
+    query: dict,
+    limit: int,
+    cursor: Optional[str] = None,
+    include_description: bool = False
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of tickets, newest first, and the cursor of the next page (None on the last).
+
+    Keyset pagination: the cursor holds the (classification_timestamp, _id) of the
+    last ticket returned, so each page is an index range scan no matter how deep it is.
+    """
+    if cursor is not None:
+        timestamp, object_id = decode_cursor(cursor)
+        after = {"$or": [
+            {"classification_timestamp": {"$lt": timestamp}},
+            {"classification_timestamp": timestamp, "_id": {"$lt": object_id}}
+        ]}
+        query = {"$and": [query, after]} if query else after
+
+    projection = None if include_description else {"description": 0}
+    docs = await collection.find(query, projection).sort(SORT).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+    return [_serialize(doc) for doc in docs[:limit]], next_cursor
+
+
+async def ticket_stats(collection, query: dict, bucket: str = "hour") -> dict:
+    """Priority/category distributions and per-bucket counts, computed in one aggregation."""
+    if bucket not in BUCKET_UNITS:
+        raise ValueError(f"Unknown bucket unit: {bucket}")
+
+    pipeline = [
+        {"$match": query},
+        # Only the grouped fields flow into the facets
+        {"$project": {"_id": 0, "predicted_priority": 1, "predicted_category": 1, "classification_timestamp": 1}},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "priority": [
+                {"$group": {"_id": "$predicted_priority", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1}}
+            ],
+            "category": [
+                {"$group": {"_id": "$predicted_category", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1}}
+            ],
+            "timeline": [
+                {"$group": {
+                    "_id": {"$dateTrunc": {"date": "$classification_timestamp", "unit": bucket}},
+                    "count": {"$sum": 1}
+                }},
+                {"$sort": {"_id": 1}}
+            ]
+        }}
+    ]
+    result = (await (await collection.aggregate(pipeline)).to_list(length=1))[0]
+
+    return {
+        "total": result["total"][0]["count"] if result["total"] else 0,
+        "priority": _counts(result["priority"]),
+        "category": _counts(result["category"]),
+        "bucket": bucket,
+        "timeline": [{"start": row["_id"], "count": row["count"]} for row in result["timeline"]]
+    }
+
+
+# Only near-duplicates have duplicate_of set; the partial duplicates_ts index covers exactly those
+DUPLICATES = {"duplicate_of": {"$type": "string"}}
+
+
+async def duplicate_clusters(collection, query: dict, min_size: int = 2, limit: int = 50) -> List[dict]:
+    """
+    Near-duplicate clusters with at least min_size tickets matching the query, largest
+    first. A cluster's size counts its matching duplicates plus the ticket that opened
+    it when that ticket matches the query too; first_seen is the earliest matching one.
+
+    Only duplicates are grouped, read through the partial duplicates_ts index; the
+    tickets that opened the clusters are then fetched by _id for their subject and labels.
+    """
+    pipeline = [
+        {"$match": {**query, **DUPLICATES}},
+        {"$group": {
+            "_id": "$cluster_id",
+            "duplicates": {"$sum": 1},
+            "first_seen": {"$min": "$classification_timestamp"},
+            "last_seen": {"$max": "$classification_timestamp"}
+        }},
+        # The opener adds at most one, so this keeps every cluster that can reach min_size
+        {"$match": {"duplicates": {"$gte": min_size - 1}}},
+        {"$sort": {"duplicates": -1, "last_seen": -1}}
+    ]
+    rows = await (await collection.aggregate(pipeline)).to_list(length=None)
+    if len(rows) > limit:
+        # Only clusters within one of the limit-th largest can still make the cut
+        cutoff = rows[limit - 1]["duplicates"] - 1
+        rows = [row for row in rows if row["duplicates"] >= cutoff]
+
+    ids = [ObjectId(row["_id"]) for row in rows if ObjectId.is_valid(row["_id"])]
+    opened = {
+        str(doc["_id"]): doc
+        for doc in await collection.find(
+            {"_id": {"$in": ids}},
+            {"subject": 1, "predicted_priority": 1, "predicted_category": 1, "classification_timestamp": 1}
+        ).to_list(length=len(ids))
+    }
+    in_query = {
+        str(doc["_id"])
+        for doc in await collection.find({**query, "_id": {"$in": ids}}, {"_id": 1}).to_list(length=len(ids))
+    }
+
+    clusters = []
+    for row in rows:
+        first = opened.get(row["_id"], {})
+        size, first_seen = row["duplicates"], row["first_seen"]
+        if row["_id"] in in_query:
+            size += 1
+            first_seen = min(first_seen, first.get("classification_timestamp") or first_seen)
+        if size < min_size:
+            continue
+        clusters.append({
+            "cluster_id": row["_id"],
+            "size": size,
+            "first_seen": first_seen,
+            "last_seen": row["last_seen"],
+            "subject": first.get("subject"),
+            "priority": first.get("predicted_priority"),
+            "category": first.get("predicted_category")
+        })
+    clusters.sort(key=lambda cluster: (cluster["size"], cluster["last_seen"]), reverse=True)
+    return clusters[:limit]
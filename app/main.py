@@ -1,21 +1,48 @@
 # app/main.py
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 
 # Import config, db, classifier
 from app.core.config import settings
-from app.db.mongo import get_db, close_db
-from nlp_pipeline.models.bert_classifier import BERTTicketClassifier
+from app.db.mongo import get_async_db, get_async_collection, ensure_indexes, close_async_db
+from app.db.bulk import WriteBehindBuffer, insert_documents
+from app.db.rollups import ensure_rollup_indexes, query_rollups, record_tickets
+from app.core.batcher import MicroBatcher
+from app.core.executor import InferenceExecutor, InferenceQueueFull
+from app.core.cache import PredictionCache, ensure_cache_indexes
+from app.core.dedup import NearDuplicateIndex, seed_index
+from app.core.metrics import (
+    ERRORS, REGISTRY, REQUEST_LATENCY, STAGE_LATENCY, RequestMetricsMiddleware,
+    render_bucket_histogram, render_samples, stage_timer
+)
+from app.core.jobs import (
+    FORMATS, PRIORITIES, InvalidResultsCursor, JobManager, JobStore, job_progress, read_file_chunks
+)
+from app.core.streaming import (
+    UploadTooLarge, iter_csv_records, iter_file_chunks, iter_lines, iter_ndjson_records, spool_upload
+)
+from nlp_pipeline.models.registry import ModelRegistry, UnknownModelVersion
 
 # Security
 from app.api.v1.auth import get_api_key
 
 # Models
 from pydantic import BaseModel
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import asyncio
+import gc
+import math
+import os
+import json
+import time
+
+# The ML stack (torch, transformers) is imported lazily by the model loader
+if TYPE_CHECKING:
+    from nlp_pipeline.models.bert_classifier import BERTTicketClassifier
 
 # -------------------------------
 # Initialize FastAPI App
@@ -29,9 +56,48 @@ app = FastAPI(
 # -------------------------------
 # Rate Limiting Setup
 # -------------------------------
-limiter = Limiter(key_func=get_remote_address)
+class TimedLimiter(Limiter):
+    """Limiter that records the time spent checking limits as the rate_limit stage."""
+
+    def _check_request_limit(self, *args, **kwargs):
+        with stage_timer("rate_limit"):
+            return super()._check_request_limit(*args, **kwargs)
+
+
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+    """
+    slowapi's 429 plus a Retry-After for the time left in the limit's window, so clients
+    can wait it out instead of retrying blind. (headers_enabled would add it too, but
+    needs a Response parameter on every rate-limited endpoint.)
+    """
+    response = _rate_limit_exceeded_handler(request, exc)
+    view_limit = getattr(request.state, "view_rate_limit", None)
+    if view_limit is not None and "Retry-After" not in response.headers:
+        try:
+            reset_at, _ = limiter.limiter.get_window_stats(view_limit[0], *view_limit[1])
+        except Exception as e:
+            print(f"⚠️  Could not read the rate limit window: {e}")
+        else:
+            response.headers["Retry-After"] = str(max(1, math.ceil(reset_at - time.time())))
+    return response
+
+
+limiter = TimedLimiter(key_func=get_remote_address)
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+
+
+# -------------------------------
+# Inference Backpressure
+# -------------------------------
+@app.exception_handler(InferenceQueueFull)
+async def inference_queue_full_handler(request: Request, exc: InferenceQueueFull):
+    ERRORS.inc("queue_full")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"Inference queue full - retry later ({exc})"},
+        headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER_SECONDS)}
+    )
 
 # -------------------------------
 # CORS Middleware (Optional)
@@ -43,11 +109,31 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so request latency covers CORS and every other middleware
+app.add_middleware(RequestMetricsMiddleware)
 
 # -------------------------------
 # Global Variables
 # -------------------------------
-classifier: BERTTicketClassifier
+classifier: Optional["BERTTicketClassifier"] = None
+batcher: Optional[MicroBatcher] = None
+inference_executor: Optional[InferenceExecutor] = None
+write_buffer: Optional[WriteBehindBuffer] = None
+# Set by app.serve before forking workers so they share one copy of the weights
+preloaded_classifier: Optional["BERTTicketClassifier"] = None
+prediction_cache: Optional[PredictionCache] = None
+job_manager: Optional[JobManager] = None
+# Model readiness (reported by /ready) and seconds spent per startup phase
+model_status = {"ready": False, "phase": "starting", "error": None}
+startup_timings: Dict[str, float] = {}
+model_loader: Optional[asyncio.Task] = None
+registry = ModelRegistry(settings.MODEL_REGISTRY_DIR)
+# Progress of the latest model hot swap (reported by GET /admin/models)
+model_swap = {"state": "idle", "version": None, "error": None, "timings": {}}
+swap_task: Optional[asyncio.Task] = None
+registry_watcher: Optional[asyncio.Task] = None
+duplicate_index: Optional[NearDuplicateIndex] = None
+dedup_seeder: Optional[asyncio.Task] = None
 
 # -------------------------------
 # Pydantic Models
@@ -62,20 +148,305 @@ class ClassificationResponse(BaseModel):
     priority_confidence: float
     category: str
     category_confidence: float
+    model_version: Optional[str] = None
+    stage: Optional[str] = None
+
+
+class BatchClassifyRequest(BaseModel):
+    items: List[ClassifyRequest]
+
+
+class BatchClassificationItem(BaseModel):
+    index: int
+    priority: Optional[str] = None
+    priority_confidence: Optional[float] = None
+    category: Optional[str] = None
+    category_confidence: Optional[float] = None
+    model_version: Optional[str] = None
+    stage: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchClassificationResponse(BaseModel):
+    results: List[BatchClassificationItem]
 
 
 # -------------------------------
 # Startup & Shutdown Events
 # -------------------------------
+def _model_artifacts(version: Optional[str] = None) -> dict:
+    """
+    Model paths for a registry version; defaults to the pinned MODEL_VERSION, else the
+    manifest's active version, else the unversioned models/artifacts layout.
+    """
+    version = version or settings.MODEL_VERSION or registry.active_version()
+    if version is None:
+        return {
+            "multihead_path": settings.MULTIHEAD_MODEL_PATH or None,
+            "onnx_dir": settings.ONNX_MODEL_DIR,
+            "cascade_path": settings.CASCADE_MODEL_PATH or None
+        }
+    paths = registry.artifact_paths(version)
+    paths["cascade_path"] = paths["cascade_path"] or settings.CASCADE_MODEL_PATH or None
+    return {**paths, "version": version}
+
+
+def load_classifier(version: Optional[str] = None) -> "BERTTicketClassifier":
+    from nlp_pipeline.models.bert_classifier import BERTTicketClassifier
+
+    return BERTTicketClassifier(
+        **_model_artifacts(version),
+        single_pass=settings.SINGLE_PASS_INFERENCE,
+        cascade_threshold=settings.CASCADE_THRESHOLD,
+        backend=settings.INFERENCE_BACKEND,
+        onnx_quantized=settings.ONNX_QUANTIZED,
+        onnx_threads=settings.ONNX_NUM_THREADS,
+        truncation_strategy=settings.TRUNCATION_STRATEGY,
+        max_length=settings.MAX_SEQ_LENGTH,
+        head_fraction=settings.TRUNCATION_HEAD_FRACTION,
+        subject_max_tokens=settings.SUBJECT_MAX_TOKENS
+    )
+
+
+async def _record_rollups(docs: List[dict]):
+    """Add stored tickets to the incremental per-minute/hour rollups."""
+    await record_tickets(
+        get_async_collection("ticket_rollups"), docs, settings.ROLLUP_MINUTE_RETENTION_HOURS
+    )
+
+
+def _interactive_busy() -> bool:
+    """True while /classify-style requests are waiting for inference; jobs back off meanwhile."""
+    return (
+        (batcher is not None and batcher.queue_depth > 0)
+        or (inference_executor is not None and inference_executor.pending > 0)
+    )
+
+
+def _import_ml_stack():
+    import torch  # noqa: F401
+    import transformers  # noqa: F401
+    from nlp_pipeline.models import bert_classifier  # noqa: F401
+
+
+async def _load_models(mongodb_available: bool):
+    """
+    Import the ML stack, load the classifier and run a warm-up inference, then bring up
+    the inference paths. Blocking steps run in a thread so the server keeps answering
+    /health and /ready meanwhile; classification endpoints return 503 until ready.
+    """
+    global classifier, batcher, prediction_cache, inference_executor, registry_watcher
+
+    def timed(phase: str, started: float):
+        startup_timings[phase] = round(time.perf_counter() - started, 3)
+
+    try:
+        if preloaded_classifier is not None:
+            # Weights were loaded by the pre-fork supervisor and are shared with this worker
+            loaded = preloaded_classifier
+            print("✅ Using pre-loaded BERT classifier")
+        else:
+            model_status["phase"] = "imports"
+            started = time.perf_counter()
+            await asyncio.to_thread(_import_ml_stack)
+            timed("imports", started)
+
+            model_status["phase"] = "loading"
+            print("🧠 Loading BERT ticket classifier...")
+            loaded = await asyncio.to_thread(load_classifier)
+            startup_timings.update({phase: round(seconds, 3) for phase, seconds in loaded.load_timings.items()})
+            print("✅ BERT classifier loaded successfully")
+
+        model_status["phase"] = "warmup"
+        started = time.perf_counter()
+        await asyncio.to_thread(loaded.warm_up)
+        timed("warmup", started)
+        # Attached after warm-up so throwaway inferences don't skew the stage latencies
+        loaded.stage_observer = STAGE_LATENCY.observe
+    except Exception as e:
+        model_status.update(phase="failed", error=str(e))
+        print(f"❌ Classifier loading failed: {e}")
+        raise
+
+    batcher, inference_executor, prediction_cache = await _build_inference(loaded, mongodb_available)
+    classifier = loaded
+    if job_manager is not None:
+        job_manager.start()
+    if settings.MODEL_REGISTRY_POLL_SECONDS > 0 and not settings.MODEL_VERSION:
+        registry_watcher = asyncio.create_task(_watch_registry())
+
+    model_status.update(ready=True, phase="ready")
+    print(f"✅ Ready ({', '.join(f'{phase} {seconds:.2f}s' for phase, seconds in startup_timings.items())})")
+
+
+async def _build_inference(loaded: "BERTTicketClassifier", mongodb_available: bool):
+    """
+    Micro-batcher, inference executor and prediction cache bound to one loaded classifier.
+    If any of them fails to build, the ones already started are stopped before re-raising.
+    """
+    new_batcher = new_executor = None
+    try:
+        if settings.MICROBATCH_ENABLED:
+            new_batcher = MicroBatcher(
+                loaded,
+                max_batch_size=settings.MICROBATCH_MAX_SIZE,
+                max_wait_ms=settings.MICROBATCH_MAX_WAIT_MS,
+                max_queue=settings.INFERENCE_MAX_QUEUE
+            )
+            new_batcher.start()
+
+        new_executor = InferenceExecutor(
+            loaded,
+            kind=settings.INFERENCE_EXECUTOR,
+            max_workers=settings.INFERENCE_WORKERS,
+            max_queue=settings.INFERENCE_MAX_QUEUE
+        )
+        new_cache = await _build_cache(loaded, mongodb_available)
+    except BaseException:
+        if new_batcher is not None:
+            await asyncio.to_thread(new_batcher.stop)
+        if new_executor is not None:
+            new_executor.shutdown()
+        raise
+    return new_batcher, new_executor, new_cache
+
+
+async def _build_cache(loaded: "BERTTicketClassifier", mongodb_available: bool) -> Optional[PredictionCache]:
+    """Prediction cache for one loaded classifier, with the Mongo tier when it is reachable."""
+    new_cache = None
+    if settings.CACHE_ENABLED:
+        cache_collection = None
+        if settings.CACHE_MONGO_ENABLED and mongodb_available:
+            try:
+                cache_collection = get_async_collection("prediction_cache")
+                await ensure_cache_indexes(cache_collection, settings.CACHE_TTL_SECONDS)
+            except Exception as e:
+                print(f"⚠️  Mongo prediction cache disabled: {e}")
+                cache_collection = None
+        # Keys include the model version, so entries of another version are never served
+        new_cache = PredictionCache(
+            model_version=loaded.model_version,
+            max_entries=settings.CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.CACHE_TTL_SECONDS,
+            collection=cache_collection
+        )
+    return new_cache
+
+
+async def _swap_models(version: str, persist: bool):
+    """
+    Hot-swap to another registry version without dropping capacity: load and warm up the
+    new model in a thread while the current one keeps serving, switch the globals in one
+    step (no await in between, so every request sees either the old or the new set), let
+    requests already holding the old batcher/executor finish, then release the old model.
+    """
+    global classifier, batcher, inference_executor, prediction_cache, preloaded_classifier
+
+    model_swap.update(state="loading", version=version, error=None, timings={})
+
+    def timed(phase: str, started: float):
+        model_swap["timings"][phase] = round(time.perf_counter() - started, 3)
+
+    try:
+        started = time.perf_counter()
+        loaded = await asyncio.to_thread(load_classifier, version)
+        timed("loading", started)
+
+        model_swap["state"] = "warmup"
+        started = time.perf_counter()
+        await asyncio.to_thread(loaded.warm_up)
+        loaded.stage_observer = STAGE_LATENCY.observe
+        timed("warmup", started)
+
+        new_batcher, new_executor, new_cache = await _build_inference(
+            loaded, getattr(app.state, "mongodb_available", False)
+        )
+    except Exception as e:
+        model_swap.update(state="failed", error=str(e))
+        print(f"❌ Loading model version {version} failed: {e}")
+        return
+
+    if persist:
+        try:
+            registry.set_active(version)
+        except (OSError, UnknownModelVersion) as e:
+            print(f"⚠️  Could not record {version} as the active version: {e}")
+
+    old_classifier, old_batcher, old_executor = classifier, batcher, inference_executor
+    classifier, batcher, inference_executor, prediction_cache = loaded, new_batcher, new_executor, new_cache
+    print(f"🔁 Swapped in model {loaded.model_version}")
+
+    # Drain: wait for requests queued on the old batcher/executor, bounded by the timeout
+    model_swap["state"] = "draining"
+    started = time.perf_counter()
+    deadline = time.monotonic() + settings.MODEL_DRAIN_TIMEOUT_SECONDS
+    while time.monotonic() < deadline and (
+        (old_batcher is not None and old_batcher.queue_depth > 0)
+        or (old_executor is not None and old_executor.pending > 0)
+    ):
+        await asyncio.sleep(0.05)
+    if old_batcher is not None:
+        await asyncio.to_thread(old_batcher.stop)
+    if old_executor is not None:
+        await asyncio.to_thread(old_executor.shutdown)
+    timed("draining", started)
+
+    # Drop the last references so the old weights can be freed right away
+    if preloaded_classifier is old_classifier:
+        preloaded_classifier = None
+    del old_classifier, old_batcher, old_executor
+    gc.collect()
+    model_swap["state"] = "done"
+
+
+def _start_swap(version: str, persist: bool) -> asyncio.Task:
+    global swap_task
+    swap_task = asyncio.create_task(_swap_models(version, persist))
+    return swap_task
+
+
+def _swap_running() -> bool:
+    return swap_task is not None and not swap_task.done()
+
+
+async def _watch_registry():
+    """Follow the manifest's active version, so every worker picks up a rollout."""
+    while True:
+        await asyncio.sleep(settings.MODEL_REGISTRY_POLL_SECONDS)
+        try:
+            active = registry.active_version()
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not read the model registry manifest: {e}")
+            continue
+        if (
+            active is not None and classifier is not None and not _swap_running()
+            and active != classifier.registry_version
+        ):
+            print(f"🔁 Registry active version changed to {active}, swapping")
+            await _start_swap(active, persist=False)
+
+
+async def _seed_duplicate_index():
+    """Index recent classified tickets, so clusters survive a restart."""
+    try:
+        count = await seed_index(
+            duplicate_index, get_async_collection("classified_tickets"), settings.DEDUP_SEED_LIMIT
+        )
+        print(f"✅ Near-duplicate index seeded with {count} recent tickets")
+    except Exception as e:
+        print(f"⚠️  Seeding the near-duplicate index failed: {e}")
+
+
 @app.on_event("startup")
-def startup_event():
-    global classifier
-    
+async def startup_event():
+    global write_buffer, job_manager, model_loader, duplicate_index, dedup_seeder
+
     # Try MongoDB connection
     mongodb_available = False
+    started = time.perf_counter()
     try:
-        db = get_db()
-        db.client.admin.command("ping")
+        db = get_async_db()
+        await db.client.admin.command("ping")
         print("✅ Connected to MongoDB")
         mongodb_available = True
     except Exception as e:
@@ -86,21 +457,88 @@ def startup_event():
         else:
             print("🔄 Continuing without MongoDB (ticket saving disabled)")
 
-    # Load classifier (this should work regardless of MongoDB)
-    try:
-        print("🧠 Loading BERT ticket classifier...")
-        classifier = BERTTicketClassifier()
-        print("✅ BERT classifier loaded successfully")
-    except Exception as e:
-        print(f"❌ Classifier loading failed: {e}")
-        raise
-    
+    if mongodb_available:
+        try:
+            await ensure_indexes()
+            await ensure_rollup_indexes(get_async_collection("ticket_rollups"))
+            print("✅ MongoDB indexes ensured")
+        except Exception as e:
+            print(f"⚠️  Index creation failed: {e}")
+    startup_timings["mongodb"] = round(time.perf_counter() - started, 3)
+
+    # Background writer for classify-and-store (and /tickets when write-behind is enabled).
+    # Tickets that cannot reach Mongo go to a local spool and are replayed on reconnect.
+    def on_reconnect():
+        app.state.mongodb_available = True
+
+    def on_unavailable():
+        app.state.mongodb_available = False
+
+    write_buffer = WriteBehindBuffer(
+        get_async_collection("classified_tickets"),
+        max_size=settings.WRITE_BEHIND_MAX_SIZE,
+        flush_interval=settings.WRITE_BEHIND_FLUSH_SECONDS,
+        chunk_size=settings.BULK_INSERT_CHUNK_SIZE,
+        spool_path=settings.TICKET_SPOOL_PATH or None,
+        available=mongodb_available,
+        reconnect_interval=settings.MONGO_RECONNECT_SECONDS,
+        on_reconnect=on_reconnect,
+        on_unavailable=on_unavailable,
+        on_inserted=_record_rollups
+    )
+    write_buffer.start()
+
+    if settings.DEDUP_ENABLED:
+        duplicate_index = NearDuplicateIndex(
+            threshold=settings.DEDUP_THRESHOLD,
+            num_perm=settings.DEDUP_NUM_PERM,
+            shingle_size=settings.DEDUP_SHINGLE_SIZE,
+            max_entries=settings.DEDUP_MAX_ENTRIES,
+            ttl_seconds=settings.DEDUP_WINDOW_SECONDS
+        )
+        if mongodb_available and settings.DEDUP_SEED_LIMIT > 0:
+            dedup_seeder = asyncio.create_task(_seed_duplicate_index())
+
+    if settings.JOBS_ENABLED:
+        job_manager = JobManager(
+            JobStore(settings.JOBS_DB_PATH),
+            get_classifier=lambda: classifier,
+            jobs_dir=settings.JOBS_DIR,
+            workers=settings.JOBS_WORKERS,
+            batch_size=settings.JOBS_BATCH_SIZE,
+            inference_batch_size=settings.INFERENCE_BATCH_SIZE,
+            inference_threads=settings.JOBS_INFERENCE_THREADS,
+            lease_seconds=settings.JOBS_LEASE_SECONDS,
+            poll_seconds=settings.JOBS_POLL_SECONDS,
+            interactive_busy=_interactive_busy
+        )
+
     # Store MongoDB status globally
     app.state.mongodb_available = mongodb_available
 
+    # Load the classifier (this should work regardless of MongoDB); job workers start once it is ready
+    if settings.BACKGROUND_MODEL_LOAD:
+        model_loader = asyncio.create_task(_load_models(mongodb_available))
+        # Failures are reported through /ready; retrieving the exception keeps asyncio quiet
+        model_loader.add_done_callback(lambda task: task.cancelled() or task.exception())
+    else:
+        await _load_models(mongodb_available)
+
 @app.on_event("shutdown")
-def shutdown_event():
-    close_db()
+async def shutdown_event():
+    for task in (model_loader, swap_task, registry_watcher, dedup_seeder):
+        if task is not None and not task.done():
+            task.cancel()
+    if batcher is not None:
+        batcher.stop()
+    if inference_executor is not None:
+        inference_executor.shutdown()
+    if job_manager is not None:
+        await job_manager.stop()
+        job_manager.store.close()
+    if write_buffer is not None:
+        await write_buffer.stop()
+    await close_async_db()
     print("💤 Database connections closed")
 
 
@@ -108,10 +546,10 @@ def shutdown_event():
 # Health & Status Endpoints
 # -------------------------------
 @app.get("/")
-def read_root():
+async def read_root():
     try:
-        db = get_db()
-        db.client.admin.command("ping")
+        db = get_async_db()
+        await db.client.admin.command("ping")
         db_status = "connected"
     except Exception as e:
         db_status = f"failed: {str(e)}"
@@ -126,43 +564,444 @@ def read_root():
 
 
 @app.get("/health")
-def health_check():
-    return {"status": "healthy"}
+async def health_check():
+    """Liveness: the process is up and serving (models may still be loading)."""
+    return {"status": "healthy", "mongodb_available": getattr(app.state, "mongodb_available", False)}
+
+
+@app.get("/ready")
+async def readiness_check(response: Response):
+    """
+    Readiness: 200 only once the models are loaded and a warm-up inference has run.
+    MongoDB is reported but does not gate readiness (tickets are spooled while it is down).
+    """
+    if not model_status["ready"]:
+        response.status_code = 503
+    return {
+        **model_status,
+        "mongodb_available": getattr(app.state, "mongodb_available", False),
+        "timings": startup_timings
+    }
+
+
+def _require_model():
+    if not model_status["ready"]:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Model not ready ({model_status['phase']})",
+            headers={"Retry-After": str(settings.INFERENCE_RETRY_AFTER_SECONDS)}
+        )
+
+
+# -------------------------------
+# Model Registry Admin
+# -------------------------------
+@app.get("/admin/models")
+@limiter.limit(settings.ADMIN_RATE_LIMIT)
+async def list_models(request: Request, api_key: str = Depends(get_api_key)):
+    """Registered versions, the manifest's active version, the loaded model and the last swap."""
+    manifest = registry.read_manifest()
+    return {
+        "registry_dir": settings.MODEL_REGISTRY_DIR,
+        "active": manifest["active"],
+        "pinned": settings.MODEL_VERSION or None,
+        "loaded": classifier.model_version if classifier is not None else None,
+        "loaded_version": classifier.registry_version if classifier is not None else None,
+        "versions": manifest["versions"],
+        "swap": model_swap
+    }
+
+
+@app.post("/admin/models/{version}/activate", status_code=202)
+@limiter.limit(settings.ADMIN_RATE_LIMIT)
+async def activate_model(
+    request: Request,
+    version: str,
+    persist: bool = Query(True, description="Also make it the manifest's active version (rolls out to all workers)"),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Load a registry version in the background and swap it in once warmed up.
+    Requests keep being served by the current model meanwhile; poll GET /admin/models.
+    """
+    _require_model()
+    if version not in registry.versions():
+        raise HTTPException(status_code=404, detail=f"Model version not registered: {version}")
+    if _swap_running():
+        raise HTTPException(status_code=409, detail=f"A swap to {model_swap['version']} is already running")
+    _start_swap(version, persist)
+    return {"status": "swapping", "version": version}
+
+
+@app.get("/metrics/batching")
+async def batching_metrics():
+    """Queue depth and batch-size histograms of the /classify micro-batcher."""
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
+
+
+@app.get("/metrics/cache")
+async def cache_metrics():
+    """Hit/miss counters of the prediction cache."""
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
+
+
+@app.get("/metrics/tokenization")
+async def tokenization_metrics():
+    """Truncation counts and padding efficiency of the classifier's tokenizers."""
+    _require_model()
+    return classifier.tokenization_stats()
+
+
+@app.get("/metrics/write-behind")
+async def write_behind_metrics():
+    """Buffered, flushed, failed and spooled counts of the ticket write-behind buffer."""
+    if write_buffer is None:
+        return {"enabled": False}
+    return {
+        "enabled": settings.WRITE_BEHIND_ENABLED,
+        "mongodb_available": write_buffer.available,
+        "pending": write_buffer.pending,
+        "spool_pending": len(write_buffer.spool) if write_buffer.spool is not None else 0,
+        **write_buffer.stats
+    }
+
+
+@app.get("/metrics/jobs")
+async def job_metrics():
+    """Completed, failed and cancelled counts of this process's job workers."""
+    if job_manager is None:
+        return {"enabled": False}
+    return {"enabled": True, **job_manager.snapshot()}
+
+
+@app.get("/metrics/executor")
+async def executor_metrics():
+    """Pending and rejected calls of the dedicated inference executor."""
+    _require_model()
+    return inference_executor.stats()
+
+
+@app.get("/metrics/cascade")
+async def cascade_metrics():
+    """Tickets answered by the TF-IDF first stage vs. escalated to BERT (this worker)."""
+    _require_model()
+    return classifier.routing_stats()
+
+
+@app.get("/metrics/dedup")
+async def dedup_metrics():
+    """Size, lookups and duplicate rate of the near-duplicate index (this worker)."""
+    if duplicate_index is None:
+        return {"enabled": False}
+    return {"enabled": True, **duplicate_index.stats()}
+
+
+@app.get("/metrics/latency")
+async def latency_metrics():
+    """Count, mean and p50/p95/p99 per hot-path stage and per route, plus error counts."""
+    return {
+        "stages": STAGE_LATENCY.summary(),
+        "routes": REQUEST_LATENCY.summary(),
+        "errors": ERRORS.snapshot()
+    }
+
+
+def _collect_metrics() -> List[str]:
+    """Gauges and counters read from the live components at scrape time."""
+    lines = render_samples("triage_model_ready", "gauge", "1 once the classifier is loaded and warmed up",
+                           [({}, int(model_status["ready"]))])
+    if classifier is not None and classifier.cascade is not None:
+        routing = classifier.routing_stats()
+        lines += render_samples("triage_cascade_routed_total", "counter", "Tickets answered per cascade stage",
+                                [({"stage": stage}, routing[stage]) for stage in ("fast", "bert")])
+        lines += render_samples("triage_cascade_fast_rate", "gauge", "Share of tickets answered without BERT",
+                                [({}, routing["fast_rate"])])
+    if batcher is not None:
+        lines += render_samples("triage_batcher_queue_depth", "gauge", "Tickets waiting for a micro-batch",
+                                [({}, batcher.queue_depth)])
+        lines += render_samples("triage_batches_total", "counter", "Micro-batches run",
+                                [({}, batcher.batches_run)])
+        lines += render_bucket_histogram("triage_batch_size", "Tickets per micro-batch", batcher.batch_sizes)
+    if inference_executor is not None:
+        stats = inference_executor.stats()
+        lines += render_samples("triage_executor_pending", "gauge", "Inference calls running or queued",
+                                [({}, stats["pending"])])
+        lines += render_samples("triage_executor_rejected_total", "counter", "Inference calls rejected as queue full",
+                                [({}, stats["rejected"])])
+    if prediction_cache is not None:
+        stats = prediction_cache.stats()
+        lines += render_samples("triage_cache_entries", "gauge", "Entries in the in-process prediction cache",
+                                [({}, stats["size"])])
+        lines += render_samples("triage_cache_events_total", "counter", "Prediction cache hits, misses and removals",
+                                [({"event": name}, value) for name, value in sorted(prediction_cache.counters.items())])
+    if duplicate_index is not None:
+        stats = duplicate_index.stats()
+        lines += render_samples("triage_dedup_entries", "gauge", "Tickets in the near-duplicate index",
+                                [({}, stats["size"])])
+        lines += render_samples("triage_dedup_events_total", "counter", "Near-duplicate lookups, matches and removals",
+                                [({"event": name}, value) for name, value in sorted(duplicate_index.counters.items())])
+    if write_buffer is not None:
+        lines += render_samples("triage_write_buffer_pending", "gauge", "Tickets buffered for the next insert",
+                                [({}, write_buffer.pending)])
+        lines += render_samples("triage_write_buffer_spooled", "gauge", "Tickets spooled while MongoDB is unavailable",
+                                [({}, len(write_buffer.spool) if write_buffer.spool is not None else 0)])
+        lines += render_samples("triage_write_buffer_events_total", "counter", "Write-behind buffer events",
+                                [({"event": name}, value) for name, value in sorted(write_buffer.stats.items())])
+    if job_manager is not None:
+        lines += render_samples("triage_jobs_running", "gauge", "Jobs being processed by this worker",
+                                [({}, job_manager.snapshot()["running"])])
+        lines += render_samples("triage_job_events_total", "counter", "Job completions, failures, cancellations and yields",
+                                [({"event": name}, value) for name, value in sorted(job_manager.stats.items())])
+    return lines
+
+
+REGISTRY.add_collector(_collect_metrics)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """All metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 # -------------------------------
 # Secure Classification Endpoint
 # -------------------------------
+def _is_truthy(value: Optional[str]) -> bool:
+    return value is not None and value.strip().lower() in ("1", "true", "yes")
+
+
+async def _classify_one(subject: str, description: str, x_cache_bypass: Optional[str]):
+    """Classify one ticket through the prediction cache; returns (result, X-Cache value)."""
+    # Bind one model's set up front: a hot swap can replace the globals at any await
+    cache, active_batcher, executor = prediction_cache, batcher, inference_executor
+    use_cache = cache is not None and not _is_truthy(x_cache_bypass)
+    if use_cache:
+        cached = await cache.get(subject, description)
+        if cached is not None:
+            return cached, "HIT"
+
+    if active_batcher is not None:
+        result = await active_batcher.classify_async(subject, description)
+    else:
+        result = await executor.classify(subject, description)
+    if use_cache:
+        await cache.set(subject, description, result)
+    return result, "MISS" if use_cache else "BYPASS"
+
+
 @app.post("/classify", response_model=ClassificationResponse)
 @limiter.limit("100/minute")
-def classify_ticket(
+async def classify_ticket(
     request: Request,
+    response: Response,
     body: ClassifyRequest,
-    api_key: str = Depends(get_api_key)
+    api_key: str = Depends(get_api_key),
+    x_cache_bypass: Optional[str] = Header(None)
 ):
     """
     Classify a support ticket into priority and category.
-    Uses BERT model loaded at startup.
+    Uses BERT model loaded at startup; concurrent calls are coalesced
+    into padded batches when micro-batching is enabled.
+    Send `X-Cache-Bypass: true` to skip the prediction cache entirely (no lookup, no write).
     """
+    _require_model()
     try:
-        result = classifier.classify(body.subject, body.description)
+        result, cache_status = await _classify_one(body.subject, body.description, x_cache_bypass)
+        response.headers["X-Cache"] = cache_status
         return result
+    except InferenceQueueFull:
+        raise
     except Exception as e:
+        ERRORS.inc("classification")
         raise HTTPException(
             status_code=500,
             detail=f"Classification failed: {str(e)}"
         )
 
 
+async def _classify_many(items: List[Tuple[str, str]], x_cache_bypass: Optional[str]) -> List[dict]:
+    """Classify (subject, description) pairs in input order, serving what it can from the cache."""
+    cache, executor = prediction_cache, inference_executor
+    use_cache = cache is not None and not _is_truthy(x_cache_bypass)
+    results: List[Optional[dict]] = await cache.get_many(items) if use_cache else [None] * len(items)
+    pending = [idx for idx, result in enumerate(results) if result is None]
+
+    if pending:
+        fresh = await executor.classify_batch(
+            [items[idx] for idx in pending],
+            batch_size=settings.INFERENCE_BATCH_SIZE
+        )
+        for idx, result in zip(pending, fresh):
+            results[idx] = result
+        if use_cache:
+            await cache.set_many([items[idx] for idx in pending], fresh)
+    return results
+
+
+@app.post("/classify/batch", response_model=BatchClassificationResponse)
+@limiter.limit(settings.BATCH_RATE_LIMIT)
+async def classify_ticket_batch(
+    request: Request,
+    body: BatchClassifyRequest,
+    api_key: str = Depends(get_api_key),
+    x_cache_bypass: Optional[str] = Header(None)
+):
+    """
+    Classify several support tickets in one call.
+    Tickets are tokenized together and run through each model once per chunk;
+    results come back in input order with per-item errors.
+    """
+    _require_model()
+    if not body.items:
+        raise HTTPException(status_code=422, detail="At least one ticket is required")
+    if len(body.items) > settings.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(body.items)} tickets (max {settings.MAX_BATCH_SIZE})"
+        )
+
+    try:
+        results = await _classify_many(
+            [(item.subject, item.description) for item in body.items], x_cache_bypass
+        )
+    except InferenceQueueFull:
+        raise
+    except Exception as e:
+        ERRORS.inc("classification")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch classification failed: {str(e)}"
+        )
+
+    return {
+        "results": [
+            {"index": idx, **result} for idx, result in enumerate(results)
+        ]
+    }
+
+
+def _stream_parser(request: Request):
+    content_type = request.headers.get("content-type", "")
+    if "csv" in content_type:
+        return iter_csv_records
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return iter_ndjson_records
+    raise HTTPException(
+        status_code=415,
+        detail="Send text/csv or application/x-ndjson"
+    )
+
+
+async def _classify_stream_batch(items: List[Tuple[str, str]], x_cache_bypass: Optional[str]) -> List[dict]:
+    # Streams cannot turn into a 503 halfway through, so wait for the queue instead
+    while True:
+        try:
+            return await _classify_many(items, x_cache_bypass)
+        except InferenceQueueFull:
+            await asyncio.sleep(settings.INFERENCE_RETRY_AFTER_SECONDS)
+        except Exception as e:
+            ERRORS.inc("classification")
+            return [{"error": f"Classification failed: {str(e)}"}] * len(items)
+
+
+@app.post("/classify/stream")
+@limiter.limit(settings.STREAM_RATE_LIMIT)
+async def classify_ticket_stream(
+    request: Request,
+    api_key: str = Depends(get_api_key),
+    x_cache_bypass: Optional[str] = Header(None)
+):
+    """
+    Classify a streamed upload and stream the results back.
+    The body is CSV (Content-Type: text/csv, with subject and description columns)
+    or NDJSON (application/x-ndjson). The upload is read in full first, spooled to a
+    temp file (up to MAX_STREAM_UPLOAD_BYTES), so ordinary clients that only read the
+    response after sending the body work at any size. Rows are then parsed
+    incrementally and classified STREAM_BATCH_SIZE at a time; each result is sent as
+    one NDJSON line {"index", "priority", ...} or {"index", "error"}, in input order,
+    followed by a final {"done": true, ...} summary line.
+    """
+    _require_model()
+    parse = _stream_parser(request)
+    try:
+        upload = await spool_upload(request.stream(), settings.MAX_STREAM_UPLOAD_BYTES)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=f"{e}; submit it as a job (POST /jobs)")
+    records = parse(iter_file_chunks(upload))
+
+    async def results():
+        started = time.perf_counter()
+        rows = errors = 0
+        # Rows that failed to parse stay in the batch as ready-made errors to keep input order
+        batch: List[Tuple[int, Optional[Tuple[str, str]], Optional[dict]]] = []
+
+        async def flush():
+            nonlocal errors
+            pairs = [pair for _, pair, _ in batch if pair is not None]
+            classified = iter(await _classify_stream_batch(pairs, x_cache_bypass) if pairs else [])
+            lines = []
+            for index, pair, error in batch:
+                result = next(classified) if pair is not None else error
+                errors += "error" in result
+                lines.append(json.dumps({"index": index, **result}))
+            batch.clear()
+            return "\n".join(lines) + "\n"
+
+        try:
+            async for record in records:
+                index = rows
+                rows += 1
+                if rows > settings.MAX_STREAM_ROWS:
+                    rows -= 1
+                    batch.append((index, None, {"error": f"Row limit reached ({settings.MAX_STREAM_ROWS})"}))
+                    break
+                if isinstance(record, ValueError):
+                    batch.append((index, None, {"error": str(record)}))
+                    continue
+                subject = str(record.get("subject") or "").strip()
+                description = str(record.get("description") or "").strip()
+                if not subject and not description:
+                    batch.append((index, None, {"error": "Missing subject and description"}))
+                    continue
+                batch.append((index, (subject, description), None))
+                if len(batch) >= settings.STREAM_BATCH_SIZE:
+                    yield await flush()
+
+            if batch:
+                yield await flush()
+
+            elapsed = time.perf_counter() - started
+            yield json.dumps({
+                "done": True,
+                "rows": rows,
+                "errors": errors,
+                "elapsed_seconds": round(elapsed, 3),
+                "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else None
+            }) + "\n"
+        finally:
+            upload.close()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
 # -------------------------------
 # Save Classified Ticket to MongoDB
 # -------------------------------
-from app.models.schemas import ClassifiedTicketCreate
+from app.models.schemas import ClassifiedTicketCreate, TicketCreate
 from pymongo.errors import PyMongoError
+from pydantic import ValidationError
+from bson import ObjectId
+from datetime import datetime, timedelta
+from app.db.tickets import InvalidCursor, build_filter, duplicate_clusters, find_tickets, ticket_stats
 
 @app.post("/tickets")
 @limiter.limit("50/minute")
-def save_ticket(
+async def save_ticket(
     request: Request,
     ticket: ClassifiedTicketCreate,
     api_key: str = Depends(get_api_key)
@@ -174,10 +1013,461 @@ def save_ticket(
             detail="Database unavailable - ticket classification works but saving is disabled"
         )
     
+    if settings.WRITE_BEHIND_ENABLED:
+        # Grouped into insert_many by the write-behind buffer; the id is assigned up front
+        doc = ticket.dict(by_alias=True)
+        doc["_id"] = ObjectId()
+        await write_buffer.add(doc)
+        return {"status": "queued", "inserted_id": str(doc["_id"])}
+
     try:
-        db = get_db()
-        collection = db["classified_tickets"]
-        result = collection.insert_one(ticket.dict(by_alias=True))
+        collection = get_async_collection("classified_tickets")
+        doc = ticket.dict(by_alias=True)
+        try:
+            with stage_timer("mongo_insert"):
+                result = await collection.insert_one(doc)
+        except PyMongoError:
+            ERRORS.inc("mongo_insert")
+            raise
+        await _record_rollups([doc])
         return {"status": "saved", "inserted_id": str(result.inserted_id)}
     except PyMongoError as e:
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@app.post("/tickets/classify")
+@limiter.limit(settings.CLASSIFY_STORE_RATE_LIMIT)
+async def classify_and_store_ticket(
+    request: Request,
+    response: Response,
+    ticket: TicketCreate,
+    api_key: str = Depends(get_api_key),
+    x_cache_bypass: Optional[str] = Header(None)
+):
+    """
+    Classify a ticket and store it in one call.
+    The predictions are filled in server-side and the document is handed to the
+    background writer, which batches inserts into classified_tickets; while MongoDB
+    is down it is spooled locally and written once the connection is back.
+    A near-duplicate of a recent ticket joins its cluster (cluster_id) and reuses its
+    classification when it came from the current model version (X-Cache: DUPLICATE).
+    """
+    _require_model()
+    ticket_id = ObjectId()
+    duplicate = None
+    cluster_id = str(ticket_id)
+    if duplicate_index is not None:
+        with stage_timer("dedup"):
+            signature = await asyncio.to_thread(duplicate_index.signature, ticket.subject, ticket.description)
+            duplicate = duplicate_index.query(signature)
+        if duplicate is not None:
+            cluster_id = duplicate[2]["cluster_id"]
+        # Indexed before classifying, so near-duplicates arriving meanwhile join this cluster
+        duplicate_index.add(
+            str(ticket_id), signature, {"ticket_id": str(ticket_id), "cluster_id": cluster_id, "result": None}
+        )
+
+    reused = duplicate[2]["result"] if duplicate is not None else None
+    if (
+        reused is not None and not _is_truthy(x_cache_bypass)
+        and reused.get("model_version") == classifier.model_version
+    ):
+        result, cache_status = dict(reused), "DUPLICATE"
+    else:
+        try:
+            result, cache_status = await _classify_one(ticket.subject, ticket.description, x_cache_bypass)
+        except Exception as e:
+            if duplicate_index is not None:
+                # Nothing is stored under this id, so later tickets must not cluster onto it
+                duplicate_index.remove(str(ticket_id))
+            if isinstance(e, InferenceQueueFull):
+                raise
+            ERRORS.inc("classification")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Classification failed: {str(e)}"
+            )
+    if duplicate_index is not None and "error" not in result:
+        duplicate_index.update(str(ticket_id), result=result)
+    response.headers["X-Cache"] = cache_status
+
+    classified = ClassifiedTicketCreate(
+        **ticket.dict(),
+        predicted_priority=result["priority"],
+        predicted_category=result["category"],
+        priority_confidence=result["priority_confidence"],
+        category_confidence=result["category_confidence"],
+        model_version=result.get("model_version"),
+        cluster_id=cluster_id if duplicate_index is not None else None,
+        duplicate_of=duplicate[2]["ticket_id"] if duplicate is not None else None,
+        duplicate_similarity=round(duplicate[1], 4) if duplicate is not None else None
+    )
+    doc = classified.dict(by_alias=True)
+    doc["_id"] = ticket_id
+    await write_buffer.add(doc)
+    return {
+        "status": "queued" if write_buffer.available else "spooled",
+        "inserted_id": str(doc["_id"]),
+        **result,
+        "cluster_id": classified.cluster_id,
+        "duplicate_of": classified.duplicate_of,
+        "duplicate_similarity": classified.duplicate_similarity
+    }
+
+
+@app.post("/tickets/bulk")
+@limiter.limit(settings.BULK_RATE_LIMIT)
+async def save_tickets_bulk(
+    request: Request,
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Save many classified tickets in one call.
+    Accepts a JSON array of tickets or an NDJSON stream (Content-Type: application/x-ndjson).
+    Documents are written with unordered insert_many in chunks; failures are reported per document.
+    """
+    if not getattr(app.state, 'mongodb_available', False):
+        raise HTTPException(
+            status_code=503,
+            detail="Database unavailable - ticket classification works but saving is disabled"
+        )
+
+    collection = get_async_collection("classified_tickets")
+    chunk_size = settings.BULK_INSERT_CHUNK_SIZE
+    failures: List[dict] = []
+    pending: List[dict] = []
+    pending_indexes: List[int] = []
+    received = inserted = 0
+
+    async def flush():
+        nonlocal inserted
+        count, chunk_failures = await insert_documents(collection, pending, chunk_size)
+        inserted += count
+        failed = {f["index"] for f in chunk_failures}
+        await _record_rollups([doc for i, doc in enumerate(pending) if i not in failed])
+        failures.extend({"index": pending_indexes[f["index"]], "error": f["error"]} for f in chunk_failures)
+        pending.clear()
+        pending_indexes.clear()
+
+    if "ndjson" in request.headers.get("content-type", ""):
+        async def raw_items():
+            async for line in iter_lines(request.stream()):
+                if line.strip():
+                    yield line
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array of tickets or NDJSON")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=422, detail="Expected a JSON array of tickets")
+        if len(body) > settings.MAX_BULK_TICKETS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Too many tickets: {len(body)} (max {settings.MAX_BULK_TICKETS}); use NDJSON streaming"
+            )
+
+        async def raw_items():
+            for item in body:
+                yield item
+
+    async for raw in raw_items():
+        index = received
+        received += 1
+        if isinstance(raw, ValueError):
+            failures.append({"index": index, "error": str(raw)})
+            continue
+        try:
+            if isinstance(raw, (bytes, str)):
+                ticket = ClassifiedTicketCreate.model_validate_json(raw)
+            else:
+                ticket = ClassifiedTicketCreate.model_validate(raw)
+        except ValidationError as e:
+            error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            failures.append({"index": index, "error": error})
+            continue
+        pending.append(ticket.dict(by_alias=True))
+        pending_indexes.append(index)
+        if len(pending) >= chunk_size:
+            await flush()
+
+    if pending:
+        await flush()
+
+    failures.sort(key=lambda f: f["index"])
+    return {
+        "status": "completed",
+        "received": received,
+        "inserted": inserted,
+        "failed": len(failures),
+        "failures": failures
+    }
+
+# -------------------------------
+# Query Classified Tickets
+# -------------------------------
+def _require_mongodb():
+    if not getattr(app.state, 'mongodb_available', False):
+        raise HTTPException(status_code=503, detail="Database unavailable")
+
+
+@app.get("/tickets")
+@limiter.limit(settings.TICKETS_READ_RATE_LIMIT)
+async def list_tickets(
+    request: Request,
+    client_id: Optional[str] = None,
+    priority: Optional[str] = None,
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+    cluster_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(settings.TICKETS_PAGE_SIZE, ge=1, le=settings.TICKETS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_description: bool = False,
+    api_key: str = Depends(get_api_key)
+):
+    """
+    List classified tickets, newest first.
+    priority/category filter on the predicted labels, since/until on classification_timestamp,
+    cluster_id to the tickets of one near-duplicate cluster.
+    Pass the returned next_cursor to fetch the following page; descriptions are omitted
+    unless include_description=true.
+    """
+    _require_mongodb()
+    query = build_filter(
+        {"client_id": client_id, "priority": priority, "category": category, "status": status,
+         "cluster_id": cluster_id},
+        since, until
+    )
+    try:
+        tickets, next_cursor = await find_tickets(
+            get_async_collection("classified_tickets"), query, limit, cursor, include_description
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return {"tickets": tickets, "count": len(tickets), "next_cursor": next_cursor}
+
+
+@app.get("/tickets/stats")
+@limiter.limit(settings.TICKETS_READ_RATE_LIMIT)
+async def get_ticket_stats(
+    request: Request,
+    client_id: Optional[str] = None,
+    priority: Optional[str] = None,
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    bucket: str = Query("hour", pattern="^(minute|hour|day|week|month)$"),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Priority/category distributions and time-bucketed counts of classified tickets.
+    Computed by a Mongo aggregation; without `since` the window is the last
+    STATS_DEFAULT_WINDOW_HOURS hours.
+    """
+    _require_mongodb()
+    if since is None:
+        since = datetime.utcnow() - timedelta(hours=settings.STATS_DEFAULT_WINDOW_HOURS)
+    query = build_filter(
+        {"client_id": client_id, "priority": priority, "category": category, "status": status},
+        since, until
+    )
+    try:
+        stats = await ticket_stats(get_async_collection("classified_tickets"), query, bucket)
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return {"since": since, "until": until, **stats}
+
+
+@app.get("/tickets/clusters")
+@limiter.limit(settings.TICKETS_READ_RATE_LIMIT)
+async def get_duplicate_clusters(
+    request: Request,
+    client_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    min_size: int = Query(2, ge=2),
+    limit: int = Query(settings.TICKETS_PAGE_SIZE, ge=1, le=settings.TICKETS_MAX_PAGE_SIZE),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Near-duplicate clusters, largest first, with their size, first/last ticket time and
+    the labels of the ticket that opened them; list a cluster's tickets with
+    GET /tickets?cluster_id=. Without `since` the window is the last STATS_DEFAULT_WINDOW_HOURS hours.
+    """
+    _require_mongodb()
+    if since is None:
+        since = datetime.utcnow() - timedelta(hours=settings.STATS_DEFAULT_WINDOW_HOURS)
+    query = build_filter({"client_id": client_id}, since, until)
+    try:
+        clusters = await duplicate_clusters(get_async_collection("classified_tickets"), query, min_size, limit)
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return {"since": since, "until": until, "clusters": clusters, "count": len(clusters)}
+
+
+@app.get("/tickets/rollups")
+@limiter.limit(settings.TICKETS_READ_RATE_LIMIT)
+async def get_ticket_rollups(
+    request: Request,
+    window_minutes: int = Query(60, ge=1),
+    granularity: str = Query("minute", pattern="^(minute|hour)$"),
+    group_by: str = "client_id",
+    client_id: Optional[str] = None,
+    priority: Optional[str] = None,
+    category: Optional[str] = None,
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Live ticket counts over the last window_minutes from the precomputed rollups,
+    e.g. ?priority=Critical&category=Technical&group_by=client_id.
+    group_by is a comma-separated subset of client_id, priority, category and bucket.
+    """
+    _require_mongodb()
+    fields = tuple(field.strip() for field in group_by.split(",") if field.strip())
+    since = datetime.utcnow() - timedelta(minutes=window_minutes)
+    try:
+        rows = await query_rollups(
+            get_async_collection("ticket_rollups"),
+            granularity,
+            since,
+            filters={"client_id": client_id, "priority": priority, "category": category},
+            group_by=fields
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except PyMongoError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return {"since": since, "granularity": granularity, "group_by": list(fields), "counts": rows}
+
+
+# -------------------------------
+# Background Classification Jobs
+# -------------------------------
+class JobFileRequest(BaseModel):
+    path: str
+    priority: str = "normal"
+
+
+def _require_jobs() -> JobManager:
+    if job_manager is None:
+        raise HTTPException(status_code=503, detail="Background jobs are disabled")
+    return job_manager
+
+
+async def _get_job(job_id: str) -> dict:
+    job = await asyncio.to_thread(_require_jobs().store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+def _job_format(name: str) -> str:
+    for fmt in FORMATS:
+        if fmt in name:
+            return fmt
+    if "jsonl" in name:
+        return "ndjson"
+    raise HTTPException(status_code=415, detail="Jobs take CSV or NDJSON input")
+
+
+@app.post("/jobs", status_code=202)
+@limiter.limit(settings.JOBS_RATE_LIMIT)
+async def create_job(
+    request: Request,
+    priority: str = Query("normal", pattern="^(high|normal|low)$"),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Queue a classification job.
+    Upload the file as the body (Content-Type: text/csv or application/x-ndjson), or send
+    JSON {"path": ..., "priority": ...} naming a file under JOBS_INPUT_DIR on the server.
+    Poll GET /jobs/{id} for progress and fetch GET /jobs/{id}/results.
+    """
+    manager = _require_jobs()
+    content_type = request.headers.get("content-type", "")
+
+    if "application/json" in content_type:
+        try:
+            body = JobFileRequest.model_validate(await request.json())
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(status_code=422, detail=f"Invalid job request: {e}")
+        if body.priority not in PRIORITIES:
+            raise HTTPException(status_code=422, detail=f"Unknown priority: {body.priority}")
+        root = os.path.realpath(settings.JOBS_INPUT_DIR)
+        path = os.path.realpath(os.path.join(root, body.path))
+        if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+            raise HTTPException(status_code=404, detail=f"No input file {body.path} under JOBS_INPUT_DIR")
+        job = await manager.submit_file(path, _job_format(os.path.splitext(path)[1]), body.priority)
+    else:
+        job = await manager.submit(request.stream(), _job_format(content_type), priority)
+
+    return job_progress(job)
+
+
+@app.get("/jobs")
+@limiter.limit(settings.JOBS_READ_RATE_LIMIT)
+async def list_jobs(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500),
+    api_key: str = Depends(get_api_key)
+):
+    """Most recent jobs first."""
+    jobs = await asyncio.to_thread(_require_jobs().store.list, limit)
+    return {"jobs": [job_progress(job) for job in jobs]}
+
+
+@app.get("/jobs/{job_id}")
+@limiter.limit(settings.JOBS_READ_RATE_LIMIT)
+async def get_job(request: Request, job_id: str, api_key: str = Depends(get_api_key)):
+    """Status, progress, throughput and ETA of a job."""
+    return job_progress(await _get_job(job_id))
+
+
+@app.delete("/jobs/{job_id}")
+@limiter.limit(settings.JOBS_RATE_LIMIT)
+async def cancel_job(request: Request, job_id: str, api_key: str = Depends(get_api_key)):
+    """Cancel a queued or running job; a running job stops after its current batch."""
+    job = await _get_job(job_id)
+    if not await asyncio.to_thread(job_manager.store.cancel, job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is already {job['status']}")
+    return job_progress(await asyncio.to_thread(job_manager.store.get, job_id))
+
+
+@app.get("/jobs/{job_id}/results")
+@limiter.limit(settings.JOBS_READ_RATE_LIMIT)
+async def get_job_results(
+    request: Request,
+    job_id: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(100, ge=1, le=10000),
+    stream: bool = False,
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Results completed so far, as NDJSON lines {"index", "priority", ...} in input order.
+    Paged by default (pass next_cursor back as cursor); stream=true sends the whole file.
+    """
+    job = await _get_job(job_id)
+    if stream:
+        async def results():
+            remaining = job["results_bytes"]
+            if remaining == 0:
+                return
+            async for chunk in read_file_chunks(job["results_path"]):
+                yield chunk[:remaining]
+                remaining -= len(chunk)
+                if remaining <= 0:
+                    break
+
+        return StreamingResponse(results(), media_type="application/x-ndjson")
+
+    try:
+        results, next_cursor = await asyncio.to_thread(job_manager.read_results, job, cursor, limit)
+    except InvalidResultsCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": job["status"], "results": results, "next_cursor": next_cursor}
@@ -44,6 +44,11 @@ class ClassifiedTicketBase(TicketBase):
     predicted_category: Optional[str] = None
     priority_confidence: Optional[float] = None
     category_confidence: Optional[float] = None
+    model_version: Optional[str] = None
+    # Near-duplicate cluster (id of its first ticket) and the closest earlier ticket, if any
+    cluster_id: Optional[str] = None
+    duplicate_of: Optional[str] = None
+    duplicate_similarity: Optional[float] = None
     classification_timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
@@ -0,0 +1,171 @@
+# app/serve.py
+"""
+Pre-fork server for multi-core deployments.
+
+Running several `uvicorn --workers N` processes makes every worker execute
+startup_event and load both BERT models on its own, so RSS grows linearly with N.
+This supervisor loads the classifier once, moves its weights into shared memory,
+binds the listening socket and only then forks the workers. Each worker serves
+app.main:app on the inherited socket and reuses the already-loaded classifier,
+so model memory stays roughly constant as the worker count grows.
+
+Usage:
+    python -m app.serve --workers 4
+
+Send SIGUSR1 to the supervisor to log the combined PSS of all processes.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+import app.main as main
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("app.serve")
+
+
+def _pss_mb(pid: int) -> float:
+    """Proportional set size of a process (shared pages split between sharers), Linux only."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, threads_per_worker: int):
+    # Restore default signal handling; uvicorn installs its own handlers
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    if threads_per_worker > 0:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+
+    config = uvicorn.Config(main.app, log_level="info")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, sock: socket.socket, workers: int, threads_per_worker: int):
+        self.sock = sock
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.children = {}
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(self.sock, self.threads_per_worker)
+            except Exception:
+                logger.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        logger.info(f"Started worker {pid}")
+
+    def stop(self, signum, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info(f"Received signal {signum}, stopping {len(self.children)} workers")
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def report_memory(self):
+        total = _pss_mb(os.getpid()) + sum(_pss_mb(pid) for pid in self.children)
+        logger.info(f"Memory (PSS) across supervisor + {len(self.children)} workers: {total:.0f} MB")
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self.report_memory())
+
+        for _ in range(self.workers):
+            self.spawn()
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+
+            logger.warning(f"Worker {pid} exited with status {status}; restarting")
+            # Avoid a tight crash loop if workers die right after starting
+            if time.monotonic() - started < 1.0:
+                time.sleep(1.0)
+            self.spawn()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Serve the triage API from pre-forked workers sharing one model copy.")
+    parser.add_argument("--host", default=settings.SERVE_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVE_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVE_WORKERS)
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        default=None,
+        help="torch intra-op threads per worker (default: cores / workers, 0 = torch default)"
+    )
+    args = parser.parse_args()
+    if args.threads_per_worker is None:
+        args.threads_per_worker = max(1, (os.cpu_count() or 1) // max(1, args.workers))
+
+    if settings.INFERENCE_BACKEND != "pytorch":
+        # ONNX Runtime sessions own thread pools that do not survive fork
+        logger.error("Pre-fork serving requires INFERENCE_BACKEND=pytorch; use uvicorn --workers instead")
+        sys.exit(1)
+
+    logger.info("Loading BERT ticket classifier in supervisor...")
+    classifier = main.load_classifier()
+    shared = classifier.share_memory()
+    main.preloaded_classifier = classifier
+    logger.info(f"Classifier loaded; {shared} model(s) moved to shared memory")
+
+    # Keep the GC from touching (and thereby copying) the pre-fork heap in workers
+    gc.collect()
+    gc.freeze()
+
+    sock = _bind(args.host, args.port)
+    logger.info(f"Listening on http://{args.host}:{args.port} with {args.workers} workers")
+
+    supervisor = Supervisor(sock, args.workers, args.threads_per_worker)
+    try:
+        supervisor.run()
+    finally:
+        sock.close()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,148 @@
+# benchmarks/mongo_standin.py
+"""
+In-memory stand-in for the asyncio MongoDB client, backed by mongomock.
+
+Covers the subset of the AsyncMongoClient API the service uses (ping, inserts,
+upserts, bulk_write of UpdateOne/InsertOne, find/aggregate cursors, index
+creation), so the benchmarks run offline with the write path still exercised.
+"""
+from types import SimpleNamespace
+from typing import List, Optional
+
+import mongomock
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.db import mongo
+
+
+class AsyncCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs) -> "AsyncCursor":
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, count: int) -> "AsyncCursor":
+        self._cursor = self._cursor.limit(count)
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        docs = []
+        for doc in self._cursor:
+            docs.append(doc)
+            if length is not None and len(docs) >= length:
+                break
+        return docs
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._cursor)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class AsyncCollection:
+    def __init__(self, collection, database: "AsyncDatabase"):
+        self._collection = collection
+        self.database = database
+        self.name = collection.name
+
+    def __getattr__(self, name):
+        # Remaining methods (find_one, update_one, count_documents, ...) as coroutines
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+    async def insert_many(self, docs: List[dict], ordered: bool = True):
+        inserted, errors = [], []
+        for index, doc in enumerate(docs):
+            try:
+                inserted.append(self._collection.insert_one(doc).inserted_id)
+            except DuplicateKeyError as e:
+                # mongomock names no index; report a duplicate _id the way the server does
+                duplicate_id = "_id" in doc and self._collection.find_one({"_id": doc["_id"]}, {"_id": 1}) is not None
+                errors.append({
+                    "index": index, "code": 11000, "errmsg": str(e),
+                    "keyPattern": {"_id": 1} if duplicate_id else {}
+                })
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted)})
+        return SimpleNamespace(inserted_ids=inserted)
+
+    async def bulk_write(self, operations, ordered: bool = True):
+        # mongomock's bulk_write does not accept the operation objects of current pymongo
+        for operation in operations:
+            if isinstance(operation, UpdateOne):
+                self._collection.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+            elif isinstance(operation, InsertOne):
+                self._collection.insert_one(operation._doc)
+            else:
+                raise NotImplementedError(f"Unsupported bulk operation: {type(operation).__name__}")
+        return SimpleNamespace(acknowledged=True)
+
+    async def create_indexes(self, indexes):
+        names = []
+        for index in indexes:
+            document = dict(index.document)
+            keys = list(document.pop("key").items())
+            document.pop("expireAfterSeconds", None)  # TTL monitors don't run in memory
+            names.append(self._collection.create_index(keys, **document))
+        return names
+
+    async def create_index(self, keys, **kwargs):
+        kwargs.pop("expireAfterSeconds", None)
+        return self._collection.create_index(keys, **kwargs)
+
+    def find(self, *args, **kwargs) -> AsyncCursor:
+        return AsyncCursor(self._collection.find(*args, **kwargs))
+
+    async def aggregate(self, pipeline, **kwargs) -> AsyncCursor:
+        return AsyncCursor(self._collection.aggregate(pipeline, **kwargs))
+
+
+class AsyncDatabase:
+    def __init__(self, database, client: "AsyncMongomockClient"):
+        self._database = database
+        self.client = client
+        self.name = database.name
+        self._collections = {}
+
+    def __getitem__(self, name: str) -> AsyncCollection:
+        if name not in self._collections:
+            self._collections[name] = AsyncCollection(self._database[name], self)
+        return self._collections[name]
+
+    async def command(self, command, *args, **kwargs):
+        if command == "ping":
+            return {"ok": 1.0}
+        return self._database.command(command, *args, **kwargs)
+
+
+class AsyncMongomockClient:
+    def __init__(self):
+        self._client = mongomock.MongoClient()
+        self.admin = AsyncDatabase(self._client["admin"], self)
+
+    def __getitem__(self, name: str) -> AsyncDatabase:
+        return AsyncDatabase(self._client[name], self)
+
+    async def close(self):
+        self._client.close()
+
+
+def install() -> AsyncMongomockClient:
+    """Route app.db.mongo's asyncio handles to a fresh in-memory client."""
+    client = AsyncMongomockClient()
+    mongo._async_client = client
+    mongo._async_db = None
+    mongo._async_collections.clear()
+    return client
@@ -0,0 +1,365 @@
+# benchmarks/run_benchmarks.py
+"""
+Reproducible performance benchmarks for the triage service, using data.csv as the corpus.
+
+Suites:
+  preprocess  clean_text / preprocess_text / preprocess_many throughput
+  classify    single-ticket BERTTicketClassifier.classify latency
+  batch       classify_batch throughput at several batch sizes
+  http        end-to-end load on app.main:app, in-process through httpx's ASGI transport
+
+Everything runs offline: MongoDB is replaced by an in-memory mongomock stand-in and
+rate limits are switched off. Results are written as JSON; pass --baseline to compare
+against an earlier run (e.g. one saved with --save-baseline).
+
+Usage (from the project root, where models/artifacts lives):
+  python benchmarks/run_benchmarks.py
+  python benchmarks/run_benchmarks.py --suites classify,batch --baseline benchmarks/results/baseline.json
+  python benchmarks/run_benchmarks.py --suites http --concurrency 1,8,32 --requests 500
+  python benchmarks/run_benchmarks.py --compare benchmarks/results/baseline.json benchmarks/results/latest.json
+"""
+import os
+import sys
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Add project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+# Keep the app self-contained: no job workers, no spool file, models loaded before serving
+os.environ.setdefault("JOBS_ENABLED", "false")
+os.environ.setdefault("TICKET_SPOOL_PATH", "")
+os.environ.setdefault("BACKGROUND_MODEL_LOAD", "false")
+
+import pandas as pd
+
+from app.core.metrics import quantile
+
+SUITES = ("preprocess", "classify", "batch", "http")
+HTTP_ENDPOINTS = ("classify", "batch", "store")
+DEFAULT_OUTPUT = os.path.join("benchmarks", "results", "latest.json")
+DEFAULT_BASELINE = os.path.join("benchmarks", "results", "baseline.json")
+
+Metrics = Dict[str, Dict]
+Ticket = Tuple[str, str]
+
+
+def metric(value: float, unit: str, better: str) -> Dict:
+    return {"value": round(value, 4), "unit": unit, "better": better}
+
+
+def latency_metrics(prefix: str, seconds: List[float]) -> Metrics:
+    ordered = sorted(seconds)
+    results = {f"{prefix}.mean_ms": metric(sum(ordered) / len(ordered) * 1000, "ms", "lower")}
+    for q in (0.5, 0.95, 0.99):
+        results[f"{prefix}.p{int(q * 100)}_ms"] = metric(quantile(ordered, q) * 1000, "ms", "lower")
+    return results
+
+
+def load_corpus(path: str, samples: int, seed: int) -> List[Ticket]:
+    df = pd.read_csv(path)
+    df.columns = [col.strip().lower() for col in df.columns]
+    df = df[["subject", "description"]].fillna("").astype(str)
+    if samples and samples < len(df):
+        df = df.sample(n=samples, random_state=seed)
+    return list(df.itertuples(index=False, name=None))
+
+
+def timed_throughput(fn: Callable[[], int], min_seconds: float) -> float:
+    """Repeat fn (which returns the number of items it processed) for at least min_seconds; items/s."""
+    items, started = 0, time.perf_counter()
+    while True:
+        items += fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return items / elapsed
+
+
+# -------------------------------
+# Suites
+# -------------------------------
+def bench_preprocess(corpus: List[Ticket], args) -> Metrics:
+    from nlp_pipeline.preprocessing.cleaner import clean_text, preprocess_many, preprocess_text, spacy_available
+
+    texts = [f"{subject} {description}" for subject, description in corpus]
+    modes = ["fast"] + (["spacy"] if spacy_available() else [])
+    if "spacy" not in modes:
+        print("⚠️  spaCy model not installed, skipping the spacy preprocessing benchmarks")
+
+    results = {
+        "preprocess.clean_text.texts_per_s": metric(
+            timed_throughput(lambda: len([clean_text(t) for t in texts]), args.min_seconds), "texts/s", "higher"
+        )
+    }
+    for mode in modes:
+        results[f"preprocess.preprocess_text_{mode}.texts_per_s"] = metric(
+            timed_throughput(lambda: len([preprocess_text(t, mode=mode) for t in texts]), args.min_seconds),
+            "texts/s", "higher"
+        )
+        results[f"preprocess.preprocess_many_{mode}.texts_per_s"] = metric(
+            timed_throughput(lambda: len(list(preprocess_many(texts, mode=mode))), args.min_seconds),
+            "texts/s", "higher"
+        )
+    return results
+
+
+def bench_classify(classifier, corpus: List[Ticket], args) -> Metrics:
+    latencies = []
+    for i in range(args.iterations):
+        subject, description = corpus[i % len(corpus)]
+        started = time.perf_counter()
+        classifier.classify(subject, description)
+        latencies.append(time.perf_counter() - started)
+    results = latency_metrics("classify.single", latencies)
+    results["classify.single.tickets_per_s"] = metric(len(latencies) / sum(latencies), "tickets/s", "higher")
+    return results
+
+
+def bench_batch(classifier, corpus: List[Ticket], args) -> Metrics:
+    results = {}
+    for size in args.batch_sizes:
+        def run() -> int:
+            for start in range(0, len(corpus), size):
+                classifier.classify_batch(corpus[start:start + size], batch_size=size)
+            return len(corpus)
+
+        results[f"batch.size_{size}.tickets_per_s"] = metric(
+            timed_throughput(run, args.min_seconds), "tickets/s", "higher"
+        )
+    return results
+
+
+def _http_request(endpoint: str, corpus: List[Ticket], i: int, batch_size: int) -> Tuple[str, dict]:
+    subject, description = corpus[i % len(corpus)]
+    if endpoint == "classify":
+        return "/classify", {"subject": subject, "description": description}
+    if endpoint == "batch":
+        items = [corpus[(i * batch_size + k) % len(corpus)] for k in range(batch_size)]
+        return "/classify/batch", {"items": [{"subject": s, "description": d} for s, d in items]}
+    return "/tickets/classify", {
+        "subject": subject,
+        "description": description,
+        "client_id": f"client-{i % 10}"
+    }
+
+
+async def _run_load(client, endpoint: str, corpus: List[Ticket], concurrency: int, total: int,
+                    headers: dict, batch_size: int) -> Tuple[List[float], int, float]:
+    counter = iter(range(total))
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            path, body = _http_request(endpoint, corpus, i, batch_size)
+            started = time.perf_counter()
+            response = await client.post(path, json=body, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def _bench_http(classifier, corpus: List[Ticket], args) -> Metrics:
+    import httpx
+    from benchmarks import mongo_standin
+    import app.main as service
+
+    mongo_standin.install()
+    service.app.state.limiter.enabled = False
+    # Reuse the classifier the other suites loaded instead of loading the weights twice
+    service.preloaded_classifier = classifier
+
+    headers = {"X-API-Key": service.settings.API_KEY}
+    if not args.use_cache:
+        headers["X-Cache-Bypass"] = "true"
+
+    results = {}
+    async with service.app.router.lifespan_context(service.app):
+        transport = httpx.ASGITransport(app=service.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=300) as client:
+            ready = await client.get("/ready")
+            if ready.status_code != 200:
+                raise RuntimeError(f"Service not ready: {ready.json()}")
+            for endpoint in args.endpoints:
+                for concurrency in args.concurrency:
+                    latencies, errors, elapsed = await _run_load(
+                        client, endpoint, corpus, concurrency, args.requests, headers, args.http_batch_size
+                    )
+                    prefix = f"http.{endpoint}.c{concurrency}"
+                    results.update(latency_metrics(prefix, latencies))
+                    results[f"{prefix}.requests_per_s"] = metric(len(latencies) / elapsed, "req/s", "higher")
+                    results[f"{prefix}.error_rate"] = metric(errors / len(latencies), "ratio", "lower")
+                    print(f"   {prefix}: {len(latencies) / elapsed:.1f} req/s, {errors} errors")
+    return results
+
+
+def bench_http(classifier, corpus: List[Ticket], args) -> Metrics:
+    return asyncio.run(_bench_http(classifier, corpus, args))
+
+
+# -------------------------------
+# Reporting
+# -------------------------------
+def run_metadata(args) -> Dict:
+    from app.core.config import settings
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": {key: value for key, value in vars(args).items() if key not in ("compare",)},
+        "settings": {
+            name: getattr(settings, name) for name in (
+                "INFERENCE_BACKEND", "SINGLE_PASS_INFERENCE", "MULTIHEAD_MODEL_PATH", "MAX_SEQ_LENGTH",
+                "TRUNCATION_STRATEGY", "MICROBATCH_ENABLED", "INFERENCE_EXECUTOR", "INFERENCE_WORKERS"
+            )
+        }
+    }
+
+
+def compare(current: Metrics, baseline: Metrics, threshold: float) -> List[Dict]:
+    """Relative change per metric present in both runs; regressions are worse than threshold."""
+    rows = []
+    for name in sorted(set(current) & set(baseline)):
+        new, old = current[name]["value"], baseline[name]["value"]
+        change = (new - old) / old if old else 0.0
+        worse = change < -threshold if current[name]["better"] == "higher" else change > threshold
+        rows.append({"metric": name, "baseline": old, "current": new, "change": round(change, 4), "regression": worse})
+    return rows
+
+
+def print_comparison(rows: List[Dict]):
+    width = max((len(row["metric"]) for row in rows), default=10)
+    print(f"\n{'metric':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}")
+    for row in rows:
+        flag = "  ❌ regression" if row["regression"] else ""
+        print(f"{row['metric']:<{width}}  {row['baseline']:>12.4f}  {row['current']:>12.4f}  {row['change']:>+8.1%}{flag}")
+
+
+def write_json(path: str, data: Dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def csv_ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def csv_choices(choices: Tuple[str, ...]) -> Callable[[str], List[str]]:
+    def parse(value: str) -> List[str]:
+        names = [part.strip() for part in value.split(",") if part.strip()]
+        unknown = set(names) - set(choices)
+        if unknown:
+            raise argparse.ArgumentTypeError(f"unknown: {', '.join(sorted(unknown))} (choose from {', '.join(choices)})")
+        return names
+    return parse
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the triage service")
+    parser.add_argument("--suites", type=csv_choices(SUITES), default=list(SUITES),
+                        help=f"Comma-separated suites to run ({', '.join(SUITES)})")
+    parser.add_argument("--data", default="data.csv", help="Corpus CSV with subject and description columns")
+    parser.add_argument("--samples", type=int, default=500, help="Tickets sampled from the corpus (0 = all)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = library default)")
+    parser.add_argument("--min-seconds", type=float, default=2.0, help="Minimum duration of each throughput run")
+    parser.add_argument("--iterations", type=int, default=200, help="Single-ticket classify calls")
+    parser.add_argument("--batch-sizes", type=csv_ints, default=[1, 8, 16, 32, 64])
+    parser.add_argument("--endpoints", type=csv_choices(HTTP_ENDPOINTS), default=list(HTTP_ENDPOINTS),
+                        help="HTTP endpoints to load: classify (/classify), batch (/classify/batch), "
+                             "store (/tickets/classify)")
+    parser.add_argument("--concurrency", type=csv_ints, default=[1, 8, 32], help="Concurrent HTTP clients per run")
+    parser.add_argument("--requests", type=int, default=200, help="HTTP requests per endpoint and concurrency level")
+    parser.add_argument("--http-batch-size", type=int, default=16, help="Tickets per /classify/batch request")
+    parser.add_argument("--use-cache", action="store_true", help="Let HTTP requests hit the prediction cache")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", help="Compare against this earlier result file")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also write the results to {DEFAULT_BASELINE}")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on regressions")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="Only compare two result files")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        runs = []
+        for path in args.compare:
+            with open(path, encoding="utf-8") as f:
+                runs.append(json.load(f)["results"])
+        rows = compare(runs[1], runs[0], args.threshold)
+        print_comparison(rows)
+        return 1 if args.fail_on_regression and any(row["regression"] for row in rows) else 0
+
+    random.seed(args.seed)
+    corpus = load_corpus(args.data, args.samples, args.seed)
+    print(f"📂 Corpus: {len(corpus)} tickets from {args.data}")
+
+    results: Metrics = {}
+    if "preprocess" in args.suites:
+        print("🧹 Preprocessing throughput...")
+        results.update(bench_preprocess(corpus, args))
+
+    classifier = None
+    if {"classify", "batch", "http"} & set(args.suites):
+        import torch
+        from app.main import load_classifier
+
+        torch.manual_seed(args.seed)
+        if args.threads:
+            torch.set_num_threads(args.threads)
+        print("🧠 Loading classifier...")
+        started = time.perf_counter()
+        classifier = load_classifier()
+        classifier.warm_up()
+        results["load.classifier_seconds"] = metric(time.perf_counter() - started, "s", "lower")
+
+    if "classify" in args.suites:
+        print("⏱️  Single-ticket latency...")
+        results.update(bench_classify(classifier, corpus, args))
+    if "batch" in args.suites:
+        print("📦 Batch throughput...")
+        results.update(bench_batch(classifier, corpus, args))
+    if "http" in args.suites:
+        print("🌐 HTTP load (in-process ASGI)...")
+        results.update(bench_http(classifier, corpus, args))
+
+    report = {"meta": run_metadata(args), "results": results}
+    write_json(args.output, report)
+    print(f"\n✅ Results written to {args.output}")
+    if args.save_baseline:
+        write_json(DEFAULT_BASELINE, report)
+        print(f"✅ Baseline saved to {DEFAULT_BASELINE}")
+
+    regressions = False
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            rows = compare(results, json.load(f)["results"], args.threshold)
+        print_comparison(rows)
+        regressions = any(row["regression"] for row in rows)
+    return 1 if args.fail_on_regression and regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,16 @@
 # dashboard/streamlit_app.py
-import streamlit as st
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+
 import pandas as pd
 import requests
-import logging
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -12,112 +20,231 @@ st.set_page_config(page_title="🎫 Client Success Triage", layout="wide")
 st.title("🎫 Client Success Ticket Triage System")
 st.markdown("AI-powered classification of support tickets by **priority** and **category**.")
 
-# Configuration
-API_URL = "https://client-success-triage-system.onrender.com"
-API_KEY = "your-secret-api-key-here-keep-it-safe"
+# Configuration (one base URL for every call, health check included)
+API_URL = os.getenv("TRIAGE_API_URL", "http://localhost:8000").rstrip("/")
+API_KEY = os.getenv("API_KEY", "your-secret-api-key-here-keep-it-safe")
 
-# Test API connection
-def test_api():
+UPLOAD_CHUNK_ROWS = 1000   # rows per chunk of the streamed upload
+PROGRESS_EVERY = 200       # progress bar updates every N results
+# Files up to STREAM_MAX_ROWS stream their results back (POST /classify/stream); larger
+# ones run as a background job, which survives a dropped connection and can be paged
+STREAM_MAX_ROWS = 20000
+JOB_POLL_SECONDS = 1.0
+JOB_PAGE_SIZE = 5000
+RESULT_COLUMNS = [
+    "subject", "description",
+    "predicted_priority", "priority_confidence",
+    "predicted_category", "category_confidence", "error"
+]
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One pooled HTTP session for the whole Streamlit server."""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 504], allowed_methods=["GET"])
+    session.mount("http://", HTTPAdapter(pool_maxsize=10, max_retries=retry))
+    session.mount("https://", HTTPAdapter(pool_maxsize=10, max_retries=retry))
+    session.headers["X-API-Key"] = API_KEY
+    return session
+
+
+# Test API connection (cached so reruns don't hit the API every time)
+@st.cache_data(ttl=30, show_spinner=False)
+def test_api(api_url: str) -> bool:
     try:
-        health = requests.get("http://localhost:8000/health", timeout=5)
+        health = get_session().get(f"{api_url}/health", timeout=5)
         return health.status_code == 200
     except Exception as e:
         logger.error(f"API connection failed: {e}")
         return False
 
-if not test_api():
-    st.error("❌ Cannot connect to FastAPI backend. Make sure it's running:")
+
+@st.cache_data(max_entries=8, show_spinner="Reading CSV...")
+def parse_csv(file_hash: str, _data: bytes) -> pd.DataFrame:
+    """Parse an uploaded CSV once per distinct file (keyed by its hash)."""
+    df = pd.read_csv(io.BytesIO(_data))
+    # Normalize column names
+    df.columns = [col.strip().lower() for col in df.columns]
+    return df
+
+
+def _csv_chunks(df: pd.DataFrame):
+    """Encode subject/description as CSV in chunks, so the upload is streamed."""
+    tickets = df[["subject", "description"]]
+    for start in range(0, len(tickets), UPLOAD_CHUNK_ROWS):
+        yield tickets.iloc[start:start + UPLOAD_CHUNK_ROWS].to_csv(index=False, header=start == 0).encode("utf-8")
+
+
+def _raise_for_status(response: requests.Response):
+    if response.status_code >= 400:
+        try:
+            detail = response.json().get("detail", response.text)
+        except ValueError:
+            detail = response.text
+        raise RuntimeError(f"HTTP {response.status_code}: {detail}")
+
+
+def _classify_stream(api_url: str, df: pd.DataFrame, progress=None) -> dict:
+    """Results by row index from POST /classify/stream."""
+    results = {}
+    done = False
+    with get_session().post(
+        f"{api_url}/classify/stream",
+        data=_csv_chunks(df),
+        headers={"Content-Type": "text/csv"},
+        stream=True,
+        timeout=(5, 300)
+    ) as response:
+        _raise_for_status(response)
+        for line in response.iter_lines():
+            if not line:
+                continue
+            result = json.loads(line)
+            if result.get("done"):
+                done = True
+                break
+            results[result["index"]] = result
+            if progress is not None and len(results) % PROGRESS_EVERY == 0:
+                progress(len(results) / len(df))
+    if not done:
+        raise RuntimeError(f"Stream ended early after {len(results)} of {len(df)} results")
+    return results
+
+
+def _classify_job(api_url: str, df: pd.DataFrame, progress=None) -> dict:
+    """Results by row index from a background job: upload, poll progress, then page the results."""
+    session = get_session()
+    response = session.post(
+        f"{api_url}/jobs", data=_csv_chunks(df), headers={"Content-Type": "text/csv"}, timeout=(5, 300)
+    )
+    _raise_for_status(response)
+    job_id = response.json()["id"]
+
+    while True:
+        response = session.get(f"{api_url}/jobs/{job_id}", timeout=10)
+        _raise_for_status(response)
+        job = response.json()
+        if job["status"] == "completed":
+            break
+        if job["status"] in ("failed", "cancelled"):
+            raise RuntimeError(f"Job {job_id} {job['status']}: {job.get('error') or ''}")
+        if progress is not None and job.get("progress") is not None:
+            progress(job["progress"])
+        time.sleep(JOB_POLL_SECONDS)
+
+    results, cursor = {}, None
+    while True:
+        params = {"limit": JOB_PAGE_SIZE, **({"cursor": cursor} if cursor else {})}
+        response = session.get(f"{api_url}/jobs/{job_id}/results", params=params, timeout=(5, 60))
+        _raise_for_status(response)
+        page = response.json()
+        results.update((result["index"], result) for result in page["results"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return results
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def classify_tickets(file_hash: str, api_url: str, _df: pd.DataFrame, _progress=None) -> pd.DataFrame:
+    """
+    Classify every ticket: small files through the streaming endpoint (POST /classify/stream),
+    larger ones as a background job (POST /jobs). Cached per file hash, so reruns and
+    re-uploads of the same file don't re-classify; incomplete results raise instead, so
+    they are never cached.
+    """
+    if len(_df) <= STREAM_MAX_ROWS:
+        results = _classify_stream(api_url, _df, _progress)
+    else:
+        results = _classify_job(api_url, _df, _progress)
+    missing = len(_df) - sum(1 for i in range(len(_df)) if i in results)
+    if missing:
+        raise RuntimeError(f"No result returned for {missing} of {len(_df)} tickets")
+
+    df = _df.copy()
+    rows = [results[i] for i in range(len(df))]
+    df["predicted_priority"] = [r.get("priority") or "ERROR" for r in rows]
+    df["predicted_category"] = [r.get("category") or "ERROR" for r in rows]
+    df["priority_confidence"] = [r.get("priority_confidence") or 0.0 for r in rows]
+    df["category_confidence"] = [r.get("category_confidence") or 0.0 for r in rows]
+    df["error"] = [r.get("error") or "" for r in rows]
+    return df
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def results_csv(file_hash: str, _df: pd.DataFrame) -> bytes:
+    return _df.to_csv(index=False).encode()
+
+
+if not test_api(API_URL):
+    st.error(f"❌ Cannot connect to FastAPI backend at {API_URL}. Make sure it's running:")
     st.code("python -m uvicorn app.main:app --reload")
 else:
-    st.success("✅ Connected to FastAPI backend")
+    st.success(f"✅ Connected to FastAPI backend at {API_URL}")
 
 # Upload CSV
 uploaded_file = st.file_uploader("📤 Upload your tickets (CSV)", type="csv")
 if uploaded_file:
+    data = uploaded_file.getvalue()
+    file_hash = hashlib.sha256(data).hexdigest()
     try:
-        df = pd.read_csv(uploaded_file)
-        st.info(f"Loaded **{len(df)} tickets** from uploaded file.")
-
-        # Normalize column names
-        df.columns = [col.strip().lower() for col in df.columns]
-
-        # Validate required columns
-        if "subject" not in df.columns or "description" not in df.columns:
-            st.error("❌ CSV must contain 'subject' and 'description' columns.")
-            st.write("📋 Your columns:", list(df.columns))
-            st.stop()
-
-        # Ensure subject/description are strings
-        df["subject"] = df["subject"].astype(str).fillna("")
-        df["description"] = df["description"].astype(str).fillna("")
-
-        # Show preview
-        with st.expander("🔍 Data Preview", expanded=False):
-            st.dataframe(df.head(10))
-
-        # Classify first 25
-        if st.button("🧠 Classify First 25 Tickets"):
-            df = df.head(25).copy()
-
-            # Add prediction columns
-            df["predicted_priority"] = ""
-            df["predicted_category"] = ""
-            df["priority_confidence"] = 0.0
-            df["category_confidence"] = 0.0
-            df["error"] = ""
-
-            st.subheader("📊 Classification Progress")
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-
-            for idx, row in df.iterrows():
-                subject = row["subject"]
-                description = row["description"]
-                status_text.text(f"Classifying: {subject[:50]}...")
-
-                try:
-                    response = requests.post(
-                        API_URL,
-                        json={"subject": subject, "description": description},
-                        headers={"X-API-Key": API_KEY},
-                        timeout=30
-                    )
-                    if response.status_code == 200:
-                        result = response.json()
-                        df.at[idx, "predicted_priority"] = result["priority"]
-                        df.at[idx, "predicted_category"] = result["category"]
-                        df.at[idx, "priority_confidence"] = round(result["priority_confidence"], 4)
-                        df.at[idx, "category_confidence"] = round(result["category_confidence"], 4)
-                    else:
-                        error_msg = response.json().get("detail", "Unknown error")
-                        df.at[idx, "predicted_priority"] = "ERROR"
-                        df.at[idx, "predicted_category"] = "ERROR"
-                        df.at[idx, "error"] = f"HTTP {response.status_code}: {error_msg}"
-                except Exception as e:
-                    df.at[idx, "predicted_priority"] = "ERROR"
-                    df.at[idx, "predicted_category"] = "ERROR"
-                    df.at[idx, "error"] = str(e)
-
-                progress_bar.progress((idx + 1) / len(df))
-
-            st.success("✅ Classification complete!")
-            st.session_state['classified_df'] = df
-
+        df = parse_csv(file_hash, data)
     except Exception as e:
         st.error(f"❌ Failed to read CSV file: {e}")
+        st.stop()
+    st.info(f"Loaded **{len(df)} tickets** from uploaded file.")
+
+    # Validate required columns
+    if "subject" not in df.columns or "description" not in df.columns:
+        st.error("❌ CSV must contain 'subject' and 'description' columns.")
+        st.write("📋 Your columns:", list(df.columns))
+        st.stop()
+
+    # Ensure subject/description are strings
+    df["subject"] = df["subject"].fillna("").astype(str)
+    df["description"] = df["description"].fillna("").astype(str)
+
+    # Show preview
+    with st.expander("🔍 Data Preview", expanded=False):
+        st.dataframe(df.head(10))
+
+    if st.button(f"🧠 Classify All {len(df)} Tickets"):
+        st.subheader("📊 Classification Progress")
+        progress_bar = st.progress(0.0)
+        try:
+            classified = classify_tickets(
+                file_hash, API_URL, df, _progress=lambda done: progress_bar.progress(min(done, 1.0))
+            )
+        except Exception as e:
+            st.error(f"❌ Classification failed: {e}")
+        else:
+            progress_bar.progress(1.0)
+            st.success("✅ Classification complete!")
+            st.session_state["classified_hash"] = file_hash
+            st.session_state["classified_df"] = classified
 
 # Display results if available
-if 'classified_df' in st.session_state:
-    df = st.session_state['classified_df']
+if "classified_df" in st.session_state:
+    df = st.session_state["classified_df"]
 
     st.subheader("📋 Classification Results")
-    # Show only relevant columns
-    display_df = df[[
-        "subject", "description",
-        "predicted_priority", "priority_confidence",
-        "predicted_category", "category_confidence", "error"
-    ]]
-    st.dataframe(display_df, use_container_width=True)
+    col1, col2, col3 = st.columns(3)
+    priorities = col1.multiselect("Priority", sorted(df["predicted_priority"].unique()))
+    categories = col2.multiselect("Category", sorted(df["predicted_category"].unique()))
+    page_size = col3.selectbox("Rows per page", [25, 100, 500, 1000], index=1)
+
+    view = df
+    if priorities:
+        view = view[view["predicted_priority"].isin(priorities)]
+    if categories:
+        view = view[view["predicted_category"].isin(categories)]
+
+    # Only the current page is sent to the browser
+    pages = max(1, -(-len(view) // page_size))
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+    start = (page - 1) * page_size
+    st.caption(f"Showing rows {start + 1 if len(view) else 0}-{min(start + page_size, len(view))} of {len(view)}")
+    st.dataframe(view[RESULT_COLUMNS].iloc[start:start + page_size], use_container_width=True)
 
     # Charts
     col1, col2 = st.columns(2)
@@ -129,10 +256,9 @@ if 'classified_df' in st.session_state:
         st.bar_chart(df["predicted_category"].value_counts())
 
     # Export
-    csv = df.to_csv(index=False).encode()
     st.download_button(
         label="📥 Download Results as CSV",
-        data=csv,
+        data=results_csv(st.session_state["classified_hash"], df),
         file_name="classified_tickets_with_predictions.csv",
         mime="text/csv"
-    )
\ No newline at end of file
+    )
@@ -1,3 +1,15 @@
-db.createcollection("tickets");
+db.createCollection("tickets");
 db.tickets.createIndex({"created_at": -1});
-print("Tickets collection and index created.");
\ No newline at end of file
+print("Tickets collection and index created.");
+
+// Same indexes (and names) as app/db/mongo.py CLASSIFIED_TICKET_INDEXES, which the API
+// also creates at startup; createIndex is a no-op when an identical index exists.
+db.createCollection("classified_tickets");
+db.classified_tickets.createIndex({"classification_timestamp": -1, "_id": -1}, {name: "ts_desc"});
+db.classified_tickets.createIndex({"client_id": 1, "classification_timestamp": -1, "_id": -1}, {name: "client_ts"});
+db.classified_tickets.createIndex({"predicted_priority": 1, "classification_timestamp": -1, "_id": -1}, {name: "priority_ts"});
+db.classified_tickets.createIndex({"predicted_category": 1, "classification_timestamp": -1, "_id": -1}, {name: "category_ts"});
+db.classified_tickets.createIndex({"status": 1, "classification_timestamp": -1, "_id": -1}, {name: "status_ts"});
+db.classified_tickets.createIndex({"cluster_id": 1, "classification_timestamp": -1, "_id": -1}, {name: "cluster_ts"});
+db.classified_tickets.createIndex({"classification_timestamp": -1}, {name: "duplicates_ts", partialFilterExpression: {"duplicate_of": {"$type": "string"}}});
+print("Classified tickets collection and indexes created.");
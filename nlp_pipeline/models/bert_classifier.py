@@ -1,45 +1,230 @@
-from transformers import pipeline
+from transformers import AutoTokenizer, pipeline
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+import torch
+import hashlib
+import itertools
 import os
 import logging
+import threading
+import time
+
+from nlp_pipeline.models.multihead import MultiHeadTicketModel
+from nlp_pipeline.models.onnx_backend import OnnxTextClassifier
+from nlp_pipeline.models.tokenization import TicketEncoder, length_buckets
 
 # Set up logging for debugging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PRIORITY_MODEL_PATH = "models/artifacts/bert-priority-model"
+CATEGORY_MODEL_PATH = "models/artifacts/bert-category-model"
+
+# Per-request details are logged at DEBUG for one call in every LOG_SAMPLE_EVERY
+LOG_SAMPLE_EVERY = max(1, int(os.getenv("CLASSIFIER_LOG_SAMPLE_EVERY", "100")))
+_log_calls = itertools.count()
+
+
+def _sampled_debug(message: str, *args):
+    """Lazily formatted DEBUG log for a sample of calls; free when DEBUG is off."""
+    if logger.isEnabledFor(logging.DEBUG) and next(_log_calls) % LOG_SAMPLE_EVERY == 0:
+        logger.debug(message, *args)
+
+
+def artifact_fingerprint(*paths: str) -> str:
+    """Short hash of the file names, sizes and mtimes under the given model directories."""
+    digest = hashlib.sha256()
+    for path in paths:
+        for root, _, files in sorted(os.walk(path)):
+            for name in sorted(files):
+                stat = os.stat(os.path.join(root, name))
+                digest.update(f"{os.path.relpath(os.path.join(root, name), path)}:{stat.st_size}:{int(stat.st_mtime)}".encode())
+    return digest.hexdigest()[:12]
+
 
 class BERTTicketClassifier:
-    def __init__(self):
-        priority_path = "models/artifacts/bert-priority-model"
-        category_path = "models/artifacts/bert-category-model"
+    def __init__(
+        self,
+        multihead_path: Optional[str] = None,
+        single_pass: bool = True,
+        backend: str = "pytorch",
+        onnx_dir: str = "models/artifacts/onnx",
+        onnx_quantized: bool = False,
+        onnx_threads: int = 0,
+        truncation_strategy: str = "head",
+        max_length: int = 512,
+        head_fraction: float = 0.25,
+        subject_max_tokens: int = 64,
+        priority_path: str = PRIORITY_MODEL_PATH,
+        category_path: str = CATEGORY_MODEL_PATH,
+        version: Optional[str] = None,
+        cascade_path: Optional[str] = None,
+        cascade_threshold: float = 0.9
+    ):
+        if backend not in ("pytorch", "onnx"):
+            raise ValueError(f"Unknown inference backend: {backend}")
+        self.backend = backend
+        # Seconds spent per load phase; tokenizers are only timed separately on the pipeline path
+        self.load_timings: Dict[str, float] = {}
+        started = time.perf_counter()
 
-        # Use top_k=None to ensure list output
-        self.priority_classifier = pipeline(
-            "text-classification",
-            model=priority_path,
-            tokenizer=priority_path,
-            device=-1,
-            top_k=None  # Always return list
-        )
+        # Prefer the merged shared-encoder artifact; fall back to the two pipelines
+        self.multihead: Optional[MultiHeadTicketModel] = None
+        if multihead_path and backend == "pytorch":
+            try:
+                self.multihead = MultiHeadTicketModel.from_pretrained(multihead_path)
+                logger.info(f"Loaded multi-head model from {multihead_path}")
+            except Exception as e:
+                logger.warning(f"Multi-head model unavailable ({e}), using two-pipeline path")
+        elif multihead_path:
+            logger.warning(f"Multi-head model is only supported on the pytorch backend, ignoring {multihead_path}")
+
+        self.priority_classifier = None
+        self.category_classifier = None
+        self.shared_tokenizer = False
+        # The ONNX classifiers only implement the tokenizer/model path, not pipeline __call__
+        self.single_pass = single_pass or self.multihead is not None or backend == "onnx"
+
+        if backend == "onnx":
+            priority_path = os.path.join(onnx_dir, "bert-priority-model")
+            category_path = os.path.join(onnx_dir, "bert-category-model")
+            self.priority_classifier = OnnxTextClassifier(priority_path, onnx_quantized, onnx_threads)
+            self.category_classifier = OnnxTextClassifier(category_path, onnx_quantized, onnx_threads)
+            logger.info(f"Using ONNX Runtime backend ({'INT8' if onnx_quantized else 'FP32'})")
+
+        elif self.multihead is None:
+            priority_tokenizer = AutoTokenizer.from_pretrained(priority_path)
+            category_tokenizer = AutoTokenizer.from_pretrained(category_path)
+            self.load_timings["tokenizer"] = time.perf_counter() - started
+            started = time.perf_counter()
+
+            # Use top_k=None to ensure list output
+            self.priority_classifier = pipeline(
+                "text-classification",
+                model=priority_path,
+                tokenizer=priority_tokenizer,
+                device=-1,
+                top_k=None  # Always return list
+            )
+
+            self.category_classifier = pipeline(
+                "text-classification",
+                model=category_path,
+                tokenizer=category_tokenizer,
+                device=-1,
+                top_k=None
+            )
+        self.load_timings["weights"] = time.perf_counter() - started
 
-        self.category_classifier = pipeline(
-            "text-classification",
-            model=category_path,
-            tokenizer=category_path,
-            device=-1,
-            top_k=None
+        # Optional TF-IDF first stage; tickets it is confident about never reach BERT
+        self.cascade = None
+        self.cascade_threshold = cascade_threshold
+        self.routing = {"fast": 0, "bert": 0}
+        self._routing_lock = threading.Lock()
+        if cascade_path:
+            started = time.perf_counter()
+            try:
+                from nlp_pipeline.models.cascade import FastTicketClassifier
+
+                self.cascade = FastTicketClassifier.load(cascade_path)
+                self.load_timings["cascade"] = time.perf_counter() - started
+                logger.info(f"Loaded cascade first stage from {cascade_path} (threshold {cascade_threshold})")
+            except Exception as e:
+                logger.warning(f"Cascade model unavailable ({e}), every ticket goes to BERT")
+
+        if self.multihead is None:
+            # Both models are fine-tuned from the same checkpoint; if their vocabularies
+            # match, one tokenization can feed both forward passes
+            self.shared_tokenizer = (
+                self.priority_classifier.tokenizer.get_vocab()
+                == self.category_classifier.tokenizer.get_vocab()
+            )
+
+        # Truncation to a token budget + dynamic padding (see nlp_pipeline.models.tokenization)
+        encoder_options = dict(
+            strategy=truncation_strategy,
+            max_length=max_length,
+            head_fraction=head_fraction,
+            subject_max_tokens=subject_max_tokens
         )
+        if self.multihead is not None:
+            self.priority_encoder = TicketEncoder(self.multihead.tokenizer, **encoder_options)
+            self.category_encoder = self.priority_encoder
+        else:
+            self.priority_encoder = TicketEncoder(self.priority_classifier.tokenizer, **encoder_options)
+            if self.shared_tokenizer:
+                self.category_encoder = self.priority_encoder
+            else:
+                self.category_encoder = TicketEncoder(self.category_classifier.tokenizer, **encoder_options)
+        self.max_length = self.priority_encoder.max_length
+
+        # Identifies the loaded weights (returned with every result and used in prediction
+        # cache keys); prefixed with the registry version when loaded from the registry
+        self.registry_version = version
+        if self.multihead is not None:
+            self.model_version = artifact_fingerprint(multihead_path)
+        else:
+            self.model_version = artifact_fingerprint(priority_path, category_path)
+        if backend == "onnx":
+            self.model_version += "-onnx-int8" if onnx_quantized else "-onnx"
+        if self.cascade is not None:
+            self.model_version += f"+cascade-{artifact_fingerprint(cascade_path)}@{cascade_threshold:g}"
+        if version:
+            self.model_version = f"{version}-{self.model_version}"
+
+        # Called with (stage, seconds) for tokenization, forward passes and post-processing
+        self.stage_observer: Optional[Callable[[str, float], None]] = None
+
+    @contextmanager
+    def _timed(self, stage: str):
+        observer = self.stage_observer
+        if observer is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            observer(stage, time.perf_counter() - started)
+
+    def warm_up(self) -> float:
+        """
+        Run throwaway single and batched inferences so the first real request doesn't pay
+        for lazy initialization (allocator warm-up, kernel selection). Returns seconds taken.
+        """
+        started = time.perf_counter()
+        sample = ("Cannot log in", "The login page returns an error after the latest update.")
+        self.classify(*sample)
+        self.classify_batch([sample, ("Invoice question", "I was charged twice this month.")], batch_size=2)
+        with self._routing_lock:
+            self.routing = {"fast": 0, "bert": 0}
+        self.load_timings["warmup"] = time.perf_counter() - started
+        return self.load_timings["warmup"]
+
+    def share_memory(self) -> int:
+        """
+        Move PyTorch weights into shared memory so processes forked afterwards map
+        the same pages instead of copying them. Returns the number of modules moved.
+        """
+        if self.multihead is not None:
+            modules = [self.multihead.encoder, *self.multihead.heads.values()]
+        elif self.backend == "pytorch":
+            modules = [self.priority_classifier.model, self.category_classifier.model]
+        else:
+            modules = []
+        for module in modules:
+            module.share_memory()
+        return len(modules)
 
     def _extract_prediction(self, outputs, classifier_name):
         """Helper method to safely extract prediction from pipeline output."""
-        logger.info(f"{classifier_name} raw output: {outputs}")
-        logger.info(f"{classifier_name} output type: {type(outputs)}")
+        _sampled_debug("%s raw output: %s", classifier_name, outputs)
         
         try:
             # Handle nested list structure [[{...}]] -> [{...}]
             current = outputs
             while isinstance(current, list) and len(current) == 1 and isinstance(current[0], list):
                 current = current[0]
-                logger.info(f"{classifier_name} unwrapped nested list: {current}")
             
             # Case 1: List of predictions
             if isinstance(current, list):
@@ -48,7 +233,6 @@ class BERTTicketClassifier:
                 
                 # Get the first (highest confidence) prediction
                 prediction = current[0]
-                logger.info(f"{classifier_name} first prediction: {prediction}")
                 
                 # Check if it's a dict with expected keys
                 if isinstance(prediction, dict) and 'label' in prediction and 'score' in prediction:
@@ -69,32 +253,220 @@ class BERTTicketClassifier:
             raise
 
     def classify(self, subject: str, description: str) -> dict:
+        if self.cascade is not None:
+            result = self._cascade([(subject, description)])[0]
+            if result is not None:
+                return result
+        return self._classify_bert(subject, description)
+
+    def _classify_bert(self, subject: str, description: str) -> dict:
+        """Single-ticket BERT classification; callers have already routed it past the cascade."""
         text = f"{subject} {description}"
-        logger.info(f"Classifying text: {text[:100]}...")  # Log first 100 chars
+
+        if self.single_pass:
+            try:
+                priorities, categories = self._predict([(subject, description)])
+                with self._timed("post_processing"):
+                    result = self._format_result(priorities[0], categories[0])
+                _sampled_debug("Classified %r -> %s", text[:100], result)
+                return result
+            except Exception as e:
+                logger.error(f"Classification failed: {str(e)}")
+                raise RuntimeError(f"Failed to classify: {str(e)}")
 
         try:
-            # Classify priority
-            priority_outputs = self.priority_classifier(text)
-            priority = self._extract_prediction(priority_outputs, "priority_classifier")
+            # Classify priority (the pipeline tokenizes internally, so this includes tokenization)
+            with self._timed("priority_forward"):
+                priority_outputs = self.priority_classifier(text, truncation=True, max_length=self.max_length)
 
             # Classify category
-            category_outputs = self.category_classifier(text)
-            category = self._extract_prediction(category_outputs, "category_classifier")
+            with self._timed("category_forward"):
+                category_outputs = self.category_classifier(text, truncation=True, max_length=self.max_length)
 
-            result = {
-                "priority": str(priority["label"]),
-                "priority_confidence": round(float(priority["score"]), 4),
-                "category": str(category["label"]),
-                "category_confidence": round(float(category["score"]), 4)
-            }
-            
-            logger.info(f"Classification result: {result}")
+            with self._timed("post_processing"):
+                priority = self._extract_prediction(priority_outputs, "priority_classifier")
+                category = self._extract_prediction(category_outputs, "category_classifier")
+                result = {
+                    "priority": str(priority["label"]),
+                    "priority_confidence": round(float(priority["score"]), 4),
+                    "category": str(category["label"]),
+                    "category_confidence": round(float(category["score"]), 4),
+                    "model_version": self.model_version
+                }
+                if self.cascade is not None:
+                    result["stage"] = "bert"
+
+            _sampled_debug("Classified %r -> %s", text[:100], result)
             return result
 
         except Exception as e:
             logger.error(f"Classification failed: {str(e)}")
             raise RuntimeError(f"Failed to classify: {str(e)}")
 
+    @staticmethod
+    def _run_model(model, encoded) -> List[dict]:
+        """Run a single forward pass and return the top label/score per row."""
+        with torch.no_grad():
+            logits = model(**encoded).logits
+        scores, label_ids = torch.softmax(logits, dim=-1).max(dim=-1)
+        id2label = model.config.id2label
+        return [
+            {"label": id2label[int(label_id)], "score": float(score)}
+            for label_id, score in zip(label_ids.tolist(), scores.tolist())
+        ]
+
+    def _encode(self, items: List[Tuple[str, str]]) -> Tuple[List[List[int]], List[List[int]]]:
+        """Truncated token ids for each model, tokenizing only once when the vocabularies match."""
+        with self._timed("tokenization"):
+            priority_seqs = self.priority_encoder.encode(items)
+            if self.category_encoder is self.priority_encoder:
+                return priority_seqs, priority_seqs
+            return priority_seqs, self.category_encoder.encode(items)
+
+    def _predict_encoded(self, priority_seqs, category_seqs) -> Tuple[List[dict], List[dict]]:
+        """Pad one batch of token ids and return (priority predictions, category predictions)."""
+        with self._timed("tokenization"):
+            priority_inputs = self.priority_encoder.pad(priority_seqs)
+            if self.multihead is not None or self.category_encoder is self.priority_encoder:
+                category_inputs = priority_inputs
+            else:
+                category_inputs = self.category_encoder.pad(category_seqs)
+
+        if self.multihead is not None:
+            # One shared encoder pass serves both heads
+            with self._timed("multihead_forward"):
+                return self.multihead.predict(priority_inputs)
+
+        with self._timed("priority_forward"):
+            priorities = self._run_model(self.priority_classifier.model, priority_inputs)
+        with self._timed("category_forward"):
+            categories = self._run_model(self.category_classifier.model, category_inputs)
+        return priorities, categories
+
+    def _predict(self, items: List[Tuple[str, str]]) -> Tuple[List[dict], List[dict]]:
+        return self._predict_encoded(*self._encode(items))
+
+    def tokenization_stats(self) -> dict:
+        """Truncation counts and padding efficiency (real tokens / padded tokens)."""
+        stats = {"priority": self.priority_encoder.snapshot()}
+        if self.category_encoder is not self.priority_encoder:
+            stats["category"] = self.category_encoder.snapshot()
+        return stats
+
+    def _format_result(self, priority: dict, category: dict, stage: str = "bert") -> dict:
+        result = {
+            "priority": str(priority["label"]),
+            "priority_confidence": round(float(priority["score"]), 4),
+            "category": str(category["label"]),
+            "category_confidence": round(float(category["score"]), 4),
+            "model_version": self.model_version
+        }
+        if self.cascade is not None:
+            result["stage"] = stage
+        return result
+
+    def _cascade(self, items: List[Tuple[str, str]]) -> List[Optional[dict]]:
+        """
+        First-stage results for the items whose priority and category confidences both
+        reach the threshold; None marks an item that has to go to BERT.
+        """
+        try:
+            with self._timed("cascade"):
+                priorities, categories = self.cascade.predict(items)
+        except Exception as e:
+            logger.error(f"Cascade first stage failed, escalating to BERT: {str(e)}")
+            priorities, categories = [None] * len(items), [None] * len(items)
+
+        results = []
+        for priority, category in zip(priorities, categories):
+            confident = (
+                priority is not None
+                and min(priority["score"], category["score"]) >= self.cascade_threshold
+            )
+            results.append(self._format_result(priority, category, stage="fast") if confident else None)
+        answered = sum(result is not None for result in results)
+        with self._routing_lock:
+            self.routing["fast"] += answered
+            self.routing["bert"] += len(results) - answered
+        return results
+
+    def routing_stats(self) -> dict:
+        """How many tickets the cascade answered itself vs. escalated to BERT."""
+        with self._routing_lock:
+            fast, bert = self.routing["fast"], self.routing["bert"]
+        return {
+            "enabled": self.cascade is not None,
+            "threshold": self.cascade_threshold,
+            "fast": fast,
+            "bert": bert,
+            "fast_rate": round(fast / (fast + bert), 4) if fast + bert else 0.0
+        }
+
+    def classify_batch(self, items: List[Tuple[str, str]], batch_size: int = 16) -> List[dict]:
+        """
+        Classify many (subject, description) pairs, one forward pass per model per chunk.
+        Tickets are tokenized once up front and chunked by token length so each chunk
+        carries as little padding as possible.
+        Results are returned in input order; failed items carry an "error" key instead of predictions.
+        """
+        results: List[dict] = [None] * len(items)
+        valid, positions = [], []
+        for idx, (subject, description) in enumerate(items):
+            if not f"{subject} {description}".strip():
+                results[idx] = {"error": "Empty subject and description"}
+                continue
+            valid.append((subject, description))
+            positions.append(idx)
+
+        if self.cascade is not None and valid:
+            escalated, escalated_positions = [], []
+            for item, idx, result in zip(valid, positions, self._cascade(valid)):
+                if result is not None:
+                    results[idx] = result
+                else:
+                    escalated.append(item)
+                    escalated_positions.append(idx)
+            valid, positions = escalated, escalated_positions
+
+        _sampled_debug("Batch classifying %d tickets in chunks of %d", len(valid), batch_size)
+        if not valid:
+            return results
+
+        try:
+            priority_seqs, category_seqs = self._encode(valid)
+        except Exception as e:
+            logger.error(f"Batch tokenization failed, classifying items individually: {str(e)}")
+            for i, (subject, description) in enumerate(valid):
+                try:
+                    results[positions[i]] = self._classify_bert(subject, description)
+                except Exception as item_error:
+                    results[positions[i]] = {"error": str(item_error)}
+            return results
+
+        for chunk in length_buckets([len(seq) for seq in priority_seqs], batch_size):
+            try:
+                priorities, categories = self._predict_encoded(
+                    [priority_seqs[i] for i in chunk],
+                    [category_seqs[i] for i in chunk]
+                )
+            except Exception as e:
+                # Isolate the failing item(s) by falling back to single-ticket classification;
+                # these were already routed by the cascade, so go straight to BERT
+                logger.error(f"Batch chunk failed, retrying items individually: {str(e)}")
+                for i in chunk:
+                    subject, description = valid[i]
+                    try:
+                        results[positions[i]] = self._classify_bert(subject, description)
+                    except Exception as item_error:
+                        results[positions[i]] = {"error": str(item_error)}
+                continue
+
+            with self._timed("post_processing"):
+                for i, priority, category in zip(chunk, priorities, categories):
+                    results[positions[i]] = self._format_result(priority, category)
+
+        return results
+
 
 # Alternative version with even more defensive programming
 class BERTTicketClassifierRobust:
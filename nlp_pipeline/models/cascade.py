@@ -0,0 +1,88 @@
+# nlp_pipeline/models/cascade.py
+"""
+Cheap first stage of the classification cascade.
+
+One TF-IDF + logistic regression model per head (priority, category) over
+preprocessed ticket text. BERTTicketClassifier answers from it when both heads
+are at least `threshold` confident and escalates the rest to BERT. Train it and
+pick the threshold with scripts/train_cascade.py, whose calibration report shows
+the accuracy/latency tradeoff per threshold.
+"""
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from nlp_pipeline.preprocessing.cleaner import preprocess_many
+
+MODEL_FILE = "cascade.joblib"
+META_FILE = "cascade.json"
+HEADS = ("priority", "category")
+
+
+def build_pipeline(seed: int = 42) -> Pipeline:
+    return Pipeline([
+        ("tfidf", TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True)),
+        ("clf", LogisticRegression(max_iter=2000, C=4.0, random_state=seed))
+    ])
+
+
+class FastTicketClassifier:
+    def __init__(self, models: Dict[str, Pipeline], preprocess_mode: str = "fast", metadata: Optional[Dict] = None):
+        self.models = models
+        # "fast" keeps serving free of spaCy; training and serving must use the same mode
+        self.preprocess_mode = preprocess_mode
+        self.metadata = metadata or {}
+
+    @classmethod
+    def fit(
+        cls,
+        items: List[Tuple[str, str]],
+        labels: Dict[str, List[str]],
+        preprocess_mode: str = "fast",
+        seed: int = 42
+    ) -> "FastTicketClassifier":
+        model = cls({}, preprocess_mode)
+        texts = model.features(items)
+        for head in HEADS:
+            model.models[head] = build_pipeline(seed).fit(texts, labels[head])
+        return model
+
+    def features(self, items: List[Tuple[str, str]]) -> List[str]:
+        return list(preprocess_many((f"{subject} {description}" for subject, description in items),
+                                    mode=self.preprocess_mode))
+
+    def predict(self, items: List[Tuple[str, str]]) -> Tuple[List[dict], List[dict]]:
+        """(priority predictions, category predictions) as {"label", "score"} per item."""
+        texts = self.features(items)
+        outputs = []
+        for head in HEADS:
+            model = self.models[head]
+            probabilities = model.predict_proba(texts)
+            best = np.argmax(probabilities, axis=1)
+            outputs.append([
+                {"label": str(model.classes_[i]), "score": float(row[i])}
+                for i, row in zip(best, probabilities)
+            ])
+        return outputs[0], outputs[1]
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        joblib.dump({"models": self.models, "preprocess_mode": self.preprocess_mode}, os.path.join(path, MODEL_FILE))
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.metadata, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "FastTicketClassifier":
+        state = joblib.load(os.path.join(path, MODEL_FILE))
+        metadata = {}
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                metadata = json.load(f)
+        return cls(state["models"], state["preprocess_mode"], metadata)
@@ -0,0 +1,129 @@
+"""
+Merged priority/category artifact: one BERT encoder feeding two classification heads.
+
+The priority and category models are fine-tuned from the same base checkpoint. When
+their encoder weights are identical (e.g. heads-only fine-tuning), running the encoder
+twice per ticket is wasted work; this module merges both models into a single artifact
+that tokenizes once and runs one encoder pass for both heads.
+
+Artifact layout:
+    <output>/encoder/     -> encoder weights + tokenizer (save_pretrained format)
+    <output>/heads.pt     -> state dicts of the priority and category heads
+    <output>/heads.json   -> label maps for each head
+"""
+import json
+import logging
+import os
+from typing import Dict, List, Tuple
+
+import torch
+from transformers import AutoModel, AutoModelForSequenceClassification, AutoTokenizer
+
+logger = logging.getLogger(__name__)
+
+HEAD_NAMES = ("priority", "category")
+SUPPORTED_MODEL_TYPES = ("bert",)
+
+
+def _encoders_match(model_a, model_b, atol: float) -> bool:
+    state_a = model_a.base_model.state_dict()
+    state_b = model_b.base_model.state_dict()
+    if state_a.keys() != state_b.keys():
+        return False
+    return all(torch.allclose(state_a[k], state_b[k], atol=atol) for k in state_a)
+
+
+def build_multihead_artifact(
+    priority_path: str,
+    category_path: str,
+    output_path: str,
+    atol: float = 1e-6,
+    force: bool = False
+) -> str:
+    """
+    Merge the two sequence-classification models into a shared-encoder artifact.
+    Raises ValueError if the architectures are unsupported or the encoders differ
+    (pass force=True to reuse the priority encoder anyway).
+    """
+    priority_model = AutoModelForSequenceClassification.from_pretrained(priority_path)
+    category_model = AutoModelForSequenceClassification.from_pretrained(category_path)
+
+    for model in (priority_model, category_model):
+        if model.config.model_type not in SUPPORTED_MODEL_TYPES:
+            raise ValueError(f"Unsupported model type for merging: {model.config.model_type}")
+
+    if not _encoders_match(priority_model, category_model, atol):
+        if not force:
+            raise ValueError(
+                "Priority and category encoders differ; merging would change predictions. "
+                "Re-run with force=True to reuse the priority encoder for both heads."
+            )
+        logger.warning("Encoders differ - category head will run on the priority encoder")
+
+    os.makedirs(output_path, exist_ok=True)
+    encoder_path = os.path.join(output_path, "encoder")
+    priority_model.base_model.save_pretrained(encoder_path)
+    AutoTokenizer.from_pretrained(priority_path).save_pretrained(encoder_path)
+
+    torch.save(
+        {
+            "priority": priority_model.classifier.state_dict(),
+            "category": category_model.classifier.state_dict()
+        },
+        os.path.join(output_path, "heads.pt")
+    )
+    with open(os.path.join(output_path, "heads.json"), "w") as f:
+        json.dump(
+            {
+                "priority": {str(k): v for k, v in priority_model.config.id2label.items()},
+                "category": {str(k): v for k, v in category_model.config.id2label.items()}
+            },
+            f,
+            indent=2
+        )
+
+    logger.info(f"Multi-head artifact written to {output_path}")
+    return output_path
+
+
+class MultiHeadTicketModel:
+    """Loads a merged artifact and predicts priority and category from one encoder pass."""
+
+    def __init__(self, tokenizer, encoder, heads: Dict[str, torch.nn.Linear], id2label: Dict[str, Dict[int, str]]):
+        self.tokenizer = tokenizer
+        self.encoder = encoder.eval()
+        self.heads = heads
+        self.id2label = id2label
+
+    @classmethod
+    def from_pretrained(cls, path: str) -> "MultiHeadTicketModel":
+        encoder_path = os.path.join(path, "encoder")
+        tokenizer = AutoTokenizer.from_pretrained(encoder_path)
+        encoder = AutoModel.from_pretrained(encoder_path)
+
+        with open(os.path.join(path, "heads.json")) as f:
+            label_maps = json.load(f)
+        head_states = torch.load(os.path.join(path, "heads.pt"), map_location="cpu")
+
+        heads, id2label = {}, {}
+        for name in HEAD_NAMES:
+            weight = head_states[name]["weight"]
+            head = torch.nn.Linear(weight.shape[1], weight.shape[0])
+            head.load_state_dict(head_states[name])
+            heads[name] = head.eval()
+            id2label[name] = {int(k): v for k, v in label_maps[name].items()}
+
+        return cls(tokenizer, encoder, heads, id2label)
+
+    def predict(self, encoded) -> Tuple[List[dict], List[dict]]:
+        """Return (priority predictions, category predictions) for already-tokenized input."""
+        with torch.no_grad():
+            pooled = self.encoder(**encoded).pooler_output
+            outputs = {}
+            for name, head in self.heads.items():
+                scores, label_ids = torch.softmax(head(pooled), dim=-1).max(dim=-1)
+                outputs[name] = [
+                    {"label": self.id2label[name][int(label_id)], "score": float(score)}
+                    for label_id, score in zip(label_ids.tolist(), scores.tolist())
+                ]
+        return outputs["priority"], outputs["category"]
@@ -0,0 +1,100 @@
+"""
+ONNX Runtime inference backend for the ticket classifiers.
+
+export_to_onnx() converts a fine-tuned `bert-*-model` directory into
+<output>/model.onnx (and optionally a dynamically INT8-quantized model.int8.onnx),
+copying the tokenizer and config alongside. OnnxTextClassifier then mimics the
+parts of a transformers text-classification pipeline that BERTTicketClassifier
+uses (`.tokenizer` and `.model(**encoded).logits` / `.model.config`), so the
+rest of the inference code is backend-agnostic.
+
+onnxruntime is only imported when this backend is actually used.
+"""
+import inspect
+import logging
+import os
+from types import SimpleNamespace
+
+import torch
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+
+logger = logging.getLogger(__name__)
+
+ONNX_FILE = "model.onnx"
+QUANTIZED_ONNX_FILE = "model.int8.onnx"
+
+
+def export_to_onnx(model_path: str, output_dir: str, quantize: bool = False, opset: int = 17) -> str:
+    """Export a sequence-classification model to ONNX; returns the path of the file to serve."""
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModelForSequenceClassification.from_pretrained(model_path).eval()
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    onnx_path = os.path.join(output_dir, ONNX_FILE)
+    # Newer torch defaults to the dynamo exporter, whose graphs trip up dynamic quantization;
+    # the TorchScript exporter gives a stable graph for BERT-style models
+    export_options = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            onnx_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            **export_options
+        )
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+    logger.info(f"Exported {model_path} -> {onnx_path}")
+
+    if not quantize:
+        return onnx_path
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantized_path = os.path.join(output_dir, QUANTIZED_ONNX_FILE)
+    quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QInt8)
+    logger.info(f"Quantized {onnx_path} -> {quantized_path}")
+    return quantized_path
+
+
+class _OnnxModel:
+    """Callable wrapper around an InferenceSession returning torch logits like a HF model."""
+
+    def __init__(self, session, config):
+        self.session = session
+        self.config = config
+        self.input_names = [i.name for i in session.get_inputs()]
+
+    def __call__(self, **encoded):
+        feeds = {name: encoded[name].cpu().numpy() for name in self.input_names if name in encoded}
+        logits = self.session.run(["logits"], feeds)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+class OnnxTextClassifier:
+    """Pipeline-like holder of a tokenizer and an ONNX Runtime session."""
+
+    def __init__(self, model_dir: str, quantized: bool = False, num_threads: int = 0):
+        import onnxruntime as ort
+
+        model_file = os.path.join(model_dir, QUANTIZED_ONNX_FILE if quantized else ONNX_FILE)
+        if not os.path.exists(model_file):
+            raise FileNotFoundError(f"ONNX model not found at {model_file} - run scripts/export_onnx.py")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+
+        session = ort.InferenceSession(model_file, options, providers=["CPUExecutionProvider"])
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = _OnnxModel(session, AutoConfig.from_pretrained(model_dir))
+        self.model_file = model_file
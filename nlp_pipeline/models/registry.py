@@ -0,0 +1,117 @@
+# nlp_pipeline/models/registry.py
+"""
+Local registry of versioned model artifacts.
+
+Layout (one directory per version, plus a manifest naming the active one):
+
+    models/registry/
+        manifest.json              {"active": "v2", "versions": {"v1": {...}, "v2": {...}}}
+        v1/bert-priority-model/
+        v1/bert-category-model/
+        v2/...                     optionally also multihead/, onnx/ and cascade/
+
+A version directory mirrors models/artifacts, so any trained artifact directory can
+be registered as-is (see scripts/register_model.py). The manifest is rewritten
+atomically, so readers never see a partial file.
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, Optional
+
+MANIFEST_FILE = "manifest.json"
+PRIORITY_DIR = "bert-priority-model"
+CATEGORY_DIR = "bert-category-model"
+MULTIHEAD_DIR = "multihead"
+CASCADE_DIR = "cascade"
+ONNX_DIR = "onnx"
+
+
+class UnknownModelVersion(LookupError):
+    """Raised for a version that is not in the registry manifest."""
+
+
+class ModelRegistry:
+    def __init__(self, root: str = "models/registry"):
+        self.root = root
+        self.manifest_path = os.path.join(root, MANIFEST_FILE)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def read_manifest(self) -> Dict:
+        if not self.exists():
+            return {"active": None, "versions": {}}
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest: Dict):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def versions(self) -> Dict[str, Dict]:
+        return self.read_manifest()["versions"]
+
+    def active_version(self) -> Optional[str]:
+        return self.read_manifest()["active"]
+
+    def version_dir(self, version: str) -> str:
+        if version not in self.versions():
+            raise UnknownModelVersion(f"Model version not registered: {version}")
+        return os.path.join(self.root, version)
+
+    def artifact_paths(self, version: str) -> Dict[str, Optional[str]]:
+        """Constructor paths for BERTTicketClassifier; multihead/cascade only when the version ships them."""
+        path = self.version_dir(version)
+        multihead = os.path.join(path, MULTIHEAD_DIR)
+        cascade = os.path.join(path, CASCADE_DIR)
+        return {
+            "priority_path": os.path.join(path, PRIORITY_DIR),
+            "category_path": os.path.join(path, CATEGORY_DIR),
+            "multihead_path": multihead if os.path.isdir(multihead) else None,
+            "onnx_dir": os.path.join(path, ONNX_DIR),
+            "cascade_path": cascade if os.path.isdir(cascade) else None,
+        }
+
+    def register(
+        self,
+        version: str,
+        source_dir: str,
+        description: str = "",
+        activate: bool = False,
+        metadata: Optional[Dict] = None
+    ) -> Dict:
+        """Copy an artifact directory (laid out like models/artifacts) in as a new version."""
+        manifest = self.read_manifest()
+        if version in manifest["versions"]:
+            raise ValueError(f"Model version already registered: {version}")
+        has_pair = all(os.path.isdir(os.path.join(source_dir, name)) for name in (PRIORITY_DIR, CATEGORY_DIR))
+        if not has_pair and not os.path.isdir(os.path.join(source_dir, MULTIHEAD_DIR)):
+            raise ValueError(f"{source_dir} has neither {PRIORITY_DIR}/{CATEGORY_DIR} nor {MULTIHEAD_DIR}/")
+
+        target = os.path.join(self.root, version)
+        shutil.copytree(source_dir, target)
+        entry = {
+            "created_at": datetime.utcnow().isoformat(),
+            "description": description,
+            "source": os.path.abspath(source_dir),
+            **(metadata or {})
+        }
+        manifest["versions"][version] = entry
+        if activate or manifest["active"] is None:
+            manifest["active"] = version
+        self._write_manifest(manifest)
+        return entry
+
+    def set_active(self, version: str):
+        manifest = self.read_manifest()
+        if version not in manifest["versions"]:
+            raise UnknownModelVersion(f"Model version not registered: {version}")
+        manifest["active"] = version
+        self._write_manifest(manifest)
@@ -0,0 +1,129 @@
+"""
+Length-aware ticket tokenization.
+
+Descriptions sometimes contain whole pasted logs. Handing those to the tokenizer
+untruncated makes attention cost grow quadratically and fails outright past the
+model's 512-position limit, so every ticket is cut to a token budget first:
+
+    head              keep the first max_length tokens (plain truncation)
+    head_tail         keep the start and the end of the text; the end of a pasted
+                      log usually holds the actual error
+    subject_weighted  always keep the subject (up to subject_max_tokens) and spend
+                      the remaining budget on the description's head and tail
+
+Sequences are padded per batch to the longest member only (dynamic max_length),
+and length_buckets() orders a batch so that similarly sized tickets are padded
+together.
+"""
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+import torch
+
+STRATEGIES = ("head", "head_tail", "subject_weighted")
+
+
+def _head_tail(ids: List[int], budget: int, head_fraction: float) -> List[int]:
+    if len(ids) <= budget:
+        return ids
+    head = int(budget * head_fraction)
+    tail = budget - head
+    return ids[:head] + (ids[-tail:] if tail > 0 else [])
+
+
+def length_buckets(lengths: Sequence[int], batch_size: int) -> List[List[int]]:
+    """Split indices into batches of similar length (longest first) to minimize padding."""
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+class TicketEncoder:
+    """Truncates (subject, description) pairs to a token budget and pads batches dynamically."""
+
+    def __init__(
+        self,
+        tokenizer,
+        strategy: str = "head",
+        max_length: int = 512,
+        head_fraction: float = 0.25,
+        subject_max_tokens: int = 64
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown truncation strategy: {strategy}")
+        self.tokenizer = tokenizer
+        self.strategy = strategy
+        model_limit = getattr(tokenizer, "model_max_length", 512) or 512
+        self.max_length = min(max_length, model_limit)
+        self.head_fraction = head_fraction
+        self.subject_max_tokens = subject_max_tokens
+        self.prefix, self.suffix = self._special_tokens()
+        self.budget = self.max_length - len(self.prefix) - len(self.suffix)
+        self.with_token_type_ids = "token_type_ids" in getattr(tokenizer, "model_input_names", [])
+
+        self._lock = threading.Lock()
+        self.stats = {"sequences": 0, "truncated": 0, "real_tokens": 0, "padded_tokens": 0, "batches": 0}
+
+    def _special_tokens(self) -> Tuple[List[int], List[int]]:
+        """Special tokens the tokenizer wraps around a single sequence (e.g. [CLS] ... [SEP])."""
+        plain = self.tokenizer("ticket", add_special_tokens=False)["input_ids"]
+        wrapped = self.tokenizer("ticket")["input_ids"]
+        for start in range(len(wrapped) - len(plain) + 1):
+            if wrapped[start:start + len(plain)] == plain:
+                return wrapped[:start], wrapped[start + len(plain):]
+        raise ValueError("Could not locate special tokens for this tokenizer")
+
+    def _truncate(self, subject_ids: List[int], description_ids: List[int]) -> List[int]:
+        if self.strategy == "subject_weighted":
+            subject_ids = subject_ids[:min(self.subject_max_tokens, self.budget)]
+            remaining = self.budget - len(subject_ids)
+            return subject_ids + _head_tail(description_ids, remaining, self.head_fraction)
+
+        ids = subject_ids + description_ids
+        if self.strategy == "head_tail":
+            return _head_tail(ids, self.budget, self.head_fraction)
+        return ids[:self.budget]
+
+    def encode(self, items: Sequence[Tuple[str, str]]) -> List[List[int]]:
+        """Token ids (with special tokens) for each ticket, truncated to the budget."""
+        subjects = self.tokenizer([s for s, _ in items], add_special_tokens=False)["input_ids"]
+        descriptions = self.tokenizer([d for _, d in items], add_special_tokens=False)["input_ids"]
+
+        sequences, truncated = [], 0
+        for subject_ids, description_ids in zip(subjects, descriptions):
+            ids = self._truncate(subject_ids, description_ids)
+            truncated += len(ids) < len(subject_ids) + len(description_ids)
+            sequences.append(self.prefix + ids + self.suffix)
+
+        with self._lock:
+            self.stats["sequences"] += len(sequences)
+            self.stats["truncated"] += truncated
+        return sequences
+
+    def pad(self, sequences: Sequence[List[int]]) -> Dict[str, torch.Tensor]:
+        """Pad to the longest sequence in this batch and build the model inputs."""
+        width = max(len(seq) for seq in sequences)
+        input_ids = torch.full((len(sequences), width), self.tokenizer.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(sequences), width), dtype=torch.long)
+        for row, seq in enumerate(sequences):
+            input_ids[row, :len(seq)] = torch.tensor(seq, dtype=torch.long)
+            attention_mask[row, :len(seq)] = 1
+
+        with self._lock:
+            self.stats["batches"] += 1
+            self.stats["real_tokens"] += int(attention_mask.sum())
+            self.stats["padded_tokens"] += input_ids.numel()
+
+        encoded = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if self.with_token_type_ids:
+            encoded["token_type_ids"] = torch.zeros_like(input_ids)
+        return encoded
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+        stats["padding_efficiency"] = (
+            round(stats["real_tokens"] / stats["padded_tokens"], 4) if stats["padded_tokens"] else 1.0
+        )
+        stats["strategy"] = self.strategy
+        stats["max_length"] = self.max_length
+        return stats
@@ -1,29 +1,131 @@
 import re
 import string
-import spacy
+import logging
+from typing import Iterable, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+SPACY_MODEL = "en_core_web_sm"
+# Only lemmas and stop-word flags are used; the lemmatizer needs tok2vec/tagger/attribute_ruler
+SPACY_DISABLED = ["parser", "ner"]
+MODES = ("spacy", "fast", "auto")
+
+# Compiled once instead of on every call
+_EMAIL = re.compile(r'\S+@\S+')
+_URL = re.compile(r'https?://\S+')
+_WHITESPACE = re.compile(r'\s+')
+_STRIP_TABLE = str.maketrans('', '', string.punctuation + string.digits)
+
+_nlp = None
+_stop_words = None
+# Whether the spaCy model loads; settled on the first check so "auto" does not retry the load
+_spacy_available = None
+
+
+def get_stop_words():
+    """
+    The stop-word list spaCy's is_stop uses (sklearn's as a fallback). Loaded on first
+    use: importing spacy pulls in its ML stack, which clean_text alone never needs.
+    """
+    global _stop_words
+    if _stop_words is None:
+        try:
+            from spacy.lang.en.stop_words import STOP_WORDS
+        except ImportError:
+            from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS as STOP_WORDS
+        _stop_words = STOP_WORDS
+    return _stop_words
+
+
+def get_nlp():
+    """Load the spaCy pipeline on first use, without the components we don't need."""
+    global _nlp
+    if _nlp is None:
+        import spacy
+        try:
+            _nlp = spacy.load(SPACY_MODEL, disable=SPACY_DISABLED)
+        except OSError:
+            raise OSError(
+                "spaCy 'en_core_web_sm' model not found. "
+                "Run: python -m spacy download en_core_web_sm"
+            )
+    return _nlp
+
+
+def spacy_available() -> bool:
+    global _spacy_available
+    if _spacy_available is None:
+        try:
+            get_nlp()
+            _spacy_available = True
+        except (ImportError, OSError):
+            _spacy_available = False
+            logger.warning("spaCy model unavailable, preprocessing with the regex fallback")
+    return _spacy_available
+
+
+def __getattr__(name):
+    # `cleaner.nlp` used to be loaded at import time; keep it working, lazily
+    if name == "nlp":
+        return get_nlp()
+    if name == "STOP_WORDS":
+        return get_stop_words()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    raise OSError(
-        "spaCy 'en_core_web_sm' model not found. "
-        "Run: python -m spacy download en_core_web_sm"
-    )
 
 def clean_text(text):
     text = str(text).lower()
-    text = re.sub(r'\S+@\S+', '', text)
-    text = re.sub(r'https?://\S+', '', text)
-    text = text.translate(str.maketrans('', '', string.punctuation + string.digits))
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _EMAIL.sub('', text)
+    text = _URL.sub('', text)
+    text = text.translate(_STRIP_TABLE)
+    text = _WHITESPACE.sub(' ', text).strip()
     return text
 
 def tokenize_and_lemmatize(text):
-    doc = nlp(text)
-    tokens = [token.lemma_ for token in doc if not token.is_stop and token.is_alpha]
-    return tokens
+    doc = get_nlp()(text)
+    return _lemmas(doc)
 
-def preprocess_text(text):
+def tokenize_fast(text) -> List[str]:
+    """Regex/str-only path: alphabetic non-stop-word tokens of cleaned text, not lemmatized."""
+    stop_words = get_stop_words()
+    return [token for token in text.split() if token.isalpha() and token not in stop_words]
+
+def _lemmas(doc) -> List[str]:
+    return [token.lemma_ for token in doc if not token.is_stop and token.is_alpha]
+
+def _resolve_mode(mode: str) -> str:
+    if mode not in MODES:
+        raise ValueError(f"Unknown preprocessing mode: {mode}")
+    if mode == "auto":
+        return "spacy" if spacy_available() else "fast"
+    return mode
+
+def preprocess_text(text, mode: str = "spacy"):
+    """
+    Clean and tokenize one text. mode is "spacy" (lemmatized), "fast" (no spaCy,
+    no lemmatization) or "auto" (spaCy when the model is installed, else fast).
+    """
     cleaned = clean_text(text)
+    if _resolve_mode(mode) == "fast":
+        return " ".join(tokenize_fast(cleaned))
     tokens = tokenize_and_lemmatize(cleaned)
-    return " ".join(tokens)
\ No newline at end of file
+    return " ".join(tokens)
+
+def preprocess_many(
+    texts: Iterable[str],
+    mode: str = "spacy",
+    batch_size: int = 256,
+    n_process: int = 1
+) -> Iterator[str]:
+    """
+    Lazily preprocess an iterable of texts, yielding results in input order.
+    The spaCy mode streams through nlp.pipe in batches (n_process > 1 uses worker
+    processes), which is much faster than calling preprocess_text per text.
+    """
+    cleaned = (clean_text(text) for text in texts)
+    if _resolve_mode(mode) == "fast":
+        for text in cleaned:
+            yield " ".join(tokenize_fast(text))
+        return
+    for doc in get_nlp().pipe(cleaned, batch_size=batch_size, n_process=n_process):
+        yield " ".join(_lemmas(doc))
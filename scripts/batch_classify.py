@@ -1,107 +1,419 @@
 # scripts/batch_classify.py
+import sys
+import os
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
 import pandas as pd
-import requests
+import httpx
 import time
 import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import List, Optional, Tuple
+
+# Add project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Configuration
-API_URL = "http://localhost:8000/classify"
+API_URL = "http://localhost:8000"
 API_KEY = "your-secret-api-key-here-keep-it-safe"  # Must match .env
 INPUT_FILE = "data.csv"
 OUTPUT_FILE = "classified_results.csv"
 
-# Add headers
-headers = {
-    "Content-Type": "application/json",
-    "X-API-Key": API_KEY
+CHUNK_SIZE = 256      # rows read from the CSV (and checkpointed) at a time
+BATCH_SIZE = 32       # tickets per forward pass / per /classify/batch call
+CONCURRENCY = 4       # parallel HTTP requests in API mode
+MAX_RETRIES = 5
+
+ERROR_RESULT = {
+    "priority": "ERROR",
+    "priority_confidence": 0.0,
+    "category": "ERROR",
+    "category_confidence": 0.0
 }
 
 
-def classify_ticket(subject: str, description: str) -> dict:
-    """Call the FastAPI /classify endpoint."""
-    payload = {
-        "subject": subject,
-        "description": description
-    }
+def _with_predictions(chunk: pd.DataFrame, results: List[dict]) -> pd.DataFrame:
+    chunk = chunk.copy()
+    chunk["predicted_priority"] = [r.get("priority") or "ERROR" for r in results]
+    chunk["predicted_priority_confidence"] = [r.get("priority_confidence") or 0.0 for r in results]
+    chunk["predicted_category"] = [r.get("category") or "ERROR" for r in results]
+    chunk["predicted_category_confidence"] = [r.get("category_confidence") or 0.0 for r in results]
+    chunk["error"] = [r.get("error") or "" for r in results]
+    return chunk
+
+
+def _ticket_pairs(chunk: pd.DataFrame) -> List[Tuple[str, str]]:
+    subjects = chunk["subject"].fillna("").astype(str)
+    descriptions = chunk["description"].fillna("").astype(str)
+    return list(zip(subjects, descriptions))
+
+
+# -------------------------------
+# Incremental output + checkpoint
+# -------------------------------
+class ResultWriter:
+    """
+    Appends classified chunks to the output CSV and checkpoints progress.
+
+    The checkpoint next to the output file records how many input rows are done
+    and the output size at that point, so an interrupted run resumes where it
+    stopped (anything written after the last checkpoint is truncated away).
+    """
+
+    def __init__(self, input_file: str, output_file: str, resume: bool = True):
+        self.output_path = Path(output_file)
+        self.checkpoint_path = Path(f"{output_file}.checkpoint")
+
+        checkpoint = {"rows_done": 0, "output_bytes": 0}
+        if resume and self.checkpoint_path.exists():
+            checkpoint = json.loads(self.checkpoint_path.read_text())
+        self.rows_done = checkpoint["rows_done"]
+
+        if self.rows_done and self.output_path.exists():
+            with open(self.output_path, "r+b") as f:
+                f.truncate(checkpoint["output_bytes"])
+            logger.info(f"Resuming after {self.rows_done} already classified tickets")
+        elif self.output_path.exists():
+            self.output_path.unlink()
+
+        self.total = sum(len(c) for c in pd.read_csv(input_file, usecols=[0], chunksize=50_000))
+        logger.info(f"{self.total} tickets in {input_file}, {self.total - self.rows_done} to classify")
+
+        self.classified = 0
+        self.started = time.perf_counter()
+
+    def reader(self, input_file: str, chunk_size: int):
+        return pd.read_csv(
+            input_file,
+            chunksize=chunk_size,
+            skiprows=range(1, self.rows_done + 1) if self.rows_done else None
+        )
+
+    def append(self, result: pd.DataFrame):
+        write_header = not self.output_path.exists() or self.output_path.stat().st_size == 0
+        with open(self.output_path, "a", newline="", encoding="utf-8") as f:
+            result.to_csv(f, header=write_header, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.rows_done += len(result)
+        self.classified += len(result)
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"rows_done": self.rows_done, "output_bytes": self.output_path.stat().st_size}))
+        tmp.replace(self.checkpoint_path)
+
+        elapsed = time.perf_counter() - self.started
+        rate = self.classified / elapsed if elapsed else 0.0
+        eta = (self.total - self.rows_done) / rate if rate else float("inf")
+        logger.info(f"[{self.rows_done}/{self.total}] {rate:.1f} tickets/s, ETA {eta:.0f}s")
+
+    def finish(self):
+        self.checkpoint_path.unlink(missing_ok=True)
+        elapsed = time.perf_counter() - self.started
+        logger.info(
+            f"✅ Classified {self.classified} tickets in {elapsed:.1f}s "
+            f"({self.classified / elapsed if elapsed else 0.0:.1f} tickets/s). Results saved to {self.output_path}"
+        )
+
+        df = pd.read_csv(self.output_path, usecols=["predicted_priority", "predicted_category"])
+        print("\n📊 Prediction Summary:")
+        print(f"Priority: \n{df['predicted_priority'].value_counts().to_dict()}")
+        print(f"Category: \n{df['predicted_category'].value_counts().to_dict()}")
+
+
+# -------------------------------
+# Offline mode (no HTTP)
+# -------------------------------
+# Loaded once in the parent; forked workers inherit it copy-on-write
+_classifier = None
+
+
+def _init_worker(threads: int):
+    import torch
+    torch.set_num_threads(threads)
+
+
+def _classify_chunk(chunk: pd.DataFrame, batch_size: int) -> pd.DataFrame:
+    results = _classifier.classify_batch(_ticket_pairs(chunk), batch_size=batch_size)
+    return _with_predictions(chunk, results)
+
+
+def classify_offline(
+    input_file: str,
+    output_file: str,
+    chunk_size: int = CHUNK_SIZE,
+    batch_size: int = BATCH_SIZE,
+    workers: int = 1,
+    resume: bool = True
+):
+    """
+    Classify a CSV without going through the API.
+
+    The CSV is streamed in chunks, each chunk is classified with
+    BERTTicketClassifier.classify_batch in a worker pool, and results are appended
+    to the output file in input order as soon as they are ready.
+    """
+    global _classifier
+    from nlp_pipeline.models.bert_classifier import BERTTicketClassifier
+
+    writer = ResultWriter(input_file, output_file, resume)
+
+    logger.info("🧠 Loading BERT ticket classifier...")
+    _classifier = BERTTicketClassifier()
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_worker,
+        initargs=(threads,)
+    )
+
+    in_flight = deque()
+    chunks = iter(writer.reader(input_file, chunk_size))
     try:
-        response = requests.post(API_URL, json=payload, headers=headers)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            logger.error(f"API Error {response.status_code}: {response.text}")
-            return {
-                "priority": "ERROR",
-                "priority_confidence": 0.0,
-                "category": "ERROR",
-                "category_confidence": 0.0,
-                "error": f"HTTP {response.status_code}"
-            }
-    except Exception as e:
-        logger.error(f"Request failed: {e}")
-        return {
-            "priority": "ERROR",
-            "priority_confidence": 0.0,
-            "category": "ERROR",
-            "category_confidence": 0.0,
-            "error": str(e)
-        }
+        while True:
+            # Keep a bounded number of chunks in flight so memory stays flat for huge files
+            while len(in_flight) < workers * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                in_flight.append(pool.submit(_classify_chunk, chunk, batch_size))
+            if not in_flight:
+                break
+            writer.append(in_flight.popleft().result())
+    finally:
+        pool.shutdown(cancel_futures=True)
 
+    writer.finish()
 
-def main():
-    # Check if API is reachable
+
+# -------------------------------
+# API mode (async, pooled connections)
+# -------------------------------
+class AdaptiveThrottle:
+    """
+    Concurrency window that backs off on rate limiting instead of sleeping blindly.
+
+    The window halves on every 429/503 and all senders pause for the server's
+    Retry-After; it then grows back by one slot after each run of successes
+    (additive increase / multiplicative decrease).
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.limit = max_concurrency
+        self.active = 0
+        self.paused_until = 0.0
+        self.successes = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            while self.active >= self.limit:
+                await self._cond.wait()
+            self.active += 1
+        delay = self.paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def release(self):
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    async def on_success(self):
+        async with self._cond:
+            self.successes += 1
+            if self.limit < self.max_concurrency and self.successes >= self.limit:
+                self.limit += 1
+                self.successes = 0
+                self._cond.notify_all()
+
+    async def on_throttled(self, retry_after: float):
+        async with self._cond:
+            self.limit = max(1, self.limit // 2)
+            self.successes = 0
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+        logger.warning(f"Rate limited: pausing {retry_after:.1f}s, concurrency -> {self.limit}")
+
+
+def _backoff(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _retry_after(response: httpx.Response, attempt: int) -> float:
+    header = response.headers.get("Retry-After")
     try:
-        health = requests.get("http://localhost:8000/health")
-        if health.status_code != 200:
-            logger.error("API is not healthy")
-            return
-    except:
-        logger.error("❌ Could not connect to FastAPI. Is it running?")
-        return
+        return float(header) + random.uniform(0, 0.5)
+    except (TypeError, ValueError):
+        return _backoff(attempt, base=1.0)
 
-    # Load data
-    if not Path(INPUT_FILE).exists():
-        logger.error(f"{INPUT_FILE} not found in project root")
-        return
 
-    df = pd.read_csv(INPUT_FILE)
-    logger.info(f"Loaded {len(df)} tickets from {INPUT_FILE}")
+class TriageAPIClient:
+    def __init__(self, client: httpx.AsyncClient, throttle: AdaptiveThrottle, max_retries: int = MAX_RETRIES):
+        self.client = client
+        self.throttle = throttle
+        self.max_retries = max_retries
+
+    async def _post(self, path: str, payload: dict) -> Tuple[Optional[dict], str]:
+        """
+        POST with adaptive throttling and jittered retries; returns (json, error).
+        A 429/503 carrying Retry-After means "slow down", not "failed": the request waits
+        out the server's window and does not use up a retry.
+        """
+        error = ""
+        attempt = 0
+        while attempt <= self.max_retries:
+            await self.throttle.acquire()
+            try:
+                response = await self.client.post(path, json=payload)
+            except httpx.TransportError as e:
+                error = f"Request failed: {e}"
+                await asyncio.sleep(_backoff(attempt))
+                attempt += 1
+                continue
+            finally:
+                await self.throttle.release()
+
+            if response.status_code == 200:
+                await self.throttle.on_success()
+                return response.json(), ""
+            if response.status_code in (429, 503):
+                error = f"HTTP {response.status_code}"
+                await self.throttle.on_throttled(_retry_after(response, attempt))
+                if "Retry-After" not in response.headers:
+                    attempt += 1
+                continue
+            if response.status_code >= 500:
+                error = f"HTTP {response.status_code}: {response.text[:200]}"
+                await asyncio.sleep(_backoff(attempt))
+                attempt += 1
+                continue
+            # Client errors won't succeed on retry
+            return None, f"HTTP {response.status_code}: {response.text[:200]}"
+
+        logger.error(f"Giving up on {path} after {self.max_retries + 1} attempts: {error}")
+        return None, error
+
+    async def has_batch_endpoint(self) -> bool:
+        try:
+            response = await self.client.get("/openapi.json")
+            return response.status_code == 200 and "/classify/batch" in response.json().get("paths", {})
+        except (httpx.HTTPError, ValueError):
+            return False
 
-    # Add new columns for predictions
-    df["predicted_priority"] = ""
-    df["predicted_priority_confidence"] = 0.0
-    df["predicted_category"] = ""
-    df["predicted_category_confidence"] = 0.0
-    df["error"] = ""
+    async def classify_one(self, subject: str, description: str) -> dict:
+        result, error = await self._post("/classify", {"subject": subject, "description": description})
+        return result if result is not None else {**ERROR_RESULT, "error": error}
 
-    # Classify each ticket
-    for idx, row in df.head(25).iterrows():
-        logger.info(f"[{idx+1}/{len(df)}] Classifying: {row['subject'][:50]}...")
+    async def classify_many(self, pairs: List[Tuple[str, str]]) -> List[dict]:
+        payload = {"items": [{"subject": s, "description": d} for s, d in pairs]}
+        result, error = await self._post("/classify/batch", payload)
+        if result is None:
+            if error.startswith("HTTP 413") and len(pairs) > 1:
+                # Server caps batch size lower than ours; split and retry
+                half = len(pairs) // 2
+                return await self.classify_many(pairs[:half]) + await self.classify_many(pairs[half:])
+            return [{**ERROR_RESULT, "error": error} for _ in pairs]
+        return sorted(result["results"], key=lambda r: r["index"])
 
-        result = classify_ticket(row["subject"], row["description"])
 
-        df.at[idx, "predicted_priority"] = result.get("priority", "ERROR")
-        df.at[idx, "predicted_priority_confidence"] = result.get("priority_confidence", 0.0)
-        df.at[idx, "predicted_category"] = result.get("category", "ERROR")
-        df.at[idx, "predicted_category_confidence"] = result.get("category_confidence", 0.0)
-        df.at[idx, "error"] = result.get("error", "")
+async def classify_via_api_async(
+    input_file: str,
+    output_file: str,
+    api_url: str = API_URL,
+    chunk_size: int = CHUNK_SIZE,
+    batch_size: int = BATCH_SIZE,
+    concurrency: int = CONCURRENCY,
+    use_batch_endpoint: bool = True,
+    resume: bool = True
+):
+    """
+    Classify a CSV through the API over a pooled keep-alive connection.
+
+    Requests run concurrently (bounded by an adaptive throttle that honours
+    429/503 Retry-After), failures are retried with jittered backoff, and
+    /classify/batch is used automatically when the server exposes it.
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {"X-API-Key": API_KEY}
+    async with httpx.AsyncClient(base_url=api_url, headers=headers, limits=limits, timeout=60.0) as client:
+        try:
+            health = await client.get("/health")
+            if health.status_code != 200:
+                logger.error("API is not healthy")
+                return
+        except httpx.HTTPError:
+            logger.error("❌ Could not connect to FastAPI. Is it running?")
+            return
+
+        api = TriageAPIClient(client, AdaptiveThrottle(concurrency))
+        use_batch = use_batch_endpoint and await api.has_batch_endpoint()
+        logger.info(f"Using {'/classify/batch' if use_batch else '/classify'} with concurrency {concurrency}")
+
+        writer = ResultWriter(input_file, output_file, resume)
+        for chunk in writer.reader(input_file, chunk_size):
+            pairs = _ticket_pairs(chunk)
+            if use_batch:
+                groups = [pairs[i:i + batch_size] for i in range(0, len(pairs), batch_size)]
+                grouped = await asyncio.gather(*(api.classify_many(group) for group in groups))
+                results = [result for group in grouped for result in group]
+            else:
+                results = await asyncio.gather(*(api.classify_one(s, d) for s, d in pairs))
+            writer.append(_with_predictions(chunk, results))
+        writer.finish()
 
-        # Rate limiting: 10/min → wait 6 seconds between calls
-        time.sleep(0.6)
 
-    # Save results
-    df.to_csv(OUTPUT_FILE, index=False)
-    logger.info(f"✅ Classification complete! Results saved to {OUTPUT_FILE}")
+def main():
+    parser = argparse.ArgumentParser(description="Classify a CSV of tickets.")
+    parser.add_argument("--offline", action="store_true", help="Load the model in-process instead of calling the API")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (offline mode)")
+    parser.add_argument("--api-url", default=API_URL, help="Base URL of the API (API mode)")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Parallel requests (API mode)")
+    parser.add_argument("--no-batch-endpoint", action="store_true", help="Always use /classify (API mode)")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore an existing checkpoint and start over")
+    args = parser.parse_args()
+
+    if not Path(args.input).exists():
+        logger.error(f"{args.input} not found")
+        return
 
-    # Print summary
-    print("\n📊 Prediction Summary:")
-    print(f"Priority: \n{df['predicted_priority'].value_counts().to_dict()}")
-    print(f"Category: \n{df['predicted_category'].value_counts().to_dict()}")
+    if args.offline:
+        classify_offline(
+            args.input,
+            args.output,
+            chunk_size=args.chunk_size,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            resume=not args.no_resume
+        )
+    else:
+        asyncio.run(classify_via_api_async(
+            args.input,
+            args.output,
+            api_url=args.api_url,
+            chunk_size=args.chunk_size,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            use_batch_endpoint=not args.no_batch_endpoint,
+            resume=not args.no_resume
+        ))
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
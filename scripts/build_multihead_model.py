@@ -0,0 +1,39 @@
+# scripts/build_multihead_model.py
+import sys
+import os
+import argparse
+import logging
+
+# Add project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlp_pipeline.models.multihead import build_multihead_artifact
+
+logging.basicConfig(level=logging.INFO)
+
+PRIORITY_MODEL = "models/artifacts/bert-priority-model"
+CATEGORY_MODEL = "models/artifacts/bert-category-model"
+OUTPUT_DIR = "models/artifacts/bert-multihead-model"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge priority/category models into one shared-encoder artifact.")
+    parser.add_argument("--priority", default=PRIORITY_MODEL)
+    parser.add_argument("--category", default=CATEGORY_MODEL)
+    parser.add_argument("--output", default=OUTPUT_DIR)
+    parser.add_argument("--atol", type=float, default=1e-6, help="Tolerance when comparing encoder weights")
+    parser.add_argument("--force", action="store_true", help="Merge even if the encoders differ")
+    args = parser.parse_args()
+
+    try:
+        path = build_multihead_artifact(args.priority, args.category, args.output, atol=args.atol, force=args.force)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"✅ Multi-head model saved to {path}")
+    print(f"   Enable it with MULTIHEAD_MODEL_PATH={path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# scripts/export_onnx.py
+import sys
+import os
+import argparse
+import logging
+import time
+
+import pandas as pd
+
+# Add project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlp_pipeline.models.onnx_backend import export_to_onnx
+from nlp_pipeline.models.bert_classifier import BERTTicketClassifier
+
+logging.basicConfig(level=logging.INFO)
+
+MODELS = {
+    "bert-priority-model": "models/artifacts/bert-priority-model",
+    "bert-category-model": "models/artifacts/bert-category-model",
+}
+OUTPUT_DIR = "models/artifacts/onnx"
+REFERENCE_FILE = "classified_results.csv"
+
+
+def parity_check(onnx_dir: str, quantized: bool, reference_file: str, min_agreement: float) -> bool:
+    """
+    Compare ONNX predictions with the PyTorch predictions stored in classified_results.csv.
+    Rows without a reference prediction are skipped.
+    """
+    df = pd.read_csv(reference_file)
+    df = df[df["predicted_priority"].notna() & (df["predicted_priority"] != "")]
+    if df.empty:
+        print(f"⚠️  No reference predictions in {reference_file}")
+        return False
+
+    classifier = BERTTicketClassifier(backend="onnx", onnx_dir=onnx_dir, onnx_quantized=quantized)
+    items = list(zip(df["subject"].astype(str), df["description"].astype(str)))
+
+    start = time.perf_counter()
+    results = classifier.classify_batch(items)
+    elapsed = time.perf_counter() - start
+
+    priority_match = sum(r.get("priority") == ref for r, ref in zip(results, df["predicted_priority"]))
+    category_match = sum(r.get("category") == ref for r, ref in zip(results, df["predicted_category"]))
+    confidence_delta = sum(
+        abs(r.get("priority_confidence", 0.0) - p) + abs(r.get("category_confidence", 0.0) - c)
+        for r, p, c in zip(results, df["predicted_priority_confidence"], df["predicted_category_confidence"])
+    ) / (2 * len(df))
+    priority_acc = sum(r.get("priority") == t for r, t in zip(results, df["priority"])) / len(df)
+    category_acc = sum(r.get("category") == t for r, t in zip(results, df["category"])) / len(df)
+
+    priority_agreement = priority_match / len(df)
+    category_agreement = category_match / len(df)
+    print(f"\n📊 Parity vs {reference_file} ({len(df)} tickets, {'INT8' if quantized else 'FP32'})")
+    print(f"   Priority agreement:   {priority_agreement:.2%}  (accuracy {priority_acc:.2%})")
+    print(f"   Category agreement:   {category_agreement:.2%}  (accuracy {category_acc:.2%})")
+    print(f"   Mean |Δ confidence|:  {confidence_delta:.4f}")
+    print(f"   Throughput:           {len(df) / elapsed:.1f} tickets/s")
+
+    return priority_agreement >= min_agreement and category_agreement >= min_agreement
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the BERT classifiers to ONNX (optionally INT8).")
+    parser.add_argument("--output", default=OUTPUT_DIR)
+    parser.add_argument("--quantize", action="store_true", help="Also write a dynamically INT8-quantized model")
+    parser.add_argument("--skip-export", action="store_true", help="Only run the parity check")
+    parser.add_argument("--reference", default=REFERENCE_FILE)
+    parser.add_argument("--min-agreement", type=float, default=0.96)
+    args = parser.parse_args()
+
+    if not args.skip_export:
+        for name, path in MODELS.items():
+            exported = export_to_onnx(path, os.path.join(args.output, name), quantize=args.quantize)
+            print(f"✅ {name} -> {exported}")
+
+    ok = parity_check(args.output, args.quantize, args.reference, args.min_agreement)
+    if not ok:
+        print(f"❌ Label agreement below {args.min_agreement:.0%}")
+        sys.exit(1)
+    print("✅ Parity check passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# scripts/rebuild_rollups.py
+import sys
+import os
+import argparse
+from datetime import datetime, timedelta
+
+# Add project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.db.mongo import get_db, close_db
+from app.db.rollups import GRANULARITIES, KEY_FIELDS, UNKNOWN, ROLLUP_INDEXES
+
+
+def rollup_pipeline(granularity: str, since: datetime = None) -> list:
+    """Aggregate classified_tickets into the same documents the API maintains incrementally."""
+    match = {"classification_timestamp": {"$gte": since}} if since else {}
+    shaped = {
+        "granularity": granularity,
+        "bucket": {"$dateTrunc": {"date": "$classification_timestamp", "unit": granularity}},
+        "client_id": {"$ifNull": ["$client_id", UNKNOWN]},
+        "priority": {"$ifNull": ["$predicted_priority", UNKNOWN]},
+        "category": {"$ifNull": ["$predicted_category", UNKNOWN]},
+    }
+    output = {field: f"$_id.{field}" for field in KEY_FIELDS}
+    output["count"] = 1
+    if granularity == "minute":
+        output["expires_at"] = {"$dateAdd": {
+            "startDate": "$_id.bucket",
+            "unit": "hour",
+            "amount": settings.ROLLUP_MINUTE_RETENTION_HOURS
+        }}
+    return [
+        {"$match": match},
+        {"$group": {"_id": shaped, "count": {"$sum": 1}}},
+        {"$project": {"_id": 0, **output}},
+        {"$merge": {"into": "ticket_rollups", "on": list(KEY_FIELDS), "whenMatched": "replace"}}
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute ticket_rollups from classified_tickets.")
+    parser.add_argument(
+        "--minute-hours", type=float, default=settings.ROLLUP_MINUTE_RETENTION_HOURS,
+        help="Only rebuild minute rollups for this many recent hours (older ones would expire anyway)"
+    )
+    args = parser.parse_args()
+
+    db = get_db()
+    rollups = db["ticket_rollups"]
+    rollups.create_indexes(ROLLUP_INDEXES)
+
+    print("🧹 Clearing ticket_rollups...")
+    rollups.delete_many({})
+    for granularity in GRANULARITIES:
+        since = datetime.utcnow() - timedelta(hours=args.minute_hours) if granularity == "minute" else None
+        print(f"🔄 Rebuilding {granularity} rollups...")
+        db["classified_tickets"].aggregate(rollup_pipeline(granularity, since), allowDiskUse=True)
+        count = rollups.count_documents({"granularity": granularity})
+        print(f"✅ {count} {granularity} buckets")
+
+    close_db()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# scripts/register_model.py
+"""
+Manage the local model registry (see nlp_pipeline/models/registry.py).
+
+  python scripts/register_model.py list
+  python scripts/register_model.py register v2 --source models/artifacts --description "Retrained on Q3 tickets"
+  python scripts/register_model.py activate v2
+
+Running services pick up a new active version within MODEL_REGISTRY_POLL_SECONDS
+(unless pinned with MODEL_VERSION), or immediately via POST /admin/models/{version}/activate.
+"""
+import sys
+import os
+import argparse
+import json
+
+# Add project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from nlp_pipeline.models.registry import ModelRegistry, UnknownModelVersion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage versioned model artifacts")
+    parser.add_argument("--registry", default=settings.MODEL_REGISTRY_DIR, help="Registry directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="Show registered versions and the active one")
+
+    register = commands.add_parser("register", help="Copy an artifact directory in as a new version")
+    register.add_argument("version")
+    register.add_argument("--source", default="models/artifacts",
+                          help="Directory with bert-priority-model/ and bert-category-model/ (or multihead/)")
+    register.add_argument("--description", default="")
+    register.add_argument("--activate", action="store_true", help="Make it the active version")
+
+    activate = commands.add_parser("activate", help="Set the active version")
+    activate.add_argument("version")
+
+    args = parser.parse_args()
+    registry = ModelRegistry(args.registry)
+
+    try:
+        if args.command == "register":
+            registry.register(args.version, args.source, description=args.description, activate=args.activate)
+            print(f"✅ Registered {args.version} from {args.source}")
+        elif args.command == "activate":
+            registry.set_active(args.version)
+            print(f"✅ Active model version: {args.version}")
+    except (ValueError, UnknownModelVersion, OSError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(json.dumps(registry.read_manifest(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
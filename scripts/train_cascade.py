@@ -0,0 +1,232 @@
+# scripts/train_cascade.py
+"""
+Train the TF-IDF + logistic regression first stage of the classification cascade
+and write a calibration report of the accuracy/latency tradeoff per threshold.
+
+  python scripts/train_cascade.py
+  python scripts/train_cascade.py --extra classified_results.csv --no-bert
+
+The held-out split is grouped by ticket text, so duplicated tickets never end up
+on both sides. For each threshold the report gives the share of tickets the first
+stage answers, its accuracy on them, the accuracy of the whole cascade (escalated
+tickets answered by BERT) and the expected latency per ticket. Serve the result
+with CASCADE_MODEL_PATH and CASCADE_THRESHOLD (see the recommended threshold).
+"""
+import sys
+import os
+import argparse
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import GroupShuffleSplit
+
+# Add project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlp_pipeline.models.cascade import HEADS, FastTicketClassifier
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INPUT_FILE = "data.csv"
+OUTPUT_DIR = "models/artifacts/cascade"
+THRESHOLDS = [0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, 0.97, 0.99]
+CALIBRATION_BINS = 10
+
+
+def load_labeled(paths: List[str]) -> pd.DataFrame:
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path)
+        df.columns = [col.strip().lower() for col in df.columns]
+        frames.append(df[["subject", "description", "priority", "category"]])
+    df = pd.concat(frames, ignore_index=True).dropna(subset=["priority", "category"])
+    df[["subject", "description"]] = df[["subject", "description"]].fillna("").astype(str)
+    return df
+
+
+def expected_calibration_error(confidence: np.ndarray, correct: np.ndarray, bins: int = CALIBRATION_BINS) -> float:
+    """Bin-weighted gap between mean confidence and accuracy."""
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    error = 0.0
+    for low, high in zip(edges[:-1], edges[1:]):
+        in_bin = (confidence > low) & (confidence <= high)
+        if in_bin.any():
+            error += in_bin.mean() * abs(confidence[in_bin].mean() - correct[in_bin].mean())
+    return float(error)
+
+
+def mean_latency_ms(fn, items, repeats: int = 1) -> float:
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for item in items:
+            fn([item])
+    return (time.perf_counter() - started) / (repeats * len(items)) * 1000
+
+
+def bert_predictions(items) -> Optional[Dict]:
+    """BERT labels and per-ticket latency on the held-out tickets, or None if the model won't load."""
+    try:
+        from nlp_pipeline.models.bert_classifier import BERTTicketClassifier
+        classifier = BERTTicketClassifier()
+        classifier.warm_up()
+    except Exception as e:
+        logger.warning(f"BERT unavailable ({e}); the report covers the first stage only")
+        return None
+
+    results = classifier.classify_batch(items)
+    return {
+        "priority": np.array([r.get("priority") for r in results]),
+        "category": np.array([r.get("category") for r in results]),
+        "latency_ms": mean_latency_ms(lambda batch: classifier.classify(*batch[0]), items[:100])
+    }
+
+
+def calibration_report(test: pd.DataFrame, fast: Dict, fast_latency_ms: float,
+                       bert: Optional[Dict], thresholds: List[float]) -> Dict:
+    truth = {head: test[head].to_numpy() for head in HEADS}
+    confidence = np.minimum(fast["priority_score"], fast["category_score"])
+    report = {
+        "held_out_tickets": len(test),
+        "fast_latency_ms": round(fast_latency_ms, 3),
+        "fast_accuracy": {head: round(float((fast[head] == truth[head]).mean()), 4) for head in HEADS},
+        "fast_ece": {
+            head: round(expected_calibration_error(fast[f"{head}_score"], fast[head] == truth[head]), 4)
+            for head in HEADS
+        },
+        "thresholds": []
+    }
+    if bert is not None:
+        report["bert_latency_ms"] = round(bert["latency_ms"], 3)
+        report["bert_accuracy"] = {head: round(float((bert[head] == truth[head]).mean()), 4) for head in HEADS}
+
+    for threshold in thresholds:
+        answered = confidence >= threshold
+        row = {"threshold": threshold, "fast_rate": round(float(answered.mean()), 4)}
+        for head in HEADS:
+            correct = fast[head] == truth[head]
+            row[f"fast_{head}_accuracy"] = round(float(correct[answered].mean()), 4) if answered.any() else None
+            if bert is not None:
+                cascade = np.where(answered, fast[head], bert[head])
+                row[f"cascade_{head}_accuracy"] = round(float((cascade == truth[head]).mean()), 4)
+        if bert is not None:
+            # Every ticket pays for the first stage; escalated ones also pay for BERT
+            row["expected_latency_ms"] = round(fast_latency_ms + (1 - answered.mean()) * bert["latency_ms"], 3)
+        report["thresholds"].append(row)
+    return report
+
+
+def recommend_threshold(report: Dict, max_accuracy_drop: float, min_fast_accuracy: float) -> Optional[float]:
+    """Lowest threshold (most tickets skipping BERT) that stays within the accuracy budget."""
+    for row in report["thresholds"]:
+        if "bert_accuracy" in report:
+            ok = all(
+                row[f"cascade_{head}_accuracy"] >= report["bert_accuracy"][head] - max_accuracy_drop
+                for head in HEADS
+            )
+        else:
+            ok = all(
+                row[f"fast_{head}_accuracy"] is not None and row[f"fast_{head}_accuracy"] >= min_fast_accuracy
+                for head in HEADS
+            )
+        if ok:
+            return row["threshold"]
+    return None
+
+
+def print_report(report: Dict):
+    has_bert = "bert_accuracy" in report
+    print(f"\n📊 Calibration report ({report['held_out_tickets']} held-out tickets)")
+    print(f"   First stage: {report['fast_latency_ms']:.2f} ms/ticket, accuracy {report['fast_accuracy']}, "
+          f"ECE {report['fast_ece']}")
+    if has_bert:
+        print(f"   BERT only:   {report['bert_latency_ms']:.2f} ms/ticket, accuracy {report['bert_accuracy']}")
+    header = f"{'threshold':>9}  {'fast rate':>9}  {'fast prio':>9}  {'fast cat':>9}"
+    if has_bert:
+        header += f"  {'casc prio':>9}  {'casc cat':>9}  {'ms/ticket':>9}"
+    print(header)
+
+    def cell(value):
+        return f"{value:>9.3f}" if value is not None else f"{'-':>9}"
+
+    for row in report["thresholds"]:
+        line = (f"{row['threshold']:>9.2f}  {cell(row['fast_rate'])}  "
+                f"{cell(row['fast_priority_accuracy'])}  {cell(row['fast_category_accuracy'])}")
+        if has_bert:
+            line += (f"  {cell(row['cascade_priority_accuracy'])}  {cell(row['cascade_category_accuracy'])}"
+                     f"  {cell(row['expected_latency_ms'])}")
+        print(line)
+    print(f"   Recommended CASCADE_THRESHOLD: {report['recommended_threshold']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the cascade first stage and calibrate its threshold")
+    parser.add_argument("--data", default=INPUT_FILE, help="Labeled CSV (subject, description, priority, category)")
+    parser.add_argument("--extra", nargs="*", default=[], help="More labeled CSVs, e.g. classified_results.csv")
+    parser.add_argument("--output", default=OUTPUT_DIR)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--preprocess-mode", default="fast", choices=["fast", "spacy"],
+                        help="Text preprocessing used for training and serving")
+    parser.add_argument("--thresholds", default=",".join(str(t) for t in THRESHOLDS))
+    parser.add_argument("--no-bert", action="store_true", help="Skip running BERT on the held-out tickets")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.01,
+                        help="Allowed cascade accuracy loss vs. BERT only, per head")
+    parser.add_argument("--min-fast-accuracy", type=float, default=0.95,
+                        help="Required first-stage accuracy on answered tickets when BERT is skipped")
+    args = parser.parse_args()
+
+    df = load_labeled([args.data, *args.extra])
+    groups = (df["subject"] + " " + df["description"]).str.lower().str.split().str.join(" ")
+    train_idx, test_idx = next(
+        GroupShuffleSplit(n_splits=1, test_size=args.test_size, random_state=args.seed).split(df, groups=groups)
+    )
+    train, test = df.iloc[train_idx], df.iloc[test_idx]
+    print(f"📂 {len(df)} labeled tickets ({groups.nunique()} distinct): {len(train)} train, {len(test)} held out")
+
+    started = time.perf_counter()
+    model = FastTicketClassifier.fit(
+        list(zip(train["subject"], train["description"])),
+        {head: train[head].tolist() for head in HEADS},
+        preprocess_mode=args.preprocess_mode,
+        seed=args.seed
+    )
+    print(f"✅ Trained in {time.perf_counter() - started:.1f}s")
+
+    items = list(zip(test["subject"], test["description"]))
+    priorities, categories = model.predict(items)
+    fast = {
+        "priority": np.array([p["label"] for p in priorities]),
+        "category": np.array([c["label"] for c in categories]),
+        "priority_score": np.array([p["score"] for p in priorities]),
+        "category_score": np.array([c["score"] for c in categories]),
+    }
+    fast_latency_ms = mean_latency_ms(model.predict, items[:100])
+    bert = None if args.no_bert else bert_predictions(items)
+
+    thresholds = sorted(float(t) for t in args.thresholds.split(",") if t.strip())
+    report = calibration_report(test, fast, fast_latency_ms, bert, thresholds)
+    report["recommended_threshold"] = recommend_threshold(report, args.max_accuracy_drop, args.min_fast_accuracy)
+    print_report(report)
+
+    model.metadata = {
+        "trained_at": datetime.utcnow().isoformat(),
+        "sources": [args.data, *args.extra],
+        "train_tickets": len(train),
+        "preprocess_mode": args.preprocess_mode,
+        "seed": args.seed,
+        "calibration": report
+    }
+    model.save(args.output)
+    with open(os.path.join(args.output, "calibration_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Saved first stage and calibration report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
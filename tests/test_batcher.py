@@ -0,0 +1,49 @@
+import threading
+
+import pytest
+
+from app.core.batcher import MicroBatcher
+from app.core.executor import InferenceQueueFull
+
+
+class BlockingClassifier:
+    """classify_batch blocks until released, so later submissions stay queued."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def classify_batch(self, items, batch_size):
+        self.started.set()
+        self.release.wait(5)
+        return [{"priority": "High", "subject": subject} for subject, _ in items]
+
+
+def test_batches_resolve_in_order():
+    classifier = BlockingClassifier()
+    classifier.release.set()
+    batcher = MicroBatcher(classifier, max_batch_size=4, max_wait_ms=20)
+    batcher.start()
+    futures = [batcher.submit(f"s{i}", "d") for i in range(3)]
+    assert [f.result(timeout=5)["subject"] for f in futures] == ["s0", "s1", "s2"]
+    batcher.stop()
+
+
+def test_stop_fails_queued_tickets():
+    classifier = BlockingClassifier()
+    batcher = MicroBatcher(classifier, max_batch_size=1, max_wait_ms=0)
+    batcher.start()
+    in_flight = batcher.submit("first", "d")
+    assert classifier.started.wait(5)
+    queued = [batcher.submit(f"s{i}", "d") for i in range(3)]
+
+    batcher.stop(timeout=0.1)
+    for future in queued:
+        with pytest.raises(InferenceQueueFull):
+            future.result(timeout=1)
+    with pytest.raises(InferenceQueueFull):
+        batcher.submit("late", "d")
+
+    # The batch already running still completes
+    classifier.release.set()
+    assert in_flight.result(timeout=5)["subject"] == "first"
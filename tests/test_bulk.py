@@ -0,0 +1,60 @@
+import asyncio
+import os
+
+import pytest
+from bson import ObjectId, json_util
+
+from app.db.bulk import TicketSpool, WriteBehindBuffer
+
+
+def write_ndjson(path, docs):
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(json_util.dumps(doc) + "\n" for doc in docs)
+
+
+def tickets(count):
+    return [{"_id": ObjectId(), "subject": f"s{i}"} for i in range(count)]
+
+
+def test_take_moves_the_spool_aside(tmp_path):
+    spool = TicketSpool(str(tmp_path / "spool.ndjson"))
+    assert spool.take() is None
+    spool.append(tickets(3))
+    assert len(spool) == 3
+    replay_path = spool.take()
+    assert replay_path == spool.replay_path and not os.path.exists(spool.path)
+    assert len(spool) == 3
+    spool.done()
+    assert len(spool) == 0 and not os.path.exists(replay_path)
+
+
+def test_leftover_replay_file_is_counted_and_taken_first(tmp_path):
+    path = str(tmp_path / "spool.ndjson")
+    write_ndjson(f"{path}.replay", tickets(2))
+    spool = TicketSpool(path)
+    assert len(spool) == 2
+    spool.append(tickets(1))
+    assert len(spool) == 3
+    assert spool.take() == f"{path}.replay"
+    assert len(list(TicketSpool.read(spool.take(), chunk_size=10))[0]) == 2
+
+
+def test_replay_left_behind_by_a_crash_is_reinserted(tmp_path):
+    mongo_standin = pytest.importorskip("benchmarks.mongo_standin")
+    collection = mongo_standin.AsyncMongomockClient()["test"]["classified_tickets"]
+    path = str(tmp_path / "spool.ndjson")
+    docs = tickets(5)
+    # The crash hit after the first two documents of the replay were written
+    write_ndjson(f"{path}.replay", docs)
+
+    async def restart():
+        await collection.insert_many(docs[:2])
+        buffer = WriteBehindBuffer(collection, spool_path=path)
+        assert len(buffer.spool) == 5
+        await buffer.replay_spool()
+        return buffer, await collection.count_documents({})
+
+    buffer, stored = asyncio.run(restart())
+    assert stored == 5
+    assert buffer.stats["replayed"] == 5 and buffer.stats["failed"] == 0
+    assert len(buffer.spool) == 0 and not os.path.exists(f"{path}.replay")
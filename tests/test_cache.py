@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from app.core.cache import PredictionCache, normalize_ticket_text, prediction_key
+
+RESULT = {"priority": "High", "priority_confidence": 0.9, "category": "Billing", "category_confidence": 0.8}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_normalize_ignores_case_and_whitespace():
+    assert normalize_ticket_text("  Login  FAILS", "on\tmobile\n") == "login fails on mobile"
+
+
+def test_key_depends_on_model_version():
+    assert prediction_key("a", "b", "v1") == prediction_key("A", " b ", "v1")
+    assert prediction_key("a", "b", "v1") != prediction_key("a", "b", "v2")
+
+
+def test_hit_and_miss_counters():
+    cache = PredictionCache("v1")
+    assert run(cache.get("subject", "body")) is None
+    run(cache.set("subject", "body", RESULT))
+    assert run(cache.get("SUBJECT", "body")) == RESULT
+    assert cache.counters["misses"] == 1
+    assert cache.counters["memory_hits"] == 1
+
+
+def test_returns_copies():
+    cache = PredictionCache("v1")
+    run(cache.set("s", "d", RESULT))
+    run(cache.get("s", "d"))["priority"] = "Low"
+    assert run(cache.get("s", "d"))["priority"] == "High"
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = PredictionCache("v1", max_entries=2)
+    run(cache.set("a", "a", RESULT))
+    run(cache.set("b", "b", RESULT))
+    run(cache.get("a", "a"))
+    run(cache.set("c", "c", RESULT))
+    assert run(cache.get("a", "a")) is not None
+    assert run(cache.get("b", "b")) is None
+    assert cache.counters["evictions"] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = PredictionCache("v1", ttl_seconds=10)
+    run(cache.set("s", "d", RESULT))
+    now[0] += 9
+    assert run(cache.get("s", "d")) is not None
+    now[0] += 2
+    assert run(cache.get("s", "d")) is None
+    assert cache.counters["expirations"] == 1
+
+
+def test_other_model_version_misses():
+    old = PredictionCache("v1")
+    run(old.set("s", "d", RESULT))
+    new = PredictionCache("v2")
+    new._entries = old._entries
+    assert run(new.get("s", "d")) is None
+
+
+def test_error_results_are_not_cached():
+    cache = PredictionCache("v1")
+    run(cache.set("s", "d", {"error": "boom"}))
+    assert cache.stats()["size"] == 0
+
+
+def test_get_many_uses_one_mongo_lookup_for_misses():
+    mongo_standin = pytest.importorskip("benchmarks.mongo_standin")
+    collection = mongo_standin.AsyncMongomockClient()["test"]["prediction_cache"]
+    shared = PredictionCache("v1", collection=collection)
+    run(shared.set_many([("in", "mongo"), ("bad", "row")], [RESULT, {"error": "boom"}]))
+
+    cache = PredictionCache("v1", collection=collection)
+    run(cache.set("in", "memory", RESULT))
+    lookups = []
+    find = collection.find
+    collection.find = lambda *args, **kwargs: lookups.append(args) or find(*args, **kwargs)
+
+    items = [("in", "memory"), ("in", "mongo"), ("bad", "row"), ("in", "mongo")]
+    assert run(cache.get_many(items)) == [RESULT, RESULT, None, RESULT]
+    assert len(lookups) == 1
+    assert (cache.counters["memory_hits"], cache.counters["mongo_hits"], cache.counters["misses"]) == (1, 2, 1)
+    # Mongo hits are promoted to the in-process tier
+    assert run(cache.get("in", "mongo")) == RESULT
+    assert cache.counters["memory_hits"] == 2
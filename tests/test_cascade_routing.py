@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from nlp_pipeline.models.bert_classifier import BERTTicketClassifier
+
+
+class KeywordCascade:
+    """Confident only for tickets whose subject starts with "easy"."""
+
+    def predict(self, items):
+        scores = [0.99 if subject.startswith("easy") else 0.1 for subject, _ in items]
+        predictions = [{"label": "Low", "score": score} for score in scores]
+        return predictions, [{"label": "General", "score": score} for score in scores]
+
+
+def cascaded_classifier(fail_encode=False, fail_chunk=False):
+    """A classifier with the cascade wired in and BERT replaced by canned answers."""
+    classifier = BERTTicketClassifier.__new__(BERTTicketClassifier)
+    classifier.cascade = KeywordCascade()
+    classifier.cascade_threshold = 0.9
+    classifier.routing = {"fast": 0, "bert": 0}
+    classifier._routing_lock = threading.Lock()
+    classifier.stage_observer = None
+    classifier.model_version = "test"
+    classifier.single_pass = True
+
+    def encode(items):
+        if fail_encode and len(items) > 1:
+            raise RuntimeError("tokenizer failed")
+        return [[1]] * len(items), [[1]] * len(items)
+
+    def predict_encoded(priority_seqs, category_seqs):
+        if fail_chunk and len(priority_seqs) > 1:
+            raise RuntimeError("chunk failed")
+        rows = len(priority_seqs)
+        return [{"label": "High", "score": 0.8}] * rows, [{"label": "Technical", "score": 0.7}] * rows
+
+    classifier._encode = encode
+    classifier._predict_encoded = predict_encoded
+    classifier._predict = lambda items: predict_encoded(*encode(items))
+    return classifier
+
+
+ITEMS = [("easy one", "d"), ("hard one", "d"), ("hard two", "d"), ("easy two", "d")]
+
+
+@pytest.mark.parametrize("failure", [{}, {"fail_encode": True}, {"fail_chunk": True}])
+def test_each_ticket_is_routed_once(failure):
+    classifier = cascaded_classifier(**failure)
+    results = classifier.classify_batch(ITEMS, batch_size=4)
+    assert [result["stage"] for result in results] == ["fast", "bert", "bert", "fast"]
+    assert classifier.routing == {"fast": 2, "bert": 2}
+
+
+def test_single_ticket_goes_through_the_cascade():
+    classifier = cascaded_classifier()
+    assert classifier.classify("easy", "d")["stage"] == "fast"
+    assert classifier.classify("hard", "d")["priority"] == "High"
+    assert classifier.routing == {"fast": 1, "bert": 1}
@@ -0,0 +1,24 @@
+import logging
+
+from nlp_pipeline.preprocessing import cleaner
+
+
+def test_clean_text_strips_emails_urls_and_punctuation():
+    text = "Email ME at a@b.com, see https://x.io/y?z=1 -- ERROR 500!!"
+    assert cleaner.clean_text(text) == "email me at see error"
+
+
+def test_auto_mode_checks_for_spacy_once(monkeypatch, caplog):
+    calls = []
+
+    def missing_model():
+        calls.append(1)
+        raise OSError("model not found")
+
+    monkeypatch.setattr(cleaner, "_spacy_available", None)
+    monkeypatch.setattr(cleaner, "get_nlp", missing_model)
+    with caplog.at_level(logging.WARNING, logger=cleaner.__name__):
+        results = [cleaner.preprocess_text("The printers are offline again", mode="auto") for _ in range(3)]
+    assert results == ["printers offline"] * 3
+    assert len(calls) == 1
+    assert len([r for r in caplog.records if "regex fallback" in r.getMessage()]) == 1
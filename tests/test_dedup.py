@@ -0,0 +1,78 @@
+import pytest
+
+from app.core import dedup
+from app.core.dedup import NearDuplicateIndex, lsh_bands
+
+TICKET = (
+    "Cannot log in",
+    "Since this morning the login page returns an error 500 after I enter my password and press submit."
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(dedup.time, "monotonic", lambda: now[0])
+    return now
+
+
+def indexed(index, key, subject, description, **kwargs):
+    index.add(key, index.signature(subject, description), {"ticket_id": key}, **kwargs)
+
+
+def test_lsh_bands_put_the_midpoint_below_the_threshold():
+    bands, rows = lsh_bands(128, 0.85)
+    assert (bands, rows) == (9, 13)
+    assert (1 / bands) ** (1 / rows) <= 0.85
+
+
+def test_near_duplicate_matches_and_unrelated_ticket_does_not():
+    index = NearDuplicateIndex()
+    indexed(index, "a", *TICKET)
+    key, similarity, payload = index.query(index.signature(TICKET[0], TICKET[1] + "!"))
+    assert key == "a" and similarity >= 0.85 and payload == {"ticket_id": "a"}
+    assert index.query(index.signature("Invoice question", "I was charged twice for my subscription.")) is None
+
+
+def test_seeded_entries_expire_even_when_added_after_live_ones(clock):
+    index = NearDuplicateIndex(ttl_seconds=100)
+    indexed(index, "live", *TICKET)
+    # Seeded after the live ticket but classified 90s ago
+    indexed(index, "seeded", "Invoice question", "I was charged twice for my subscription.", age_seconds=90)
+
+    clock[0] += 20
+    assert index.query(index.signature("Invoice question", "I was charged twice for my subscription.")) is None
+    assert index.query(index.signature(*TICKET))[0] == "live"
+    assert index.stats()["expirations"] == 1
+
+
+def test_eviction_drops_the_entry_closest_to_expiry(clock):
+    index = NearDuplicateIndex(max_entries=2)
+    indexed(index, "new", *TICKET)
+    indexed(index, "old", "Invoice question", "I was charged twice for my subscription.", age_seconds=500)
+    indexed(index, "newer", "Printer offline", "The office printer shows offline for everyone on floor two.")
+    assert index.stats()["size"] == 2
+    assert index.query(index.signature("Invoice question", "I was charged twice for my subscription.")) is None
+    assert index.query(index.signature(*TICKET))[0] == "new"
+
+
+def test_update_and_remove():
+    index = NearDuplicateIndex()
+    indexed(index, "a", *TICKET)
+    index.update("a", result={"priority": "High"})
+    assert index.query(index.signature(*TICKET))[2]["result"] == {"priority": "High"}
+    index.remove("a")
+    index.remove("missing")
+    assert index.query(index.signature(*TICKET)) is None
+    assert index.stats()["size"] == 0
+
+
+def test_long_text_is_capped_and_hashed_in_chunks(monkeypatch):
+    monkeypatch.setattr(dedup, "HASH_CHUNK", 16)
+    index = NearDuplicateIndex()
+    description = " ".join(f"word{i}" for i in range(20000))
+    assert len(index.shingles("Subject", description)) <= dedup.MAX_SHINGLE_CHARS
+    # Chunked hashing gives the same signature as a single pass over every shingle
+    chunked = index.signature(*TICKET)
+    monkeypatch.setattr(dedup, "HASH_CHUNK", 1 << 20)
+    assert (chunked == index.signature(*TICKET)).all()
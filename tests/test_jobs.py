@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from app.core.jobs import InvalidResultsCursor, JobManager, JobStore, decode_results_cursor, encode_results_cursor
+
+
+@pytest.fixture
+def job(tmp_path):
+    path = tmp_path / "results.ndjson"
+    path.write_text("".join(json.dumps({"index": i, "priority": "High"}) + "\n" for i in range(5)))
+    return {"id": "job1", "results_path": str(path), "results_bytes": path.stat().st_size}
+
+
+@pytest.fixture
+def manager(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    yield JobManager(store, get_classifier=lambda: None, jobs_dir=str(tmp_path))
+    store.close()
+
+
+def test_cursor_round_trip():
+    assert decode_results_cursor("job1", encode_results_cursor("job1", 120)) == 120
+
+
+def test_cursor_of_another_job_is_rejected():
+    with pytest.raises(InvalidResultsCursor):
+        decode_results_cursor("job2", encode_results_cursor("job1", 0))
+
+
+def test_results_pages(manager, job):
+    first, cursor = manager.read_results(job, limit=2)
+    second, cursor = manager.read_results(job, cursor, limit=2)
+    third, cursor = manager.read_results(job, cursor, limit=2)
+    assert [r["index"] for r in first + second + third] == [0, 1, 2, 3, 4]
+    assert cursor is None
+
+
+@pytest.mark.parametrize("offset", [3, 10_000])
+def test_offset_off_a_line_start_is_rejected(manager, job, offset):
+    with pytest.raises(InvalidResultsCursor):
+        manager.read_results(job, encode_results_cursor("job1", offset))
+
+
+def test_garbage_cursor_is_rejected(manager, job):
+    with pytest.raises(InvalidResultsCursor):
+        manager.read_results(job, "not a cursor")
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from app.db.rollups import UNKNOWN, bucket_start, rollup_increments
+
+
+def ticket(timestamp, client_id="c1", priority="High", category="Billing"):
+    return {
+        "classification_timestamp": timestamp,
+        "client_id": client_id,
+        "predicted_priority": priority,
+        "predicted_category": category
+    }
+
+
+def test_bucket_start():
+    timestamp = datetime(2024, 3, 5, 14, 27, 42, 123)
+    assert bucket_start(timestamp, "minute") == datetime(2024, 3, 5, 14, 27)
+    assert bucket_start(timestamp, "hour") == datetime(2024, 3, 5, 14)
+    with pytest.raises(ValueError):
+        bucket_start(timestamp, "day")
+
+
+def test_one_increment_per_granularity():
+    counts = rollup_increments([ticket(datetime(2024, 3, 5, 14, 27, 42))])
+    assert counts == {
+        ("minute", datetime(2024, 3, 5, 14, 27), "c1", "High", "Billing"): 1,
+        ("hour", datetime(2024, 3, 5, 14), "c1", "High", "Billing"): 1
+    }
+
+
+def test_tickets_in_the_same_bucket_are_summed():
+    counts = rollup_increments([
+        ticket(datetime(2024, 3, 5, 14, 27, 1)),
+        ticket(datetime(2024, 3, 5, 14, 27, 59)),
+        ticket(datetime(2024, 3, 5, 14, 28, 0)),
+        ticket(datetime(2024, 3, 5, 14, 28, 0), priority="Low")
+    ])
+    assert counts[("minute", datetime(2024, 3, 5, 14, 27), "c1", "High", "Billing")] == 2
+    assert counts[("minute", datetime(2024, 3, 5, 14, 28), "c1", "High", "Billing")] == 1
+    assert counts[("hour", datetime(2024, 3, 5, 14), "c1", "High", "Billing")] == 3
+    assert counts[("hour", datetime(2024, 3, 5, 14), "c1", "Low", "Billing")] == 1
+    assert sum(counts.values()) == 8
+
+
+def test_missing_labels_count_as_unknown():
+    counts = rollup_increments([ticket(datetime(2024, 3, 5, 14, 0), client_id=None, priority=None, category="")])
+    assert ("hour", datetime(2024, 3, 5, 14), UNKNOWN, UNKNOWN, UNKNOWN) in counts
+
+
+def test_missing_timestamp_uses_now():
+    counts = rollup_increments([{"client_id": "c1"}])
+    assert len(counts) == 2
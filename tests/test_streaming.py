@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.core import streaming
+from app.core.streaming import (
+    UploadTooLarge, iter_csv_records, iter_file_chunks, iter_lines, iter_ndjson_records, spool_upload
+)
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def collect(iterator):
+    async def run():
+        return [item async for item in iterator]
+    return asyncio.run(run())
+
+
+def csv_records(data: str, size: int = 7, **kwargs):
+    return collect(iter_csv_records(chunked(data.encode("utf-8"), size), **kwargs))
+
+
+def test_iter_lines_across_chunk_boundaries():
+    assert collect(iter_lines(chunked(b"ab\ncd\n\nef", 3))) == [b"ab", b"cd", b"", b"ef"]
+
+
+def test_csv_rows_keyed_by_header():
+    rows = csv_records("subject, description\nLogin,Cannot log in\nBilling,Charged twice\n")
+    assert rows == [
+        {"subject": "Login", "description": "Cannot log in"},
+        {"subject": "Billing", "description": "Charged twice"}
+    ]
+
+
+def test_csv_bom_crlf_and_blank_lines():
+    rows = csv_records("\ufeffsubject,description\r\n\r\nA,b\r\nC,d")
+    assert rows == [{"subject": "A", "description": "b"}, {"subject": "C", "description": "d"}]
+
+
+def test_csv_quoted_multiline_field_and_escaped_quotes():
+    rows = csv_records('subject,description\n"Crash","line one\nsays ""boom""\n\nline four"\nNext,row\n', size=5)
+    assert rows == [
+        {"subject": "Crash", "description": 'line one\nsays "boom"\n\nline four'},
+        {"subject": "Next", "description": "row"}
+    ]
+
+
+def test_csv_short_row_has_missing_fields():
+    assert csv_records("subject,description\nOnly subject\n") == [{"subject": "Only subject"}]
+
+
+def test_csv_unbalanced_quote_is_capped():
+    body = 'subject,description\nBroken,"never closed\n' + "more text\n" * 50 + "Last,row\n"
+    rows = csv_records(body, max_record_chars=100)
+    errors = [row for row in rows if isinstance(row, ValueError)]
+    assert errors and "unbalanced quote" in str(errors[0])
+    # Parsing resumes after the oversized record
+    assert rows[-1] == {"subject": "Last", "description": "row"}
+
+
+def test_ndjson_records_and_errors():
+    data = b'{"subject": "a", "description": "b"}\n\nnot json\n[1, 2]\n{"subject": "c"}'
+    records = collect(iter_ndjson_records(chunked(data, 4)))
+    assert records[0] == {"subject": "a", "description": "b"}
+    assert isinstance(records[1], ValueError) and str(records[1]).startswith("Invalid JSON")
+    assert isinstance(records[2], ValueError)
+    assert records[3] == {"subject": "c"}
+
+
+def test_overlong_line_is_skipped_up_to_the_next_newline():
+    data = b"ok\n" + b"x" * 50 + b"\nafter\n" + b"y" * 50
+    lines = collect(iter_lines(chunked(data, 8), max_line_bytes=20))
+    assert lines[0] == b"ok" and lines[2] == b"after"
+    assert isinstance(lines[1], ValueError) and isinstance(lines[3], ValueError)
+    assert len(lines) == 4
+
+
+def test_overlong_line_is_an_error_row(monkeypatch):
+    monkeypatch.setattr(streaming, "MAX_LINE_BYTES", 30)
+    rows = csv_records("subject,description\n" + "a," + "b" * 40 + "\nLast,row\n")
+    assert isinstance(rows[0], ValueError) and "Line over 30 bytes" in str(rows[0])
+    assert rows[1] == {"subject": "Last", "description": "row"}
+    records = collect(iter_ndjson_records(chunked(b'{"a": "' + b"b" * 40 + b'"}\n{"c": 1}\n', 16)))
+    assert isinstance(records[0], ValueError) and records[1] == {"c": 1}
+
+
+def test_spool_upload_rewinds_and_enforces_the_limit():
+    async def spool(limit):
+        upload = await spool_upload(chunked(b"a,b\n1,2\n", 3), limit)
+        try:
+            return [chunk async for chunk in iter_file_chunks(upload)]
+        finally:
+            upload.close()
+
+    assert b"".join(asyncio.run(spool(100))) == b"a,b\n1,2\n"
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(spool(5))
@@ -0,0 +1,96 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.db.tickets import InvalidCursor, build_filter, decode_cursor, encode_cursor, find_tickets
+
+
+def test_cursor_round_trip():
+    doc = {"classification_timestamp": datetime(2024, 5, 1, 12, 30, 15, 250000), "_id": ObjectId()}
+    assert decode_cursor(encode_cursor(doc)) == (doc["classification_timestamp"], doc["_id"])
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "aGVsbG8=", "MjAyNC0wNS0wMXxub3QtYW4taWQ="])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_build_filter_maps_fields_and_range():
+    since, until = datetime(2024, 1, 1), datetime(2024, 2, 1)
+    query = build_filter({"priority": "High", "category": None, "client_id": "c1"}, since, until)
+    assert query == {
+        "predicted_priority": "High",
+        "client_id": "c1",
+        "classification_timestamp": {"$gte": since, "$lt": until}
+    }
+    assert build_filter({"status": None}) == {}
+
+
+def test_pages_cover_every_ticket_once():
+    mongo_standin = pytest.importorskip("benchmarks.mongo_standin")
+    collection = mongo_standin.AsyncMongomockClient()["test"]["classified_tickets"]
+    start = datetime(2024, 1, 1)
+    # Pairs of tickets share a timestamp, so the _id tie-break is exercised
+    docs = [
+        {"_id": ObjectId(), "classification_timestamp": start + timedelta(minutes=i // 2), "description": "x"}
+        for i in range(11)
+    ]
+
+    async def all_pages():
+        await collection.insert_many(docs)
+        seen, cursor = [], None
+        while True:
+            page, cursor = await find_tickets(collection, {}, limit=3, cursor=cursor)
+            seen.extend(page)
+            if cursor is None:
+                return seen
+
+    seen = asyncio.run(all_pages())
+    expected = sorted(docs, key=lambda d: (d["classification_timestamp"], d["_id"]), reverse=True)
+    assert [t["id"] for t in seen] == [str(d["_id"]) for d in expected]
+    assert all("description" not in t for t in seen)
+
+
+def test_duplicate_clusters_group_only_duplicates():
+    mongo_standin = pytest.importorskip("benchmarks.mongo_standin")
+    from app.db.tickets import duplicate_clusters
+
+    collection = mongo_standin.AsyncMongomockClient()["test"]["classified_tickets"]
+    start = datetime(2024, 1, 1)
+    big, small, single = ObjectId(), ObjectId(), ObjectId()
+
+    def ticket(_id, minutes, cluster, duplicate_of=None):
+        return {
+            "_id": _id, "classification_timestamp": start + timedelta(minutes=minutes), "subject": f"s{minutes}",
+            "predicted_priority": "High", "predicted_category": "Technical",
+            "cluster_id": str(cluster), "duplicate_of": duplicate_of
+        }
+
+    docs = [
+        ticket(big, 0, big), ticket(small, 1, small), ticket(single, 2, single),
+        ticket(ObjectId(), 3, big, str(big)), ticket(ObjectId(), 4, big, str(big)),
+        ticket(ObjectId(), 5, small, str(small)),
+    ]
+
+    async def clusters(query, **kwargs):
+        if not await collection.count_documents({}):
+            await collection.insert_many(docs)
+        return await duplicate_clusters(collection, query, **kwargs)
+
+    rows = asyncio.run(clusters({}))
+    assert [(row["cluster_id"], row["size"]) for row in rows] == [(str(big), 3), (str(small), 2)]
+    assert rows[0]["subject"] == "s0"
+    assert rows[0]["first_seen"] == start
+    assert rows[0]["last_seen"] == start + timedelta(minutes=4)
+
+    # A window that starts after the opening tickets counts only the duplicates inside it
+    window = build_filter({}, start + timedelta(minutes=3))
+    rows = asyncio.run(clusters(window))
+    assert [(row["cluster_id"], row["size"]) for row in rows] == [(str(big), 2)]
+    assert rows[0]["first_seen"] == start + timedelta(minutes=3)
+    assert rows[0]["subject"] == "s0"
+    assert asyncio.run(clusters(window, min_size=3)) == []
+    assert [row["size"] for row in asyncio.run(clusters({}, limit=1))] == [3]
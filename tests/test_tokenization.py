@@ -0,0 +1,83 @@
+import pytest
+
+pytest.importorskip("torch")
+
+from nlp_pipeline.models.tokenization import TicketEncoder, length_buckets
+
+CLS, SEP, PAD = 101, 102, 0
+
+
+class WordTokenizer:
+    """Whitespace tokenizer: "t7" -> 7, anything else -> 1; wraps sequences in [CLS] ... [SEP]."""
+
+    model_max_length = 512
+    pad_token_id = PAD
+    model_input_names = ["input_ids", "attention_mask"]
+
+    def _ids(self, text):
+        return [int(word[1:]) if word.startswith("t") and word[1:].isdigit() else 1 for word in text.split()]
+
+    def __call__(self, texts, add_special_tokens=True):
+        single = isinstance(texts, str)
+        ids = [self._ids(text) for text in ([texts] if single else texts)]
+        if add_special_tokens:
+            ids = [[CLS] + seq + [SEP] for seq in ids]
+        return {"input_ids": ids[0] if single else ids}
+
+
+def words(start, stop):
+    return " ".join(f"t{i}" for i in range(start, stop))
+
+
+def encode_one(encoder, subject, description):
+    return encoder.encode([(subject, description)])[0]
+
+
+def test_short_ticket_is_not_truncated():
+    encoder = TicketEncoder(WordTokenizer(), strategy="head_tail", max_length=16)
+    assert encode_one(encoder, "t2 t3", "t4 t5") == [CLS, 2, 3, 4, 5, SEP]
+    assert encoder.stats["truncated"] == 0
+
+
+def test_head_keeps_the_start():
+    encoder = TicketEncoder(WordTokenizer(), strategy="head", max_length=6)
+    assert encode_one(encoder, "t2 t3", words(4, 20)) == [CLS, 2, 3, 4, 5, SEP]
+    assert encoder.stats["truncated"] == 1
+
+
+def test_head_tail_keeps_start_and_end():
+    encoder = TicketEncoder(WordTokenizer(), strategy="head_tail", max_length=10, head_fraction=0.25)
+    # Budget of 8 tokens: 2 from the head, 6 from the tail
+    assert encode_one(encoder, "t2 t3", words(4, 40)) == [CLS, 2, 3, 34, 35, 36, 37, 38, 39, SEP]
+
+
+def test_subject_weighted_keeps_the_subject():
+    encoder = TicketEncoder(
+        WordTokenizer(), strategy="subject_weighted", max_length=10, head_fraction=0.5, subject_max_tokens=4
+    )
+    # Subject capped at 4 tokens, the remaining 4 split between description head and tail
+    ids = encode_one(encoder, words(2, 10), words(20, 40))
+    assert ids == [CLS, 2, 3, 4, 5, 20, 21, 38, 39, SEP]
+
+
+def test_max_length_is_capped_at_the_model_limit():
+    encoder = TicketEncoder(WordTokenizer(), max_length=4096)
+    assert encoder.max_length == 512
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        TicketEncoder(WordTokenizer(), strategy="middle")
+
+
+def test_pad_to_longest_in_batch():
+    encoder = TicketEncoder(WordTokenizer())
+    encoded = encoder.pad([[CLS, 5, SEP], [CLS, 5, 6, 7, SEP]])
+    assert encoded["input_ids"].tolist() == [[CLS, 5, SEP, PAD, PAD], [CLS, 5, 6, 7, SEP]]
+    assert encoded["attention_mask"].tolist() == [[1, 1, 1, 0, 0], [1, 1, 1, 1, 1]]
+    assert "token_type_ids" not in encoded
+    assert encoder.snapshot()["padding_efficiency"] == 0.8
+
+
+def test_length_buckets_group_similar_lengths():
+    assert length_buckets([3, 10, 1, 8], batch_size=2) == [[1, 3], [0, 2]]